@@ -0,0 +1,214 @@
+"""
+Analytics - Agregados de receita com cache invalidado por eventos
+"""
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from db import Database
+
+
+# Eventos que alteram cada agregado
+EVENTOS_RECEITA = {"faturamento_adicionado", "faturamento_excluido",
+                   "projeto_excluido", "journal_sincronizado", "alteracoes_remotas",
+                   "projetos_arquivados", "projeto_desarquivado"}
+EVENTOS_ETAPA = EVENTOS_RECEITA | {"projeto_movido", "projetos_movidos", "projeto_criado",
+                                   "projetos_importados"}
+EVENTOS_TOP = EVENTOS_RECEITA | {"projeto_atualizado"}
+
+
+class ReceitaAnalytics:
+    """Observer que guarda os agregados de receita até o próximo evento relevante
+
+    Cada consulta roda uma única vez por ciclo de invalidação, então reabrir o
+    painel sem novos faturamentos não toca o banco.
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+        self._cache: Dict[str, object] = {}
+
+    def _cached(self, chave: str, carregar):
+        if chave not in self._cache:
+            self._cache[chave] = carregar()
+        return self._cache[chave]
+
+    def receita_mensal(self, meses: int = 24) -> List[Tuple[str, int]]:
+        """Totais mensais (centavos) dos últimos N meses, incluindo meses sem receita"""
+        hoje = date.today()
+        total_meses = hoje.year * 12 + hoje.month - 1 - (meses - 1)
+        desde = date(total_meses // 12, total_meses % 12 + 1, 1)
+
+        def carregar():
+            totais = dict(self.database.get_receita_mensal(desde))
+            resultado = []
+            for i in range(meses):
+                ano, mes = divmod(total_meses + i, 12)
+                chave = f"{ano:04d}-{mes + 1:02d}"
+                resultado.append((chave, totais.get(chave, 0)))
+            return resultado
+
+        return self._cached(f"mensal:{desde.isoformat()}:{meses}", carregar)
+
+    def comparativo_anual(self) -> List[Tuple[str, int, int]]:
+        """Últimos 12 meses lado a lado com os mesmos meses do ano anterior"""
+        mensal = self.receita_mensal(24)
+        anterior, atual = mensal[:12], mensal[12:]
+        return [(mes, valor, valor_anterior)
+                for (mes, valor), (_, valor_anterior) in zip(atual, anterior)]
+
+    def receita_por_etapa(self):
+        """Projetos e receita por etapa"""
+        return self._cached("etapas", self.database.get_receita_por_etapa)
+
+    def top_projetos(self, limit: int = 10):
+        """Projetos de maior receita"""
+        return self._cached(f"top:{limit}",
+                            lambda: self.database.get_top_projetos_receita(limit))
+
+    def invalidar(self, prefixos=None):
+        """Descarta o cache inteiro ou apenas as chaves com os prefixos dados"""
+        if prefixos is None:
+            self._cache.clear()
+            return
+        for chave in [c for c in self._cache if c.startswith(tuple(prefixos))]:
+            del self._cache[chave]
+
+    def update(self, event: str, data: dict = None):
+        """Implementação do Observer - invalida só os agregados afetados"""
+        prefixos = []
+        if event in EVENTOS_RECEITA:
+            prefixos.append("mensal:")
+        if event in EVENTOS_ETAPA:
+            prefixos.append("etapas")
+        if event in EVENTOS_TOP:
+            prefixos.append("top:")
+        if prefixos:
+            self.invalidar(prefixos)
+
+
+class TotaisEtapas:
+    """Quantidade de projetos e receita por etapa, mantidas em O(1) por evento
+
+    Os totais são semeados por uma única consulta GROUP BY etapa_atual e
+    depois ajustados a cada evento usando o mapa projeto -> (etapa, receita)
+    alimentado pelo carregamento do quadro. Eventos que não trazem dados
+    suficientes marcam os totais como sujos, e a próxima reconciliação
+    relê o banco.
+    """
+
+    def __init__(self, database: Database, on_change=None):
+        self.database = database
+        self.on_change = on_change
+        self._totais: Dict[int, List] = {}
+        self._projetos: Dict[int, List] = {}
+        self.sujo = True
+
+    def get(self, etapa_id: int) -> Tuple[int, int]:
+        """Retorna (quantidade, receita em centavos) de uma etapa"""
+        quantidade, receita = self._totais.get(etapa_id, (0, 0))
+        return quantidade, receita
+
+    def registrar_projetos(self, projetos):
+        """Atualiza o mapa projeto -> (etapa, receita) a partir do quadro carregado"""
+        self._projetos = {p.id: [p.etapa_atual, p.receita_total] for p in projetos}
+
+    def semear(self, totais: Dict[int, Tuple[int, int]]):
+        """Mostra totais já conhecidos (ex.: do snapshot) até a próxima reconciliação"""
+        self._totais = {etapa: [quantidade, receita] for etapa, (quantidade, receita) in totais.items()}
+        self.sujo = True
+        self._avisar(*self._totais)
+
+    def reconciliar(self, totais: Optional[Dict[int, Tuple[int, int]]] = None):
+        """Relê os totais do banco (ou usa os já lidos) e avisa se havia divergência"""
+        if totais is None:
+            totais = self.database.get_totais_por_etapa()
+        novos = {etapa: [quantidade, receita] for etapa, (quantidade, receita) in totais.items()}
+        atuais = {etapa: total for etapa, total in self._totais.items() if total[0]}
+        if not self.sujo and novos != atuais:
+            print("⚠️ Totais por etapa divergiam do banco e foram reconciliados")
+        etapas = set(self._totais) | set(novos)
+        self._totais = novos
+        self.sujo = False
+        self._avisar(*etapas)
+
+    def _avisar(self, *etapas):
+        if self.on_change:
+            for etapa in etapas:
+                if etapa is not None:
+                    self.on_change(etapa)
+
+    def _ajustar(self, etapa: int, quantidade: int, receita: int):
+        total = self._totais.setdefault(etapa, [0, 0])
+        total[0] += quantidade
+        total[1] += receita
+
+    def _mover(self, info: List, destino: int):
+        origem, receita = info
+        if origem == destino:
+            return
+        self._ajustar(origem, -1, -receita)
+        self._ajustar(destino, 1, receita)
+        info[0] = destino
+        self._avisar(origem, destino)
+
+    def _aplicar_remotas(self, projetos, excluidos):
+        """Ajusta os totais com o estado atual dos projetos alterados por outros clientes"""
+        for projeto in projetos:
+            info = self._projetos.get(projeto.id)
+            if info is None:
+                self._projetos[projeto.id] = [projeto.etapa_atual, projeto.receita_total]
+                self._ajustar(projeto.etapa_atual, 1, projeto.receita_total)
+                self._avisar(projeto.etapa_atual)
+                continue
+            self._mover(info, projeto.etapa_atual)
+            delta = projeto.receita_total - info[1]
+            if delta:
+                info[1] = projeto.receita_total
+                self._ajustar(info[0], 0, delta)
+                self._avisar(info[0])
+        for projeto_id in excluidos:
+            info = self._projetos.pop(projeto_id, None)
+            if info is not None:
+                self._ajustar(info[0], -1, -info[1])
+                self._avisar(info[0])
+    
+    def update(self, event: str, data: dict = None):
+        """Implementação do Observer - ajusta só as etapas afetadas"""
+        data = data or {}
+        projeto_id = data.get("projeto_id")
+        info = self._projetos.get(projeto_id)
+
+        if event == "projeto_criado" and data.get("etapa") is not None:
+            self._projetos[projeto_id] = [data["etapa"], 0]
+            self._ajustar(data["etapa"], 1, 0)
+            self._avisar(data["etapa"])
+        elif event in ("projeto_movido", "projeto_atualizado") and info is not None:
+            destino = data.get("nova_etapa", data.get("etapa"))
+            if destino is not None:
+                self._mover(info, destino)
+        elif event == "projetos_movidos":
+            for movido in data["projeto_ids"]:
+                info_movido = self._projetos.get(movido)
+                if info_movido is not None:
+                    self._mover(info_movido, data["nova_etapa"])
+        elif event == "projeto_excluido" and info is not None:
+            del self._projetos[projeto_id]
+            self._ajustar(info[0], -1, -info[1])
+            self._avisar(info[0])
+        elif event in ("faturamento_adicionado", "faturamento_excluido") \
+                and info is not None and data.get("valor") is not None:
+            valor = data["valor"] if event == "faturamento_adicionado" else -data["valor"]
+            info[1] += valor
+            self._ajustar(info[0], 0, valor)
+            self._avisar(info[0])
+        elif event == "alteracoes_remotas":
+            self._aplicar_remotas(data["projetos"], data["excluidos"])
+        elif event == "projetos_arquivados":
+            self._aplicar_remotas([], data["projeto_ids"])
+        elif event == "projeto_desarquivado" and data.get("projeto") is not None:
+            self._aplicar_remotas([data["projeto"]], [])
+        elif event in ("projeto_criado", "projeto_movido", "projeto_atualizado",
+                       "projeto_excluido", "faturamento_adicionado",
+                       "faturamento_excluido", "journal_sincronizado",
+                       "projetos_importados", "projeto_desarquivado"):
+            self.sujo = True
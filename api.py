@@ -0,0 +1,337 @@
+"""
+API - Servidor HTTP/JSON local (asyncio) sobre a camada Database
+
+Uso:
+    python api.py [--host 127.0.0.1] [--port 8765]
+
+Rotas:
+    GET  /board                         etapas e projetos (ETag / If-None-Match)
+    GET  /projetos/<id>                 projeto com seus faturamentos
+    POST /projetos/<id>/mover           {"etapa": 2}
+    POST /projetos/<id>/faturamentos    {"valor": "150.00", "data": "2024-05-01", "descricao": "..."}
+"""
+import argparse
+import asyncio
+import json
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+import dinheiro
+import migracoes
+from config import AppConfig, DatabaseConfig, get_database_config, get_replicas_config
+from db import Database, DatabaseError
+from models import Faturamento
+
+
+STATUS_TEXT = {
+    200: "OK", 201: "Created", 304: "Not Modified", 400: "Bad Request",
+    404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"
+}
+
+
+class HttpError(Exception):
+    """Erro que vira uma resposta JSON com o status informado"""
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _projeto_json(projeto, com_faturamentos: bool = True) -> dict:
+    """asdict do projeto com os centavos como texto "1234.56", como antes"""
+    dados = asdict(projeto)
+    dados["receita_total"] = dinheiro.texto(projeto.receita_total)
+    if com_faturamentos:
+        for faturamento in dados["faturamentos"]:
+            faturamento["valor"] = dinheiro.texto(faturamento["valor"])
+    else:
+        del dados["faturamentos"]
+    return dados
+
+
+class DatabasePool:
+    """Pool fixo de objetos Database, um por conexão, usados em threads"""
+
+    def __init__(self, database: Database, tamanho: int):
+        self._livres: queue.Queue = queue.Queue()
+        self._todos = [database] + [database.clonar() for _ in range(tamanho - 1)]
+        for db in self._todos:
+            self._livres.put(db)
+
+    @contextmanager
+    def conexao(self):
+        db = self._livres.get()
+        try:
+            yield db
+        finally:
+            self._livres.put(db)
+
+    def close(self):
+        for db in self._todos:
+            db.close()
+
+
+class KanbanAPI:
+    """Roteia as requisições HTTP para operações do Database"""
+
+    ROTAS = [
+        ("GET", re.compile(r"^/board$"), "board"),
+        ("GET", re.compile(r"^/projetos/(\d+)$"), "projeto"),
+        ("POST", re.compile(r"^/projetos/(\d+)/mover$"), "mover"),
+        ("POST", re.compile(r"^/projetos/(\d+)/faturamentos$"), "faturamento"),
+    ]
+
+    def __init__(self, pool: DatabasePool, workers: int):
+        self.pool = pool
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kanban-api")
+
+    async def _rodar(self, funcao, *args):
+        """Executa uma operação bloqueante do Database no pool de threads"""
+        def tarefa():
+            with self.pool.conexao() as db:
+                return funcao(db, *args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, tarefa)
+
+    async def limpar_change_log_periodico(self):
+        """Remove do change_log o que passou da retenção, a cada intervalo"""
+        while True:
+            await asyncio.sleep(AppConfig.CHANGE_LOG_PRUNE_INTERVAL / 1000)
+            try:
+                await self._rodar(lambda db: db.prune_changes(AppConfig.CHANGE_LOG_RETENTION_DAYS))
+            except DatabaseError as e:
+                print(f"⚠️ Não foi possível limpar o change_log: {e}")
+
+    async def tratar(self, metodo: str, caminho: str, headers: dict,
+                     corpo: bytes) -> Tuple[int, Optional[dict], dict]:
+        """Retorna (status, payload, headers extras)"""
+        caminho = caminho.split("?", 1)[0]
+        encontrou_caminho = False
+        for metodo_rota, padrao, nome in self.ROTAS:
+            match = padrao.match(caminho)
+            if not match:
+                continue
+            encontrou_caminho = True
+            if metodo_rota == metodo:
+                handler = getattr(self, f"_{nome}")
+                return await handler(headers, corpo, *match.groups())
+        if encontrou_caminho:
+            raise HttpError(405, "Método não permitido")
+        raise HttpError(404, "Rota não encontrada")
+
+    async def _board(self, headers, corpo):
+        # O ETag vem do contador do change_log: sem alterações, a resposta
+        # é um 304 que custa só um MAX(id) na chave primária. A versão segue
+        # a janela de read-your-writes (depois de um POST vem do primário),
+        # senão uma réplica atrasada responderia 304 com o quadro de antes
+        versao = await self._rodar(lambda db: db.get_versao())
+        etag = f'W/"board-{versao}"'
+        candidatos = [t.strip() for t in headers.get("if-none-match", "").split(",")]
+        if etag in candidatos or "*" in candidatos:
+            return 304, None, {"ETag": etag}
+
+        # Versão e quadro na mesma conexão, a versão primeiro: um corpo mais
+        # antigo que o ETag ficaria em cache nos clientes recebendo 304
+        def carregar(db):
+            return db.get_etapas(), *db.get_versao_e_projetos()
+        etapas, versao, projetos = await self._rodar(carregar)
+        payload = {
+            "etapas": [asdict(e) for e in etapas],
+            "projetos": [_projeto_json(p, com_faturamentos=False) for p in projetos]
+        }
+        return 200, payload, {"ETag": f'W/"board-{versao}"'}
+
+    async def _projeto(self, headers, corpo, projeto_id):
+        def carregar(db):
+            projeto = self._projeto_ou_404(db, projeto_id)
+            projeto.faturamentos = db.get_faturamentos_projeto(projeto.id)
+            return projeto
+        projeto = await self._rodar(carregar)
+        return 200, _projeto_json(projeto), {}
+
+    async def _mover(self, headers, corpo, projeto_id):
+        dados = self._ler_json(corpo)
+        try:
+            etapa = int(dados["etapa"])
+        except (KeyError, TypeError, ValueError):
+            raise HttpError(400, "Informe a etapa de destino: {\"etapa\": <id>}")
+
+        def mover(db):
+            projeto = self._projeto_ou_404(db, projeto_id)
+            if db.get_etapa_by_id(etapa) is None:
+                raise HttpError(400, "Etapa inexistente")
+            db.mover_projeto_etapa(projeto.id, etapa, projeto.etapa_atual)
+            return projeto
+        projeto = await self._rodar(mover)
+        return 200, {"projeto_id": projeto.id, "etapa": etapa}, {}
+
+    async def _faturamento(self, headers, corpo, projeto_id):
+        dados = self._ler_json(corpo)
+        try:
+            valor = dinheiro.centavos(str(dados["valor"]))
+            if valor <= 0:
+                raise ValueError("Valor deve ser positivo")
+            data_str = dados.get("data") or date.today().isoformat()
+            data = datetime.strptime(data_str, "%Y-%m-%d").date()
+        except (KeyError, ValueError):
+            raise HttpError(400, "Use {\"valor\": \"123.45\", \"data\": \"AAAA-MM-DD\"}")
+
+        faturamento = Faturamento(
+            id=None,
+            projeto_id=int(projeto_id),
+            valor=valor,
+            descricao=dados.get("descricao"),
+            data_faturamento=data
+        )
+
+        def adicionar(db):
+            self._projeto_ou_404(db, projeto_id)
+            return db.adicionar_faturamento(faturamento)
+        faturamento_id = await self._rodar(adicionar)
+        return 201, {"id": faturamento_id, "projeto_id": faturamento.projeto_id}, {}
+
+    @staticmethod
+    def _projeto_ou_404(db: Database, projeto_id: str):
+        projeto = db.get_projeto_by_id(int(projeto_id))
+        if projeto is None:
+            raise HttpError(404, "Projeto não encontrado")
+        return projeto
+
+    @staticmethod
+    def _ler_json(corpo: bytes) -> dict:
+        try:
+            dados = json.loads(corpo or b"{}")
+        except ValueError:
+            raise HttpError(400, "JSON inválido")
+        if not isinstance(dados, dict):
+            raise HttpError(400, "O corpo deve ser um objeto JSON")
+        return dados
+
+
+async def _ler_requisicao(reader: asyncio.StreamReader):
+    """Lê uma requisição HTTP/1.1; retorna None se a conexão foi fechada"""
+    linha = await reader.readline()
+    if not linha:
+        return None
+    try:
+        metodo, caminho, versao = linha.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Linha de requisição inválida")
+
+    headers = {}
+    while True:
+        linha = await reader.readline()
+        if linha in (b"\r\n", b"\n", b""):
+            break
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        headers[nome.strip().lower()] = valor.strip()
+
+    try:
+        tamanho = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HttpError(400, "Content-Length inválido")
+    if tamanho < 0:
+        raise HttpError(400, "Content-Length inválido")
+    corpo = await reader.readexactly(tamanho) if tamanho else b""
+    return metodo.upper(), caminho, versao, headers, corpo
+
+
+def _resposta(status: int, payload: Optional[dict], extras: dict, manter_conexao: bool) -> bytes:
+    corpo = b""
+    if payload is not None:
+        corpo = json.dumps(payload, default=_json_default, ensure_ascii=False).encode("utf-8")
+    linhas = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+    if status != 304:
+        linhas.append("Content-Type: application/json; charset=utf-8")
+    linhas.append(f"Content-Length: {len(corpo)}")
+    linhas.append(f"Connection: {'keep-alive' if manter_conexao else 'close'}")
+    linhas.extend(f"{nome}: {valor}" for nome, valor in extras.items())
+    return ("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1") + corpo
+
+
+def criar_handler(api: KanbanAPI):
+    async def handler(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                manter_conexao = False
+                requisicao = None
+                try:
+                    requisicao = await _ler_requisicao(reader)
+                    if requisicao is None:
+                        break
+                    metodo, caminho, versao, headers, corpo = requisicao
+                    manter_conexao = (versao == "HTTP/1.1"
+                                      and headers.get("connection", "").lower() != "close")
+                    status, payload, extras = await api.tratar(metodo, caminho, headers, corpo)
+                except HttpError as e:
+                    status, payload, extras = e.status, {"erro": str(e)}, {}
+                except DatabaseError as e:
+                    status, payload, extras = 500, {"erro": str(e)}, {}
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as e:
+                    # Qualquer falha não prevista ainda recebe uma resposta:
+                    # 400 se a requisição nem pôde ser lida, 500 depois disso
+                    manter_conexao = False
+                    if requisicao is None:
+                        status, payload, extras = 400, {"erro": "Requisição inválida"}, {}
+                    else:
+                        print(f"❌ Erro ao tratar {requisicao[0]} {requisicao[1]}: {e!r}")
+                        status, payload, extras = 500, {"erro": "Erro interno"}, {}
+                writer.write(_resposta(status, payload, extras, manter_conexao))
+                await writer.drain()
+                if not manter_conexao:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    return handler
+
+
+async def servir(host: str, port: int, pool_size: int):
+    """Sobe o servidor e atende até ser interrompido"""
+    db = Database(**get_database_config(), replicas=get_replicas_config(),
+                  janela_leitura=AppConfig.REPLICA_READ_WINDOW)
+    migracoes.exigir_atualizado(db.connection)
+    pool = DatabasePool(db, pool_size)
+    api = KanbanAPI(pool, pool_size)
+    server = await asyncio.start_server(criar_handler(api), host, port)
+    print(f"✓ API Kanban em http://{host}:{port} ({pool_size} conexões)")
+    limpeza = asyncio.create_task(api.limpar_change_log_periodico())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        limpeza.cancel()
+        api.executor.shutdown(wait=True)
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API JSON local do Kanban")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Endereço de escuta (padrão: apenas localhost)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pool-size", type=int, default=DatabaseConfig.POOL_SIZE)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(servir(args.host, args.port, args.pool_size))
+    except KeyboardInterrupt:
+        print("Servidor encerrado.")
+    except DatabaseError as e:
+        print(f"Erro de banco de dados: {e}")
+
+
+if __name__ == "__main__":
+    main()
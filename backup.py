@@ -0,0 +1,271 @@
+"""
+Backup - Cópias comprimidas do banco em AppConfig.BACKUP_DIR
+
+Cada backup é uma pasta com um manifest.json e, por tabela, arquivos
+JSON Lines comprimidos com gzip de até N linhas cada:
+
+    backups/kanban-20240501-120000-completo/
+        manifest.json
+        etapas-0001.jsonl.gz
+        projetos-0001.jsonl.gz
+        faturamentos-0001.jsonl.gz
+        faturamentos-0002.jsonl.gz
+
+Backups incrementais trazem só faturamentos com data_criacao e arquivados
+com data_arquivamento a partir das marcas d'água do backup anterior; a
+tabela projetos vai inteira, porque reordenar cartões (posicao) não altera
+data_atualizacao. Exclusões (inclusive a saída das tabelas quentes
+ao arquivar) não aparecem em incrementais: só um backup completo as reflete.
+"""
+import gzip
+import json
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from db import Database
+
+try:
+    import resource
+except ImportError:  # Windows: sem medição de memória
+    resource = None
+
+
+TABELAS = ("etapas", "projetos", "faturamentos", "projetos_arquivados", "faturamentos_arquivados")
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _pico_rss() -> Optional[int]:
+    """Pico de memória residente do processo, em bytes"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+class Medidor:
+    """Mede linhas, bytes (JSON sem compressão), tempo e pico de memória
+
+    O pico vem do ru_maxrss do processo, sem custo durante a operação; o
+    crescimento dele enquanto a operação roda mostra se a memória ficou
+    estável.
+    """
+
+    def __init__(self):
+        self.linhas = 0
+        self.bytes = 0
+        self.duracao = 0.0
+        self.pico_memoria: Optional[int] = None
+        self.crescimento_memoria: Optional[int] = None
+        self._inicio = 0.0
+        self._pico_inicial: Optional[int] = None
+
+    def __enter__(self):
+        self._pico_inicial = _pico_rss()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.duracao = time.perf_counter() - self._inicio
+        self.pico_memoria = _pico_rss()
+        if self.pico_memoria is not None:
+            self.crescimento_memoria = self.pico_memoria - self._pico_inicial
+        return False
+
+    def resumo(self) -> str:
+        duracao = max(self.duracao, 1e-9)
+        mb = 1024 * 1024
+        texto = (f"{self.linhas} linhas, {self.bytes / mb:.1f} MB em {self.duracao:.1f}s "
+                 f"({self.linhas / duracao:,.0f} linhas/s, {self.bytes / mb / duracao:.1f} MB/s)")
+        if self.pico_memoria is not None:
+            texto += (f", pico de memória {self.pico_memoria / mb:.1f} MB "
+                      f"(+{self.crescimento_memoria / mb:.1f} MB durante a operação)")
+        return texto
+
+
+def _manifestos(backup_dir: Path) -> List[Tuple[Path, dict]]:
+    """Backups existentes em ordem cronológica"""
+    encontrados = []
+    for manifest_path in sorted(Path(backup_dir).glob("kanban-*/manifest.json")):
+        try:
+            encontrados.append((manifest_path.parent,
+                                json.loads(manifest_path.read_text(encoding="utf-8"))))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Manifesto ignorado ({manifest_path}): {e}")
+    return encontrados
+
+
+class _ArquivosEmPartes:
+    """Escreve lotes de linhas JSON em arquivos gzip que giram a cada N linhas"""
+
+    _encoder = json.JSONEncoder(default=_json_default, ensure_ascii=False)
+
+    def __init__(self, pasta: Path, tabela: str, linhas_por_arquivo: int, medidor: Medidor):
+        self.pasta = pasta
+        self.tabela = tabela
+        self.linhas_por_arquivo = linhas_por_arquivo
+        self.medidor = medidor
+        self.arquivos: List[str] = []
+        self._atual = None
+        self._linhas_no_atual = 0
+
+    def escrever(self, linhas: list):
+        """Codifica e grava o lote com um write por arquivo"""
+        inicio = 0
+        while inicio < len(linhas):
+            if self._atual is None or self._linhas_no_atual >= self.linhas_por_arquivo:
+                self._abrir_proximo()
+            fim = min(len(linhas), inicio + self.linhas_por_arquivo - self._linhas_no_atual)
+            dados = ("\n".join(map(self._encoder.encode, linhas[inicio:fim])) + "\n").encode("utf-8")
+            self._atual.write(dados)
+            self._linhas_no_atual += fim - inicio
+            self.medidor.linhas += fim - inicio
+            self.medidor.bytes += len(dados)
+            inicio = fim
+
+    def _abrir_proximo(self):
+        self.fechar()
+        nome = f"{self.tabela}-{len(self.arquivos) + 1:04d}.jsonl.gz"
+        self.arquivos.append(nome)
+        self._atual = gzip.open(self.pasta / nome, "wb", compresslevel=6)
+        self._linhas_no_atual = 0
+
+    def fechar(self):
+        if self._atual is not None:
+            self._atual.close()
+            self._atual = None
+
+
+def criar_backup(db: Database, backup_dir, incremental: bool = False,
+                 lote: int = 5000, linhas_por_arquivo: int = 100000) -> Tuple[Path, Medidor]:
+    """Grava um backup completo ou incremental e retorna (pasta, medidor)
+
+    As tabelas são lidas dentro de um snapshot consistente, em lotes de um
+    cursor não bufferizado, e escritas linha a linha: a memória usada não
+    depende do tamanho das tabelas.
+    """
+    backup_dir = Path(backup_dir)
+    base = None
+    if incremental:
+        anteriores = _manifestos(backup_dir)
+        if not anteriores:
+            print("⚠️ Nenhum backup anterior: fazendo backup completo")
+            incremental = False
+        else:
+            base = anteriores[-1]
+
+    inicio = datetime.now()
+    tipo = "incremental" if incremental else "completo"
+    pasta = backup_dir / f"kanban-{inicio:%Y%m%d-%H%M%S}-{tipo}"
+    tmp = pasta.with_name(pasta.name + ".tmp")
+    tmp.mkdir(parents=True)
+
+    manifest = {
+        "tipo": tipo,
+        "criado_em": inicio.isoformat(sep=" ", timespec="seconds"),
+        "base": base[0].name if base else None,
+        "tabelas": {}
+    }
+    with Medidor() as medidor, db.snapshot_leitura():
+        for tabela in TABELAS:
+            colunas, marca = db.TABELAS_BACKUP[tabela]
+            desde = None
+            marca_anterior = base[1]["tabelas"].get(tabela, {}).get("marca") if base else None
+            if marca_anterior:
+                desde = datetime.fromisoformat(marca_anterior)
+            indice_marca = colunas.index(marca) if marca else None
+
+            arquivos = _ArquivosEmPartes(tmp, tabela, linhas_por_arquivo, medidor)
+            linhas = 0
+            nova_marca = desde
+            try:
+                for rows in db.iter_backup(tabela, desde, lote):
+                    arquivos.escrever(rows)
+                    if indice_marca is not None:
+                        marcas = [row[indice_marca] for row in rows if row[indice_marca] is not None]
+                        if marcas and (nova_marca is None or max(marcas) > nova_marca):
+                            nova_marca = max(marcas)
+                    linhas += len(rows)
+            finally:
+                arquivos.fechar()
+
+            manifest["tabelas"][tabela] = {
+                "colunas": list(colunas),
+                "arquivos": arquivos.arquivos,
+                "linhas": linhas,
+                "marca": nova_marca.isoformat(sep=" ") if nova_marca else None
+            }
+            print(f"✓ {tabela}: {linhas} linhas em {len(arquivos.arquivos)} arquivo(s)")
+
+    # Manifesto por último e renomeação atômica: backup incompleto não é listado
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2, ensure_ascii=False),
+                                       encoding="utf-8")
+    tmp.rename(pasta)
+    return pasta, medidor
+
+
+def _ler_lotes(pasta: Path, manifest: dict, lote: int, medidor: Medidor) -> Iterator[Tuple[str, list, list]]:
+    """Lê os arquivos do backup em lotes (tabela, colunas, linhas), na ordem das chaves estrangeiras"""
+    for tabela in TABELAS:
+        info = manifest["tabelas"].get(tabela)
+        if info is None:
+            # Backup anterior à tabela
+            continue
+        colunas = info["colunas"]
+        linhas = []
+        for nome in info["arquivos"]:
+            with gzip.open(pasta / nome, "rb") as f:
+                for dados in f:
+                    linhas.append(json.loads(dados))
+                    medidor.bytes += len(dados)
+                    if len(linhas) >= lote:
+                        medidor.linhas += len(linhas)
+                        yield tabela, colunas, linhas
+                        linhas = []
+        if linhas:
+            medidor.linhas += len(linhas)
+            yield tabela, colunas, linhas
+
+
+def restaurar_backup(db: Database, pasta, lote: int = 1000) -> Medidor:
+    """Restaura um backup numa única transação com INSERTs em lote
+
+    Para voltar a um ponto de uma cadeia incremental, restaure o completo
+    e depois cada incremental em ordem (ver cadeia_ate()).
+    """
+    pasta = Path(pasta)
+    manifest = json.loads((pasta / "manifest.json").read_text(encoding="utf-8"))
+    with Medidor() as medidor:
+        contagem = db.restaurar_backup(_ler_lotes(pasta, manifest, lote, medidor))
+    for tabela in TABELAS:
+        print(f"✓ {tabela}: {contagem.get(tabela, 0)} linhas restauradas")
+    return medidor
+
+
+def cadeia_ate(backup_dir, nome: Optional[str] = None) -> List[Path]:
+    """Backup completo mais recente e os incrementais seguintes, até nome (inclusive)"""
+    cadeia: List[Path] = []
+    for pasta, manifest in _manifestos(backup_dir):
+        if manifest["tipo"] == "completo":
+            cadeia = [pasta]
+        elif cadeia:
+            cadeia.append(pasta)
+        if nome is not None and pasta.name == nome:
+            break
+    else:
+        if nome is not None:
+            raise FileNotFoundError(f"Backup não encontrado: {nome}")
+    return cadeia
@@ -0,0 +1,224 @@
+"""
+Teste de carga com vários clientes simultâneos no mesmo MySQL
+
+Uso:
+    python bench_clientes.py [--clientes 1,5,10,20] [--duracao 30] [--modo processos|threads]
+                             [--mix get_projetos=10,get_projeto_by_id=50,mover=25,faturamento=15]
+                             [--replicas host:porta,...] [--janela 5]
+
+Cada cliente abre o próprio Database e, até acabar o tempo, sorteia
+operações do mix com os pesos dados. Os movimentos e faturamentos só tocam
+projetos criados pelo próprio teste (nome "carga-N"), que são excluídos ao
+final junto com seus faturamentos. Use um banco local: a carga é real.
+
+Com uma lista em --clientes, cada nível roda em sequência e o resumo final
+mostra onde a vazão para de crescer. Por operação são reportados vazão,
+latência p50/p95/p99, deadlocks (1213), esperas de lock esgotadas (1205) e
+demais erros.
+
+Com --replicas (ou DB_REPLICAS no .env) os clientes leem das réplicas e
+escrevem no primário; --janela é o read-your-writes de cada cliente em
+segundos (0 manda toda leitura às réplicas). Para testar localmente basta
+uma segunda instância do MySQL, ou o mesmo servidor em outra porta.
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+from typing import Dict, List
+
+from config import AppConfig, get_database_config, get_replicas_config
+from db import Database, DatabaseError
+from models import Faturamento, Projeto
+
+
+OPERACOES = ("get_projetos", "get_projeto_by_id", "mover", "faturamento")
+MIX_PADRAO = "get_projetos=10,get_projeto_by_id=50,mover=25,faturamento=15"
+
+ER_LOCK_WAIT_TIMEOUT = 1205
+ER_LOCK_DEADLOCK = 1213
+
+
+def _mix(texto: str) -> Dict[str, int]:
+    pesos = {}
+    for parte in texto.split(","):
+        nome, _, peso = parte.partition("=")
+        if nome not in OPERACOES:
+            raise argparse.ArgumentTypeError(f"operação desconhecida: {nome} (use {', '.join(OPERACOES)})")
+        pesos[nome] = int(peso)
+    return pesos
+
+
+def _codigo_mysql(erro: Exception):
+    """errno do erro do conector embrulhado pelo DatabaseError"""
+    causa = erro.__cause__ or erro.__context__
+    return getattr(causa, "errno", None)
+
+
+def _executar(db: Database, operacao: str, rng: random.Random,
+              projeto_ids: List[int], etapa_ids: List[int]):
+    if operacao == "get_projetos":
+        db.get_projetos()
+    elif operacao == "get_projeto_by_id":
+        db.get_projeto_by_id(rng.choice(projeto_ids))
+    elif operacao == "mover":
+        db.mover_projeto_etapa(rng.choice(projeto_ids), rng.choice(etapa_ids))
+    elif operacao == "faturamento":
+        db.adicionar_faturamento(Faturamento(
+            id=None, projeto_id=rng.choice(projeto_ids),
+            valor=rng.randint(100, 500000),
+            descricao="carga", data_faturamento=date.today()
+        ))
+
+
+def cliente(indice: int, config: dict, projeto_ids: List[int], etapa_ids: List[int],
+            mix: Dict[str, int], inicio: float, duracao: float, pausa: float) -> dict:
+    """Roda um cliente até o fim da janela e devolve as medições (em processo ou thread)"""
+    rng = random.Random(indice)
+    db = Database(**config)
+    operacoes, pesos = zip(*mix.items())
+    resultado = {op: {"latencias": [], "erros": 0, "deadlocks": 0, "lock_timeouts": 0,
+                      "mensagens": Counter()} for op in operacoes}
+    # Todos começam juntos, depois de abrir as conexões
+    time.sleep(max(0.0, inicio - time.time()))
+    fim = inicio + duracao
+    try:
+        while time.time() < fim:
+            operacao = rng.choices(operacoes, pesos)[0]
+            medida = resultado[operacao]
+            comeco = time.perf_counter()
+            try:
+                _executar(db, operacao, rng, projeto_ids, etapa_ids)
+                medida["latencias"].append((time.perf_counter() - comeco) * 1000)
+            except DatabaseError as e:
+                codigo = _codigo_mysql(e)
+                if codigo == ER_LOCK_DEADLOCK:
+                    medida["deadlocks"] += 1
+                elif codigo == ER_LOCK_WAIT_TIMEOUT:
+                    medida["lock_timeouts"] += 1
+                else:
+                    medida["erros"] += 1
+                    medida["mensagens"][str(e)[:120]] += 1
+            if pausa:
+                time.sleep(pausa)
+    finally:
+        db.close()
+    return resultado
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def rodar_nivel(config: dict, clientes: int, args, projeto_ids, etapa_ids) -> dict:
+    """Roda um nível de concorrência e soma as medições de todos os clientes"""
+    executor_cls = ProcessPoolExecutor if args.modo == "processos" else ThreadPoolExecutor
+    inicio = time.time() + args.preparo
+    with executor_cls(max_workers=clientes) as executor:
+        futuros = [executor.submit(cliente, i, config, projeto_ids, etapa_ids, args.mix,
+                                   inicio, args.duracao, args.pausa_ms / 1000)
+                   for i in range(clientes)]
+        parciais = [f.result() for f in futuros]
+
+    total = {op: {"latencias": [], "erros": 0, "deadlocks": 0, "lock_timeouts": 0,
+                  "mensagens": Counter()} for op in args.mix}
+    for parcial in parciais:
+        for op, medida in parcial.items():
+            total[op]["latencias"].extend(medida["latencias"])
+            for campo in ("erros", "deadlocks", "lock_timeouts"):
+                total[op][campo] += medida[campo]
+            total[op]["mensagens"].update(medida["mensagens"])
+    return total
+
+
+def relatorio(clientes: int, total: dict, duracao: float) -> tuple:
+    print(f"\n=== {clientes} cliente(s), {duracao:.0f}s ===")
+    print(f"{'operação':<18} {'ops':>8} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'máx ms':>8} {'deadlk':>7} {'lockto':>7} {'erros':>6}")
+    ops_total = 0
+    todas = []
+    for op, medida in total.items():
+        latencias = sorted(medida["latencias"])
+        ops_total += len(latencias)
+        todas.extend(latencias)
+        print(f"{op:<18} {len(latencias):>8} {len(latencias) / duracao:>9.1f} "
+              f"{_percentil(latencias, 0.50):>8.2f} {_percentil(latencias, 0.95):>8.2f} "
+              f"{_percentil(latencias, 0.99):>8.2f} {max(latencias, default=0):>8.2f} "
+              f"{medida['deadlocks']:>7} {medida['lock_timeouts']:>7} {medida['erros']:>6}")
+        for mensagem, quantidade in medida["mensagens"].most_common(3):
+            print(f"    ⚠️ {quantidade}× {mensagem}")
+    todas.sort()
+    falhas = sum(m["erros"] + m["deadlocks"] + m["lock_timeouts"] for m in total.values())
+    return ops_total / duracao, _percentil(todas, 0.95), _percentil(todas, 0.99), falhas
+
+
+def preparar(db: Database, quantidade: int) -> List[int]:
+    """Cria os projetos que a carga vai mover e faturar"""
+    etapa = db.get_etapas()[0].id
+    ids = []
+    for i in range(quantidade):
+        ids.append(db.criar_projeto(Projeto(
+            id=None, nome=f"carga-{i}", descricao="Projeto do teste de carga",
+            pasta_local=None, arquivo_principal=None, etapa_atual=etapa
+        )))
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga com clientes simultâneos")
+    parser.add_argument("--clientes", default="1,5,10,20",
+                        help="quantidade de clientes, ou lista para varrer vários níveis")
+    parser.add_argument("--duracao", type=float, default=30, help="segundos por nível")
+    parser.add_argument("--modo", choices=["processos", "threads"], default="processos")
+    parser.add_argument("--mix", type=_mix, default=_mix(MIX_PADRAO),
+                        help=f"pesos das operações (padrão {MIX_PADRAO})")
+    parser.add_argument("--projetos", type=int, default=200, help="projetos criados para a carga")
+    parser.add_argument("--pausa-ms", type=float, default=0,
+                        help="pausa entre operações de um cliente (tempo de reação do usuário)")
+    parser.add_argument("--preparo", type=float, default=2,
+                        help="segundos para todos os clientes conectarem antes de começar")
+    parser.add_argument("--database", help="banco a usar (padrão: o configurado no .env)")
+    parser.add_argument("--replicas", help="réplicas de leitura host[:porta],... (padrão: DB_REPLICAS)")
+    parser.add_argument("--janela", type=float, default=AppConfig.REPLICA_READ_WINDOW,
+                        help="segundos de leitura no primário depois de uma escrita do cliente")
+    args = parser.parse_args()
+
+    config = get_database_config()
+    if args.database:
+        config["database"] = args.database
+    config["replicas"] = get_replicas_config(args.replicas)
+    config["janela_leitura"] = args.janela
+    if config["replicas"]:
+        print(f"Lendo de {len(config['replicas'])} réplica(s), janela de {args.janela:g}s")
+    niveis = [int(n) for n in args.clientes.split(",")]
+
+    db = Database(**config)
+    print(f"Criando {args.projetos} projetos de carga em {config['database']}...")
+    projeto_ids = preparar(db, args.projetos)
+    etapa_ids = [etapa.id for etapa in db.get_etapas()]
+
+    resumo = []
+    try:
+        for clientes in niveis:
+            total = rodar_nivel(config, clientes, args, projeto_ids, etapa_ids)
+            resumo.append((clientes, *relatorio(clientes, total, args.duracao)))
+    finally:
+        print("\nExcluindo os projetos de carga...")
+        for projeto_id in projeto_ids:
+            db.excluir_projeto(projeto_id)
+        db.close()
+
+    if len(resumo) > 1:
+        print("\n=== Escalabilidade ===")
+        print(f"{'clientes':>8} {'ops/s':>9} {'por cliente':>12} {'p95 ms':>8} {'p99 ms':>8} {'falhas':>7}")
+        for clientes, vazao, p95, p99, falhas in resumo:
+            print(f"{clientes:>8} {vazao:>9.1f} {vazao / clientes:>12.1f} "
+                  f"{p95:>8.2f} {p99:>8.2f} {falhas:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Conferência e benchmark dos valores em centavos inteiros
+
+Uso:
+    python bench_dinheiro.py [--valores 200000] [--projetos 5000] [--repeticoes 5]
+
+Não precisa de banco. Primeiro confere, para valores aleatórios (incluindo
+negativos, zero e milhões), que o módulo dinheiro produz exatamente o mesmo
+texto que o caminho antigo com Decimal (f"R$ {d:,.2f}" e str(d)), que
+centavos() lê o que o usuário digitava e que as somas batem. Qualquer
+divergência é listada e o script sai com código 1.
+
+Depois mede a carga do quadro nas duas representações: montar os Projeto
+a partir das linhas como o cursor devolve (Decimal vs int), somar as
+receitas por etapa e formatar o texto dos cartões.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+import dinheiro
+from models import Projeto
+
+
+def _valores(rng: random.Random, quantidade: int) -> list:
+    """Centavos aleatórios em várias ordens de grandeza, mais os casos de borda"""
+    valores = [0, 1, -1, 99, 100, -100, 99999, 100000, 123456789, -123456789]
+    for _ in range(quantidade):
+        valores.append(rng.randint(-10 ** rng.randint(1, 10), 10 ** rng.randint(1, 10)))
+    return valores
+
+
+def conferir(valores: list) -> list:
+    """Lista as divergências entre o caminho em centavos e o caminho com Decimal"""
+    erros = []
+    soma_decimal = Decimal("0.00")
+    soma_centavos = 0
+    for c in valores:
+        d = Decimal(c) / 100
+        d = d.quantize(dinheiro.CENTAVO)
+        esperado = f"R$ {d:,.2f}"
+        if dinheiro.formatar(c) != esperado:
+            erros.append(f"formatar({c}) = {dinheiro.formatar(c)!r}, esperado {esperado!r}")
+        if dinheiro.texto(c) != str(d):
+            erros.append(f"texto({c}) = {dinheiro.texto(c)!r}, esperado {str(d)!r}")
+        if dinheiro.para_decimal(c) != d:
+            erros.append(f"para_decimal({c}) = {dinheiro.para_decimal(c)}, esperado {d}")
+        for digitado in (str(d), str(d).replace(".", ",")):
+            if dinheiro.centavos(digitado) != c:
+                erros.append(f"centavos({digitado!r}) = {dinheiro.centavos(digitado)}, esperado {c}")
+        soma_decimal += d
+        soma_centavos += c
+    if dinheiro.para_decimal(soma_centavos) != soma_decimal:
+        erros.append(f"soma em centavos {soma_centavos} difere da soma Decimal {soma_decimal}")
+
+    # Frações de centavo arredondam como o DECIMAL(12, 2) do MySQL
+    for digitado, esperado in (("0.005", 1), ("0.004", 0), ("-0.005", -1), ("1,999", 200)):
+        if dinheiro.centavos(digitado) != esperado:
+            erros.append(f"centavos({digitado!r}) = {dinheiro.centavos(digitado)}, esperado {esperado}")
+    for invalido in ("", "abc", "1.2.3", "NaN", "Infinity", "1e100", "-1e30", "10000000000.00"):
+        try:
+            dinheiro.centavos(invalido)
+            erros.append(f"centavos({invalido!r}) deveria levantar ValueError")
+        except ValueError:
+            pass
+    return erros
+
+
+def _linhas(rng: random.Random, projetos: int, etapas: int) -> list:
+    """Linhas no formato de get_projetos; a receita vai como texto para virar Decimal ou int"""
+    linhas = []
+    for i in range(projetos):
+        centavos = rng.randint(0, 5000000)
+        linhas.append((i + 1, f"Projeto {i}", None, None, None, rng.randint(1, etapas),
+                       None, None, centavos))
+    return linhas
+
+
+def _carga_decimal(linhas: list) -> tuple:
+    projetos = [Projeto(id=r[0], nome=r[1], descricao=r[2], pasta_local=r[3],
+                        arquivo_principal=r[4], etapa_atual=r[5],
+                        receita_total=Decimal(r[8]) / 100) for r in linhas]
+    totais = {}
+    for p in projetos:
+        totais[p.etapa_atual] = totais.get(p.etapa_atual, Decimal("0")) + p.receita_total
+    textos = [f"R$ {p.receita_total:,.2f}" for p in projetos]
+    return totais, textos
+
+
+def _carga_centavos(linhas: list) -> tuple:
+    projetos = [Projeto(id=r[0], nome=r[1], descricao=r[2], pasta_local=r[3],
+                        arquivo_principal=r[4], etapa_atual=r[5],
+                        receita_total=r[8]) for r in linhas]
+    totais = {}
+    for p in projetos:
+        totais[p.etapa_atual] = totais.get(p.etapa_atual, 0) + p.receita_total
+    textos = [dinheiro.formatar(p.receita_total) for p in projetos]
+    return totais, textos
+
+
+def medir(funcao, linhas: list, repeticoes: int) -> list:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(linhas)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conferência e benchmark dos centavos inteiros")
+    parser.add_argument("--valores", type=int, default=200000, help="valores aleatórios conferidos")
+    parser.add_argument("--projetos", type=int, default=5000, help="projetos na carga simulada")
+    parser.add_argument("--etapas", type=int, default=6)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"Conferindo {args.valores} valores contra o caminho com Decimal...")
+    erros = conferir(_valores(rng, args.valores))
+    if erros:
+        for erro in erros[:20]:
+            print(f"❌ {erro}")
+        print(f"❌ {len(erros)} divergência(s)")
+        sys.exit(1)
+    print("✅ Texto, conversões e somas idênticos")
+
+    linhas = _linhas(rng, args.projetos, args.etapas)
+    totais_d, textos_d = _carga_decimal(linhas)
+    totais_c, textos_c = _carga_centavos(linhas)
+    if textos_d != textos_c or {e: dinheiro.centavos(v) for e, v in totais_d.items()} != totais_c:
+        print("❌ As duas cargas produziram quadros diferentes")
+        sys.exit(1)
+
+    print(f"\nCarga do quadro com {args.projetos} projetos ({args.repeticoes} repetições):")
+    print(f"{'representação':<16} {'mediana ms':>11} {'mín ms':>9}")
+    resultados = {}
+    for nome, funcao in (("Decimal", _carga_decimal), ("centavos", _carga_centavos)):
+        # A primeira repetição dos centavos inclui o preenchimento do cache de formatar()
+        dinheiro.formatar.cache_clear()
+        tempos = medir(funcao, linhas, args.repeticoes)
+        resultados[nome] = statistics.median(tempos)
+        print(f"{nome:<16} {resultados[nome]:>11.2f} {min(tempos):>9.2f}")
+    print(f"\nGanho: {resultados['Decimal'] / resultados['centavos']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Benchmark dos índices e do particionamento de faturamentos
+
+Uso:
+    python bench_faturamentos.py [--linhas 1000000] [--projetos 2000] [--amostras 200]
+
+Cria um banco separado (kanban_bench por padrão, apagado ao final com
+--limpar), gera os faturamentos uma vez e copia para três variantes da
+tabela:
+
+    original      PK (id), idx_projeto_id, idx_data
+    cobertura     PK (id), idx_projeto_data_id_valor, idx_data
+    particionado  cobertura + PK (id, data_faturamento) e RANGE por ano
+
+Para cada variante e consulta mostra o plano (EXPLAIN) e a latência
+mediana e p95.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+import mysql.connector
+
+from config import get_database_config
+
+
+COLUNAS = """
+    id INT AUTO_INCREMENT,
+    projeto_id INT NOT NULL,
+    valor DECIMAL(12, 2) NOT NULL,
+    descricao VARCHAR(255),
+    data_faturamento DATE NOT NULL,
+    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+"""
+
+
+def _particoes(ano_inicial: int, ano_final: int) -> str:
+    particoes = [f"PARTITION p_antigo VALUES LESS THAN ({ano_inicial})"]
+    particoes += [f"PARTITION p{ano} VALUES LESS THAN ({ano + 1})"
+                  for ano in range(ano_inicial, ano_final + 1)]
+    particoes.append("PARTITION p_futuro VALUES LESS THAN MAXVALUE")
+    return ",\n        ".join(particoes)
+
+
+def variantes(ano_inicial: int, ano_final: int) -> dict:
+    return {
+        "original": f"""
+            CREATE TABLE fat_original ({COLUNAS},
+                PRIMARY KEY (id),
+                INDEX idx_projeto_id (projeto_id),
+                INDEX idx_data (data_faturamento))
+        """,
+        "cobertura": f"""
+            CREATE TABLE fat_cobertura ({COLUNAS},
+                PRIMARY KEY (id),
+                INDEX idx_projeto_data_id_valor (projeto_id, data_faturamento, id, valor),
+                INDEX idx_data (data_faturamento))
+        """,
+        "particionado": f"""
+            CREATE TABLE fat_particionado ({COLUNAS},
+                PRIMARY KEY (id, data_faturamento),
+                INDEX idx_projeto_data_id_valor (projeto_id, data_faturamento, id, valor),
+                INDEX idx_data (data_faturamento))
+            PARTITION BY RANGE (YEAR(data_faturamento)) (
+                {_particoes(ano_inicial, ano_final)}
+            )
+        """,
+    }
+
+
+# (nome, SQL com {tabela}, parâmetro por execução: "projeto" ou "data")
+CONSULTAS = [
+    ("historico_projeto", """
+        SELECT id, projeto_id, valor, descricao, data_faturamento, data_criacao
+        FROM {tabela} WHERE projeto_id = %s ORDER BY data_faturamento DESC
+    """, "projeto"),
+    ("receita_projeto", """
+        SELECT COALESCE(SUM(valor), 0) FROM {tabela} WHERE projeto_id = %s
+    """, "projeto"),
+    ("receita_todos_projetos", """
+        SELECT projeto_id, SUM(valor) FROM {tabela} GROUP BY projeto_id
+    """, None),
+    ("receita_mensal_12m", """
+        SELECT YEAR(data_faturamento) AS ano, MONTH(data_faturamento) AS mes, SUM(valor)
+        FROM {tabela} WHERE data_faturamento >= %s GROUP BY ano, mes
+    """, "data"),
+]
+
+
+def gerar_dados(cursor, conexao, linhas: int, projetos: int, anos: int, lote: int = 10000):
+    """Gera os faturamentos uma única vez na tabela fat_base"""
+    cursor.execute(f"CREATE TABLE fat_base ({COLUNAS}, PRIMARY KEY (id))")
+    rng = random.Random(42)
+    hoje = date.today()
+    dias = anos * 365
+    inicio = time.perf_counter()
+    for feitas in range(0, linhas, lote):
+        valores = [
+            (rng.randint(1, projetos), f"{rng.uniform(10, 5000):.2f}", f"Fatura {feitas + i}",
+             hoje - timedelta(days=rng.randrange(dias)))
+            for i in range(min(lote, linhas - feitas))
+        ]
+        cursor.executemany(
+            "INSERT INTO fat_base (projeto_id, valor, descricao, data_faturamento) "
+            "VALUES (%s, %s, %s, %s)", valores)
+        conexao.commit()
+        print(f"\r  {feitas + len(valores):,} / {linhas:,} linhas", end="", flush=True)
+    print(f"\n  gerado em {time.perf_counter() - inicio:.1f}s")
+
+
+def explicar(cursor, sql: str, params) -> list:
+    cursor.execute("EXPLAIN " + sql, params)
+    nomes = [d[0] for d in cursor.description]
+    return [dict(zip(nomes, row)) for row in cursor.fetchall()]
+
+
+def medir(cursor, sql: str, gerar_params, amostras: int) -> tuple:
+    tempos = []
+    for _ in range(amostras):
+        params = gerar_params()
+        inicio = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return statistics.median(tempos), tempos[int(len(tempos) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de índices de faturamentos")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--projetos", type=int, default=2000)
+    parser.add_argument("--anos", type=int, default=6, help="anos de histórico gerado")
+    parser.add_argument("--amostras", type=int, default=200,
+                        help="execuções por consulta por projeto/data")
+    parser.add_argument("--database", default="kanban_bench")
+    parser.add_argument("--limpar", action="store_true", help="apaga o banco de benchmark ao final")
+    args = parser.parse_args()
+
+    config = get_database_config()
+    config.pop("database")
+    conexao = mysql.connector.connect(**config)
+    cursor = conexao.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {args.database}")
+    cursor.execute(f"USE {args.database}")
+
+    cursor.execute("SHOW TABLES LIKE 'fat_base'")
+    if cursor.fetchone() is None:
+        print(f"Gerando {args.linhas:,} faturamentos para {args.projetos:,} projetos...")
+        gerar_dados(cursor, conexao, args.linhas, args.projetos, args.anos)
+    else:
+        print("Reaproveitando fat_base existente")
+
+    hoje = date.today()
+    ddl = variantes(hoje.year - args.anos, hoje.year)
+    for nome, create in ddl.items():
+        cursor.execute(f"DROP TABLE IF EXISTS fat_{nome}")
+        cursor.execute(create)
+        inicio = time.perf_counter()
+        cursor.execute(f"INSERT INTO fat_{nome} SELECT * FROM fat_base")
+        conexao.commit()
+        cursor.execute(f"ANALYZE TABLE fat_{nome}")
+        cursor.fetchall()
+        print(f"  fat_{nome}: carregada em {time.perf_counter() - inicio:.1f}s")
+
+    rng = random.Random(7)
+    geradores = {
+        "projeto": lambda: (rng.randint(1, args.projetos),),
+        "data": lambda: (hoje.replace(day=1) - timedelta(days=365),),
+        None: lambda: (),
+    }
+
+    resultados = []
+    for consulta, sql_modelo, parametro in CONSULTAS:
+        print(f"\n=== {consulta} ===")
+        amostras = args.amostras if parametro == "projeto" else max(5, args.amostras // 20)
+        for nome in ddl:
+            sql = sql_modelo.format(tabela=f"fat_{nome}")
+            plano = explicar(cursor, sql, geradores[parametro]())
+            mediana, p95 = medir(cursor, sql, geradores[parametro], amostras)
+            resultados.append((consulta, nome, mediana, p95))
+            print(f"  {nome:<13} mediana {mediana:8.2f} ms   p95 {p95:8.2f} ms")
+            for linha in plano:
+                print(f"      type={linha.get('type')} key={linha.get('key')} "
+                      f"rows={linha.get('rows')} partitions={linha.get('partitions')} "
+                      f"extra={linha.get('Extra')}")
+
+    print("\n=== Resumo (mediana, ms) ===")
+    print(f"{'consulta':<24}" + "".join(f"{nome:>14}" for nome in ddl))
+    for consulta, _, _ in CONSULTAS:
+        linha = [r for r in resultados if r[0] == consulta]
+        print(f"{consulta:<24}" + "".join(f"{r[2]:>14.2f}" for r in linha))
+
+    if args.limpar:
+        cursor.execute(f"DROP DATABASE {args.database}")
+    cursor.close()
+    conexao.close()
+
+
+if __name__ == "__main__":
+    main()
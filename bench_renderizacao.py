@@ -0,0 +1,124 @@
+"""
+Benchmark dos renderizadores de cartões (widgets vs canvas)
+
+Uso:
+    python bench_renderizacao.py [--cartoes 300] [--repeticoes 5] [--meta 10]
+    xvfb-run python bench_renderizacao.py      # em servidor sem display
+
+Não precisa de banco, mas precisa de display e do customtkinter. Para
+cada renderizador cria uma coluna numa janela real e mede, a cada
+repetição, a carga como o _load_projetos faz (um adicionar_projeto por
+projeto, depois o Tk desenha tudo com update()) e a limpeza da coluna. Os
+projetos são gerados com nomes, descrições e receitas variados.
+
+Mostra cartões por segundo na carga de cada renderizador e o ganho do
+canvas; sai com código 1 se o ganho ficar abaixo de --meta e com código 2,
+sem medir nada, se faltar o customtkinter ou o display.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import tkinter
+from datetime import datetime, timedelta
+
+from config import UIConfig
+from models import Etapa, Projeto
+
+
+ETAPAS = [Etapa(1, "Backlog", 1), Etapa(2, "Em Andamento", 2),
+          Etapa(3, "Em Revisão", 3), Etapa(4, "Concluído", 4)]
+
+
+def gerar_projetos(rng: random.Random, quantidade: int) -> list:
+    agora = datetime.now()
+    return [
+        Projeto(
+            id=i + 1,
+            nome=f"Projeto {i} " + "x" * rng.randint(0, 30),
+            descricao="Descrição do projeto " * rng.randint(0, 4) or None,
+            pasta_local=None,
+            arquivo_principal=None,
+            etapa_atual=2,
+            data_criacao=agora - timedelta(days=rng.randint(30, 400)),
+            data_atualizacao=agora - timedelta(days=rng.randint(0, 30)),
+            receita_total=rng.randint(0, 5000000)
+        )
+        for i in range(quantidade)
+    ]
+
+
+def medir(root, classe, projetos: list, repeticoes: int) -> tuple:
+    """Tempos (ms) de carga e de limpeza de uma coluna do renderizador"""
+    # As colunas só guardam a referência ao banco; nenhuma ação é disparada
+    coluna = classe(root, ETAPAS[1], ETAPAS, lambda acao, dados: None, database=object())
+    coluna.pack(fill="both", expand=True)
+    root.update()
+    cargas, limpezas = [], []
+    try:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            for projeto in projetos:
+                coluna.adicionar_projeto(projeto)
+            root.update()
+            cargas.append((time.perf_counter() - inicio) * 1000)
+
+            inicio = time.perf_counter()
+            coluna.limpar()
+            root.update()
+            limpezas.append((time.perf_counter() - inicio) * 1000)
+    finally:
+        coluna.destroy()
+        root.update()
+    return cargas, limpezas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dos renderizadores de cartões")
+    parser.add_argument("--cartoes", type=int, default=300, help="cartões na coluna")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--meta", type=float, default=10.0,
+                        help="ganho mínimo do canvas em cartões por segundo")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    try:
+        import customtkinter as ctk
+        from gui import CanvasKanbanColumn, KanbanColumn
+    except ImportError as e:
+        print(f"❌ Não medido: {e} (pip install -r requirements.txt)")
+        return 2
+
+    projetos = gerar_projetos(random.Random(args.seed), args.cartoes)
+    try:
+        root = ctk.CTk()
+    except tkinter.TclError as e:
+        print(f"❌ Não medido, sem display: {e} (rode com xvfb-run)")
+        return 2
+    root.geometry(f"{UIConfig.WINDOW_WIDTH}x{UIConfig.WINDOW_HEIGHT}")
+
+    print(f"Coluna com {args.cartoes} cartões ({args.repeticoes} repetições):")
+    print(f"{'renderizador':<14} {'carga ms':>9} {'cartões/s':>10} {'limpeza ms':>11}")
+    por_segundo = {}
+    try:
+        for nome, classe in (("widgets", KanbanColumn), ("canvas", CanvasKanbanColumn)):
+            cargas, limpezas = medir(root, classe, projetos, args.repeticoes)
+            carga = statistics.median(cargas)
+            por_segundo[nome] = args.cartoes / (carga / 1000)
+            print(f"{nome:<14} {carga:>9.1f} {por_segundo[nome]:>10.0f} "
+                  f"{statistics.median(limpezas):>11.1f}")
+    finally:
+        root.destroy()
+
+    ganho = por_segundo["canvas"] / por_segundo["widgets"]
+    print(f"\nGanho do canvas: {ganho:.1f}x (meta {args.meta:g}x)")
+    if ganho < args.meta:
+        print("❌ Abaixo da meta")
+        return 1
+    print("✓ Meta atingida")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Busca - Índice de trigramas em memória para a busca instantânea do quadro
+"""
+import unicodedata
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from db import DatabaseError
+from models import Projeto
+
+
+def normalizar(texto: Optional[str]) -> str:
+    """Converte para minúsculas e remove acentos"""
+    if not texto:
+        return ""
+    if texto.isascii():
+        return texto.lower()
+    decomposto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def trigramas(texto: str) -> Set[str]:
+    """Retorna o conjunto de trigramas de um texto já normalizado"""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class TrigramIndex:
+    """Índice invertido trigrama -> IDs de projeto
+
+    Uma busca intersecta os conjuntos dos trigramas da consulta, começando
+    pelo menor, e confirma os candidatos com uma busca de substring. Consultas
+    com menos de três caracteres caem numa varredura linear dos textos.
+    Enquanto o usuário digita, cada consulta que estende a anterior apenas
+    refina o último resultado.
+    """
+
+    CAMPOS = ("nome", "descricao", "pasta_local")
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._textos: Dict[int, str] = {}
+        self._versao = 0
+        self._ultima_busca: Optional[Tuple[int, str, Set[int]]] = None
+
+    def __len__(self):
+        return len(self._textos)
+
+    def _texto_projeto(self, projeto: Projeto) -> str:
+        # \x00 separa os campos para que nenhum trigrama atravesse dois deles
+        return "\x00".join(normalizar(getattr(projeto, campo)) for campo in self.CAMPOS)
+
+    def carregar(self, projetos: Iterable[Projeto]):
+        """Indexa uma lista de projetos (carga inicial)"""
+        for projeto in projetos:
+            self.atualizar(projeto)
+
+    def atualizar(self, projeto: Projeto):
+        """Indexa ou reindexa um projeto, tocando apenas os trigramas alterados"""
+        texto = self._texto_projeto(projeto)
+        antigo = self._textos.get(projeto.id)
+        if antigo == texto:
+            return
+
+        novos = trigramas(texto)
+        velhos = trigramas(antigo) if antigo is not None else set()
+        for trigrama in velhos - novos:
+            ids = self._postings.get(trigrama)
+            if ids is not None:
+                ids.discard(projeto.id)
+                if not ids:
+                    del self._postings[trigrama]
+        for trigrama in novos - velhos:
+            self._postings.setdefault(trigrama, set()).add(projeto.id)
+        self._textos[projeto.id] = texto
+        self._versao += 1
+
+    def remover(self, projeto_id: int):
+        """Remove um projeto do índice"""
+        texto = self._textos.pop(projeto_id, None)
+        if texto is None:
+            return
+        for trigrama in trigramas(texto):
+            ids = self._postings.get(trigrama)
+            if ids is not None:
+                ids.discard(projeto_id)
+                if not ids:
+                    del self._postings[trigrama]
+        self._versao += 1
+
+    def renomear_id(self, antigo_id: int, novo_id: int):
+        """Troca o ID de um projeto (ex.: ID temporário do journal)"""
+        texto = self._textos.pop(antigo_id, None)
+        if texto is None:
+            return
+        for trigrama in trigramas(texto):
+            ids = self._postings[trigrama]
+            ids.discard(antigo_id)
+            ids.add(novo_id)
+        self._textos[novo_id] = texto
+        self._versao += 1
+
+    def buscar(self, consulta: str) -> Optional[Set[int]]:
+        """Retorna os IDs que contêm a consulta, ou None se ela estiver vazia"""
+        termo = normalizar(consulta).strip()
+        if not termo:
+            return None
+
+        resultado = self._buscar_termo(termo)
+        self._ultima_busca = (self._versao, termo, resultado)
+        return resultado
+
+    def _buscar_termo(self, termo: str) -> Set[int]:
+        textos = self._textos
+        if self._ultima_busca is not None:
+            versao, anterior, resultado = self._ultima_busca
+            if versao == self._versao and anterior in termo:
+                return {pid for pid in resultado if termo in textos[pid]}
+
+        if len(termo) < 3:
+            return {pid for pid, texto in textos.items() if termo in texto}
+        if len(termo) == 3:
+            return set(self._postings.get(termo, ()))
+
+        conjuntos = []
+        for trigrama in trigramas(termo):
+            ids = self._postings.get(trigrama)
+            if not ids:
+                return set()
+            conjuntos.append(ids)
+        conjuntos.sort(key=len)
+
+        candidatos = set(conjuntos[0])
+        for ids in conjuntos[1:]:
+            candidatos &= ids
+            if not candidatos:
+                return candidatos
+        return {pid for pid in candidatos if termo in textos[pid]}
+
+
+class BuscaProjetos:
+    """Observer que mantém o TrigramIndex em dia com os eventos do Database"""
+
+    def __init__(self, database):
+        self.database = database
+        self.index = TrigramIndex()
+
+    def carregar(self, projetos: Iterable[Projeto]):
+        """Semeia o índice com os projetos já carregados"""
+        self.index.carregar(projetos)
+
+    def buscar(self, consulta: str) -> Optional[Set[int]]:
+        """Atalho para TrigramIndex.buscar"""
+        return self.index.buscar(consulta)
+
+    def update(self, event: str, data: dict = None):
+        """Implementação do Observer - atualiza apenas o projeto afetado"""
+        data = data or {}
+        if event == "projeto_excluido":
+            self.index.remover(data["projeto_id"])
+        elif event == "projetos_arquivados":
+            for projeto_id in data["projeto_ids"]:
+                self.index.remover(projeto_id)
+        elif event in ("projeto_criado", "projeto_atualizado", "projeto_desarquivado"):
+            projeto = data.get("projeto")
+            if projeto is None:
+                try:
+                    projeto = self.database.get_projeto_by_id(data["projeto_id"])
+                except DatabaseError as e:
+                    print(f"⚠️ Índice de busca não atualizado: {e}")
+                    return
+            if projeto is not None:
+                self.index.atualizar(projeto)
+        elif event == "alteracoes_remotas":
+            for projeto in data["projetos"]:
+                self.index.atualizar(projeto)
+            for projeto_id in data["excluidos"]:
+                self.index.remover(projeto_id)
+        elif event == "journal_sincronizado":
+            for antigo_id, novo_id in data.get("id_map", {}).items():
+                self.index.renomear_id(antigo_id, novo_id)
@@ -0,0 +1,213 @@
+"""
+Colunar - Motor NumPy para análises sobre todos os faturamentos
+
+Os faturamentos ficam em arrays colunares (centavos inteiros, datas
+datetime64, IDs de projeto int32) salvos em arquivos .npy que são abertos
+com memory-map na sessão seguinte. Só as linhas com id acima da marca
+d'água gravada são buscadas no MySQL.
+
+Cada gravação usa arquivos novos (coluna-VERSAO.npy) e só então aponta o
+meta.json para eles: no Windows um arquivo mapeado não pode ser
+substituído nem apagado, então as versões antigas são removidas quando
+deixam de estar abertas.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: só este módulo depende dele
+    np = None
+
+from db import Database
+
+
+def disponivel() -> bool:
+    """Indica se o numpy está instalado"""
+    return np is not None
+
+
+def _somar_por_grupo(grupos, centavos, tamanho: int):
+    """Group-by vetorizado: soma de centavos por índice de grupo
+
+    bincount acumula em float64, exato para inteiros até 2**53 centavos.
+    """
+    somas = np.bincount(grupos, weights=centavos, minlength=tamanho)
+    return np.rint(somas).astype(np.int64)
+
+
+class FaturamentosColunares:
+    """Faturamentos em colunas NumPy com cache incremental em disco"""
+
+    COLUNAS = ("ids", "projeto_ids", "centavos", "datas")
+
+    def __init__(self, database: Database, cache_dir):
+        if np is None:
+            raise RuntimeError("numpy não está instalado: pip install numpy")
+        self.database = database
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.projeto_ids = np.empty(0, dtype=np.int32)
+        self.centavos = np.empty(0, dtype=np.int64)
+        self.datas = np.empty(0, dtype="datetime64[D]")
+        self.watermark = 0
+        self.versao = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.cache_dir / "meta.json"
+
+    def _arquivo(self, coluna: str, versao: int) -> Path:
+        return self.cache_dir / f"{coluna}-{versao}.npy"
+
+    def _carregar_cache(self) -> bool:
+        """Abre os arrays salvos com memory-map; retorna False se não houver cache"""
+        if not self._meta_path.exists():
+            return False
+        try:
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            for coluna in self.COLUNAS:
+                setattr(self, coluna, np.load(self._arquivo(coluna, meta["versao"]), mmap_mode="r"))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Cache colunar inválido, recarregando tudo: {e}")
+            return False
+        self.watermark = meta["watermark"]
+        self.versao = meta["versao"]
+        return len(self.ids) == meta["linhas"]
+
+    def _salvar_cache(self):
+        """Grava as colunas numa versão nova e aponta o meta.json para ela
+
+        Os arquivos da versão atual podem estar mapeados (por este objeto ou
+        por views que alguém ainda guarda), então nunca são sobrescritos.
+        """
+        versao = self.versao + 1
+        for coluna in self.COLUNAS:
+            np.save(self._arquivo(coluna, versao), getattr(self, coluna))
+        tmp_path = self._meta_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"watermark": self.watermark, "linhas": len(self.ids), "versao": versao}),
+            encoding="utf-8"
+        )
+        os.replace(tmp_path, self._meta_path)
+        self.versao = versao
+        self._remover_versoes_antigas()
+
+    def _remover_versoes_antigas(self):
+        """Apaga os .npy de versões anteriores que já não estão abertos"""
+        atuais = {self._arquivo(coluna, self.versao) for coluna in self.COLUNAS}
+        for path in self.cache_dir.glob("*.npy"):
+            if path in atuais:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                # Ainda mapeado (Windows): sai numa próxima gravação
+                pass
+
+    def _resetar(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.projeto_ids = np.empty(0, dtype=np.int32)
+        self.centavos = np.empty(0, dtype=np.int64)
+        self.datas = np.empty(0, dtype="datetime64[D]")
+        self.watermark = 0
+
+    def atualizar(self) -> int:
+        """Sincroniza com o banco e retorna quantas linhas novas foram lidas
+
+        Exclusões não movem a marca d'água; elas são detectadas comparando a
+        contagem de linhas até a marca, e nesse caso o cache é refeito.
+        """
+        if self._carregar_cache():
+            if self.database.contar_faturamentos(self.watermark) != len(self.ids):
+                print("⚠️ Faturamentos excluídos desde o último cache, recarregando")
+                self._resetar()
+        else:
+            self._resetar()
+
+        novos = {coluna: [] for coluna in self.COLUNAS}
+        lidas = 0
+        for lote in self.database.iter_faturamentos_brutos(self.watermark):
+            ids, projeto_ids, centavos, datas = zip(*lote)
+            novos["ids"].append(np.array(ids, dtype=np.int64))
+            novos["projeto_ids"].append(np.array(projeto_ids, dtype=np.int32))
+            novos["centavos"].append(np.array(centavos, dtype=np.int64))
+            novos["datas"].append(np.array(datas, dtype="datetime64[D]"))
+            lidas += len(lote)
+
+        if lidas:
+            for coluna in self.COLUNAS:
+                setattr(self, coluna, np.concatenate([getattr(self, coluna)] + novos[coluna]))
+            self.watermark = int(self.ids[-1])
+            self._salvar_cache()
+        return lidas
+
+    def _indices_mensais(self) -> Tuple["np.ndarray", "np.datetime64"]:
+        """Converte as datas em deslocamentos de mês a partir do primeiro mês"""
+        meses = self.datas.astype("datetime64[M]")
+        inicio = meses.min()
+        return (meses - inicio).astype(np.int64), inicio
+
+    def receita_mensal(self) -> List[Tuple[str, int]]:
+        """Total em centavos de cada mês, do primeiro ao último faturamento"""
+        if not len(self):
+            return []
+        indices, inicio = self._indices_mensais()
+        totais = _somar_por_grupo(indices, self.centavos, int(indices.max()) + 1)
+        return [(str(inicio + i), int(total)) for i, total in enumerate(totais)]
+
+    def receita_movel_12m(self) -> List[Tuple[str, int]]:
+        """Soma móvel dos últimos 12 meses, em centavos, para cada mês"""
+        mensal = self.receita_mensal()
+        if not mensal:
+            return []
+        totais = np.array([total for _, total in mensal], dtype=np.int64)
+        acumulado = np.concatenate([[0], np.cumsum(totais)])
+        janela = acumulado[1:] - acumulado[np.maximum(np.arange(1, len(acumulado)) - 12, 0)]
+        return [(mes, int(total)) for (mes, _), total in zip(mensal, janela)]
+
+    def crescimento_por_projeto(self, referencia=None) -> Dict[int, Tuple[int, int, float]]:
+        """Receita dos últimos 12 meses contra os 12 anteriores, por projeto
+
+        Retorna {projeto_id: (atual, anterior, crescimento)}; o crescimento é
+        NaN quando não houve receita no período anterior.
+        """
+        if not len(self):
+            return {}
+        if referencia is None:
+            referencia = self.datas.max()
+        fim = np.datetime64(referencia, "D")
+        meio = (fim.astype("datetime64[M]") - 11).astype("datetime64[D]")
+        inicio = (fim.astype("datetime64[M]") - 23).astype("datetime64[D]")
+
+        tamanho = int(self.projeto_ids.max()) + 1
+        atual_mask = (self.datas >= meio) & (self.datas <= fim)
+        anterior_mask = (self.datas >= inicio) & (self.datas < meio)
+        atual = _somar_por_grupo(self.projeto_ids[atual_mask], self.centavos[atual_mask], tamanho)
+        anterior = _somar_por_grupo(self.projeto_ids[anterior_mask], self.centavos[anterior_mask], tamanho)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crescimento = np.where(anterior > 0, (atual - anterior) / anterior, np.nan)
+
+        projetos = np.nonzero((atual > 0) | (anterior > 0))[0]
+        return {int(pid): (int(atual[pid]), int(anterior[pid]), float(crescimento[pid]))
+                for pid in projetos}
+
+    def previsao(self, meses: int = 3, historico: int = 12) -> List[Tuple[str, int]]:
+        """Projeção linear simples dos próximos meses a partir do histórico recente"""
+        mensal = self.receita_mensal()[-historico:]
+        if len(mensal) < 2:
+            return []
+        y = np.array([total for _, total in mensal], dtype=np.float64)
+        x = np.arange(len(y))
+        inclinacao, intercepto = np.polyfit(x, y, 1)
+        ultimo = np.datetime64(mensal[-1][0], "M")
+        futuro = np.arange(len(y), len(y) + meses)
+        valores = np.maximum(inclinacao * futuro + intercepto, 0)
+        return [(str(ultimo + i + 1), int(round(v))) for i, v in enumerate(valores)]
@@ -34,10 +34,68 @@ class AppConfig:
     BASE_DIR = Path(__file__).parent
     LOG_DIR = BASE_DIR / "logs"
     BACKUP_DIR = BASE_DIR / "backups"
+    CACHE_DIR = BASE_DIR / "cache"
     
     # Auto-refresh da interface (em milissegundos)
     REFRESH_INTERVAL = 30000  # 30 segundos
     
+    # Reconciliação dos totais por etapa com o banco (em milissegundos)
+    TOTAIS_RECONCILE_INTERVAL = 300000  # 5 minutos
+    
+    # Projetos da última etapa sem alteração há mais dias que isso vão para
+    # as tabelas de arquivo ao abrir o quadro (None desativa)
+    ARCHIVE_AFTER_DAYS = 180
+    ARCHIVE_PAGE_SIZE = 50
+    
+    # Retenção do change_log usado na sincronização entre clientes
+    CHANGE_LOG_RETENTION_DAYS = 7
+    CHANGE_LOG_BATCH = 1000
+    # Limpeza periódica do change_log pela GUI e pela API (em milissegundos)
+    CHANGE_LOG_PRUNE_INTERVAL = 3600000  # 1 hora
+    
+    # Réplicas de leitura (DB_REPLICAS no .env): depois de uma escrita
+    # deste cliente, as leituras vão ao primário por esta janela (segundos)
+    REPLICA_READ_WINDOW = 5.0
+    
+    # Intervalo de entrega dos resultados das escritas em background
+    WRITER_POLL_INTERVAL = 50
+    
+    # Editor para abrir os projetos; None procura code, devenv e o
+    # abridor padrão do sistema, nessa ordem
+    EDITOR_COMMAND = None
+    
+    # Varredura das pastas dos projetos (processos e intervalo em ms)
+    SCAN_WORKERS = 2
+    SCAN_INTERVAL = 300000  # 5 minutos
+    
+    # Snapshot do último quadro desenhado, para abrir sem esperar o MySQL
+    # (salvo ao sair e, se algo mudou, a cada intervalo em ms)
+    SNAPSHOT_FILE = CACHE_DIR / "quadro.json.gz"
+    SNAPSHOT_INTERVAL = 60000  # 1 minuto
+    
+    # Journal de mutações feitas sem conexão com o MySQL
+    JOURNAL_FILE = BASE_DIR / "journal" / "mutacoes.jsonl"
+    JOURNAL_BATCH_SIZE = 100
+    JOURNAL_SYNC_INTERVAL = 10000  # 10 segundos
+    
+    # Ordem manual dos cartões: uma etapa com posições maiores que isso
+    # (em caracteres; a coluna comporta 64) é renumerada em background
+    RANK_MAX_LENGTH = 16
+    
+    # Histórico de faturamentos: linhas por página
+    HISTORY_PAGE_SIZE = 100
+    
+    # Cache dos faturamentos dos cartões visíveis: projetos guardados e
+    # intervalo (ms) entre as verificações de quais cartões estão na tela
+    FATURAMENTOS_CACHE_SIZE = 200
+    PREFETCH_INTERVAL = 1000
+    
+    # Busca: "local" usa o índice de trigramas em memória,
+    # "servidor" usa o índice FULLTEXT do MySQL
+    SEARCH_MODE = "local"
+    SEARCH_DEBOUNCE_MS = 300
+    SEARCH_LIMIT = 200
+    
     # Configurações de log
     LOG_LEVEL = "INFO"
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -54,6 +112,10 @@ class UIConfig:
     CARD_WIDTH = 280
     CARD_MAX_HEIGHT = 200
     
+    # Renderizador dos cartões: "widgets" (um CTkFrame por cartão) ou
+    # "canvas" (todos os cartões da coluna num único tk.Canvas)
+    BOARD_RENDERER = "widgets"
+    
     # Cores (em hex)
     PRIMARY_COLOR = "#4CAF50"
     SECONDARY_COLOR = "#2196F3"
@@ -88,4 +150,42 @@ class UIConfig:
         QPushButton:hover {
             background-color: #45a049;
         }
-    """
\ No newline at end of file
+    """
+
+
+def get_database_config():
+    """Configurações do banco a partir do .env / variáveis de ambiente"""
+    from dotenv import load_dotenv
+    load_dotenv(AppConfig.BASE_DIR / ".env")
+    
+    config = {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'user': os.getenv('DB_USER', 'root'),
+        'password': os.getenv('DB_PASSWORD', ''),
+        'database': os.getenv('DB_NAME', 'kanban_projects')
+    }
+    if os.getenv('DB_PORT'):
+        config['port'] = int(os.getenv('DB_PORT'))
+    return config
+
+
+def get_replicas_config(texto=None):
+    """Réplicas de leitura como [{'host': ..., 'port': ...}]
+    
+    texto (ou DB_REPLICAS do .env) é uma lista "host[:porta],host[:porta]";
+    usuário, senha e banco são os do primário. Lista vazia sem réplicas.
+    """
+    if texto is None:
+        from dotenv import load_dotenv
+        load_dotenv(AppConfig.BASE_DIR / ".env")
+        texto = os.getenv('DB_REPLICAS', '')
+    replicas = []
+    for item in texto.split(','):
+        host, _, porta = item.strip().partition(':')
+        if not host:
+            continue
+        replica = {'host': host}
+        if porta:
+            replica['port'] = int(porta)
+        replicas.append(replica)
+    return replicas
@@ -0,0 +1,51 @@
+-- Particionamento opcional de faturamentos por ano (RANGE)
+-- Execute uma única vez, depois de database_schema.sql, com a aplicação
+-- parada. Vale a pena com milhões de faturamentos: consultas por período
+-- (receita mensal, relatórios) leem só as partições dos anos envolvidos.
+--
+-- Limitações do MySQL para tabelas particionadas:
+--   * toda chave única precisa conter a coluna de particionamento, então
+--     a chave primária passa a ser (id, data_faturamento)
+--   * chaves estrangeiras não são suportadas: a FK para projetos é
+--     removida e substituída por dois triggers (exclusão em cascata e
+--     rejeição de faturamento para projeto inexistente)
+--
+-- Novos anos caem em p_futuro. Uma vez por ano, separe o ano seguinte:
+--   ALTER TABLE faturamentos REORGANIZE PARTITION p_futuro INTO (
+--       PARTITION p2027 VALUES LESS THAN (2028),
+--       PARTITION p_futuro VALUES LESS THAN MAXVALUE)
+
+USE kanban_projects;
+
+-- Nome gerado pelo MySQL para a FK sem nome do schema (confira com
+-- SHOW CREATE TABLE faturamentos)
+ALTER TABLE faturamentos DROP FOREIGN KEY faturamentos_ibfk_1;
+
+ALTER TABLE faturamentos
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id, data_faturamento);
+
+ALTER TABLE faturamentos
+    PARTITION BY RANGE (YEAR(data_faturamento)) (
+        PARTITION p_antigo VALUES LESS THAN (2020),
+        PARTITION p2020 VALUES LESS THAN (2021),
+        PARTITION p2021 VALUES LESS THAN (2022),
+        PARTITION p2022 VALUES LESS THAN (2023),
+        PARTITION p2023 VALUES LESS THAN (2024),
+        PARTITION p2024 VALUES LESS THAN (2025),
+        PARTITION p2025 VALUES LESS THAN (2026),
+        PARTITION p2026 VALUES LESS THAN (2027),
+        PARTITION p_futuro VALUES LESS THAN MAXVALUE
+    );
+
+-- Substitui o ON DELETE CASCADE da FK removida
+DROP TRIGGER IF EXISTS trg_projetos_delete_faturamentos;
+CREATE TRIGGER trg_projetos_delete_faturamentos AFTER DELETE ON projetos FOR EACH ROW
+    FOLLOWS trg_projetos_delete
+    DELETE FROM faturamentos WHERE projeto_id = OLD.id;
+
+-- Substitui a verificação da FK: projeto inexistente vira NULL numa coluna
+-- NOT NULL, e o INSERT falha com erro de integridade (como antes)
+DROP TRIGGER IF EXISTS trg_faturamentos_projeto_existe;
+CREATE TRIGGER trg_faturamentos_projeto_existe BEFORE INSERT ON faturamentos FOR EACH ROW
+    SET NEW.projeto_id = (SELECT id FROM projetos WHERE id = NEW.projeto_id);
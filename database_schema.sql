@@ -1,5 +1,8 @@
 -- Script de criação do banco de dados para o sistema Kanban
 -- Execute este script no MySQL Workbench ou via linha de comando
+-- Bancos criados por versões anteriores são atualizados pelo aplicativo ao
+-- iniciar ou por python -m kanban migrar (migracoes.py), que aplica só o que
+-- falta. Os ALTER TABLE comentados abaixo são o equivalente manual
 
 CREATE DATABASE IF NOT EXISTS kanban_projects CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 USE kanban_projects;
@@ -31,11 +34,23 @@ CREATE TABLE IF NOT EXISTS projetos (
     etapa_atual INT NOT NULL DEFAULT 1,
     data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     data_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    -- Ordem manual do cartão na etapa (posição fracionária, ver ordem.py);
+    -- ascii_bin para o ORDER BY comparar byte a byte
+    posicao VARCHAR(64) CHARACTER SET ascii COLLATE ascii_bin NOT NULL DEFAULT '',
     FOREIGN KEY (etapa_atual) REFERENCES etapas(id),
-    INDEX idx_etapa (etapa_atual),
-    INDEX idx_nome (nome)
+    INDEX idx_etapa_posicao (etapa_atual, posicao),
+    INDEX idx_nome (nome),
+    FULLTEXT INDEX ft_nome_descricao (nome, descricao)
 );
 
+-- Em bancos criados antes da busca FULLTEXT, execute uma única vez:
+-- ALTER TABLE projetos ADD FULLTEXT INDEX ft_nome_descricao (nome, descricao);
+
+-- Em bancos criados antes da ordem manual, execute uma única vez (os
+-- projetos existentes são numerados na ordem atual pela interface ou por
+-- python -m kanban renumerar):
+-- ALTER TABLE projetos ADD COLUMN posicao VARCHAR(64) CHARACTER SET ascii COLLATE ascii_bin NOT NULL DEFAULT '' AFTER data_atualizacao, ADD INDEX idx_etapa_posicao (etapa_atual, posicao), DROP INDEX idx_etapa;
+
 -- Tabela de histórico de faturamento
 CREATE TABLE IF NOT EXISTS faturamentos (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -45,10 +60,19 @@ CREATE TABLE IF NOT EXISTS faturamentos (
     data_faturamento DATE NOT NULL,
     data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (projeto_id) REFERENCES projetos(id) ON DELETE CASCADE,
-    INDEX idx_projeto_id (projeto_id),
+    -- Cobre o histórico por projeto (filtro + ordem por data e id, a chave
+    -- da paginação) e a soma de valor por projeto da view, sem voltar às
+    -- linhas da tabela; id vem antes de valor para a ordem sair do índice
+    INDEX idx_projeto_data_id_valor (projeto_id, data_faturamento, id, valor),
     INDEX idx_data (data_faturamento)
 );
 
+-- Em bancos criados antes do índice de cobertura, execute uma única vez:
+-- ALTER TABLE faturamentos ADD INDEX idx_projeto_data_id_valor (projeto_id, data_faturamento, id, valor), DROP INDEX idx_projeto_id;
+-- Se já tiver o idx_projeto_data_valor (projeto_id, data_faturamento, valor):
+-- ALTER TABLE faturamentos ADD INDEX idx_projeto_data_id_valor (projeto_id, data_faturamento, id, valor), DROP INDEX idx_projeto_data_valor;
+-- Particionamento anual opcional: ver database_partitioning.sql
+
 -- View para receita total por projeto
 CREATE OR REPLACE VIEW view_receita_projetos AS
 SELECT 
@@ -57,4 +81,92 @@ SELECT
     COALESCE(SUM(f.valor), 0) as receita_total
 FROM projetos p
 LEFT JOIN faturamentos f ON p.id = f.projeto_id
-GROUP BY p.id, p.nome;
\ No newline at end of file
+GROUP BY p.id, p.nome;
+
+-- Arquivo de projetos concluídos: fora do quadro, mas consultável
+CREATE TABLE IF NOT EXISTS projetos_arquivados (
+    id INT PRIMARY KEY,
+    nome VARCHAR(255) NOT NULL,
+    descricao TEXT,
+    pasta_local VARCHAR(500),
+    arquivo_principal VARCHAR(255),
+    etapa_atual INT NOT NULL,
+    data_criacao TIMESTAMP NULL,
+    data_atualizacao TIMESTAMP NULL,
+    data_arquivamento TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_etapa_data (etapa_atual, data_atualizacao),
+    INDEX idx_nome (nome)
+);
+
+CREATE TABLE IF NOT EXISTS faturamentos_arquivados (
+    id INT PRIMARY KEY,
+    projeto_id INT NOT NULL,
+    valor DECIMAL(12, 2) NOT NULL,
+    descricao VARCHAR(255),
+    data_faturamento DATE NOT NULL,
+    data_criacao TIMESTAMP NULL,
+    data_arquivamento TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (projeto_id) REFERENCES projetos_arquivados(id) ON DELETE CASCADE,
+    INDEX idx_projeto_id (projeto_id),
+    INDEX idx_data (data_faturamento)
+);
+
+-- Operações do journal offline já aplicadas (garante replay idempotente)
+CREATE TABLE IF NOT EXISTS journal_operacoes (
+    op_id CHAR(36) PRIMARY KEY,
+    operacao VARCHAR(50) NOT NULL,
+    resultado_id INT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'aplicada',
+    aplicado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Feed de alterações para sincronização incremental entre clientes
+CREATE TABLE IF NOT EXISTS change_log (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    tabela VARCHAR(20) NOT NULL,
+    operacao CHAR(1) NOT NULL,
+    registro_id INT NOT NULL,
+    projeto_id INT NOT NULL,
+    data_alteracao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_data_alteracao (data_alteracao)
+);
+
+-- Triggers de uma única instrução (dispensam DELIMITER)
+DROP TRIGGER IF EXISTS trg_projetos_insert;
+CREATE TRIGGER trg_projetos_insert AFTER INSERT ON projetos FOR EACH ROW
+    INSERT INTO change_log (tabela, operacao, registro_id, projeto_id)
+    VALUES ('projetos', 'I', NEW.id, NEW.id);
+
+DROP TRIGGER IF EXISTS trg_projetos_update;
+CREATE TRIGGER trg_projetos_update AFTER UPDATE ON projetos FOR EACH ROW
+    INSERT INTO change_log (tabela, operacao, registro_id, projeto_id)
+    VALUES ('projetos', 'U', NEW.id, NEW.id);
+
+DROP TRIGGER IF EXISTS trg_projetos_delete;
+CREATE TRIGGER trg_projetos_delete AFTER DELETE ON projetos FOR EACH ROW
+    INSERT INTO change_log (tabela, operacao, registro_id, projeto_id)
+    VALUES ('projetos', 'D', OLD.id, OLD.id);
+
+-- Exclusões em cascata de faturamentos não disparam triggers no MySQL;
+-- o registro 'D' do projeto já cobre esse caso
+DROP TRIGGER IF EXISTS trg_faturamentos_insert;
+CREATE TRIGGER trg_faturamentos_insert AFTER INSERT ON faturamentos FOR EACH ROW
+    INSERT INTO change_log (tabela, operacao, registro_id, projeto_id)
+    VALUES ('faturamentos', 'I', NEW.id, NEW.projeto_id);
+
+DROP TRIGGER IF EXISTS trg_faturamentos_update;
+CREATE TRIGGER trg_faturamentos_update AFTER UPDATE ON faturamentos FOR EACH ROW
+    INSERT INTO change_log (tabela, operacao, registro_id, projeto_id)
+    VALUES ('faturamentos', 'U', NEW.id, NEW.projeto_id);
+
+DROP TRIGGER IF EXISTS trg_faturamentos_delete;
+CREATE TRIGGER trg_faturamentos_delete AFTER DELETE ON faturamentos FOR EACH ROW
+    INSERT INTO change_log (tabela, operacao, registro_id, projeto_id)
+    VALUES ('faturamentos', 'D', OLD.id, OLD.projeto_id);
+
+-- A limpeza do change_log é feita pelos clientes ao abrir o quadro e, com
+-- eles abertos, a cada AppConfig.CHANGE_LOG_PRUNE_INTERVAL (a GUI e a API),
+-- com Database.prune_changes e AppConfig.CHANGE_LOG_RETENTION_DAYS, a única
+-- fonte da retenção. O evento agendado das versões anteriores, com 7 dias
+-- fixos, é removido para não apagar antes do configurado
+DROP EVENT IF EXISTS ev_prune_change_log;
@@ -2,12 +2,20 @@
 Database - Camada de acesso aos dados MySQL
 """
 import mysql.connector
-from mysql.connector import Error
-from datetime import datetime
+from mysql.connector import Error, errors
+from contextlib import contextmanager
+from datetime import date, datetime
 from decimal import Decimal
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import os
-from models import Projeto, Etapa, Faturamento, Observable
+import re
+import threading
+import time
+from models import Projeto, Etapa, Faturamento, Alteracao, Observable
+from dinheiro import para_decimal
+import ordem
+from journal import MutationJournal
+from config import DatabaseConfig
 
 
 class DatabaseError(Exception):
@@ -15,10 +23,64 @@ class DatabaseError(Exception):
     pass
 
 
+class RoteamentoLeitura:
+    """Réplicas de leitura de um cliente e a janela de read-your-writes
+    
+    É compartilhado entre um Database e os seus clones: as escritas saem
+    das threads de background e as leituras da thread do Tk, e uma leitura
+    logo depois de uma escrita deste cliente precisa ir ao primário mesmo
+    que a escrita tenha sido feita por outra conexão.
+    """
+    
+    # Segundos que uma réplica que não conectou fica fora do rodízio
+    PAUSA_FALHA = 30.0
+    
+    def __init__(self, replicas: List[dict], janela: float):
+        self.replicas = replicas
+        self.janela = janela
+        self._ultima_escrita = float("-inf")
+        self._proxima = 0
+        self._falhas: Dict[int, float] = {}
+        self._lock = threading.Lock()
+    
+    def registrar_escrita(self):
+        """Marca o início da janela em que as leituras vão ao primário"""
+        self._ultima_escrita = time.monotonic()
+    
+    def ler_do_primario(self) -> bool:
+        """Indica se ainda estamos na janela de uma escrita deste cliente"""
+        return time.monotonic() - self._ultima_escrita < self.janela
+    
+    def escolher(self) -> Optional[int]:
+        """Índice da próxima réplica disponível (rodízio entre as conexões), ou None"""
+        with self._lock:
+            agora = time.monotonic()
+            for _ in range(len(self.replicas)):
+                indice = self._proxima % len(self.replicas)
+                self._proxima += 1
+                if self._falhas.get(indice, 0.0) <= agora:
+                    return indice
+            return None
+    
+    def marcar_falha(self, indice: int):
+        """Tira a réplica do rodízio por PAUSA_FALHA segundos"""
+        with self._lock:
+            self._falhas[indice] = time.monotonic() + self.PAUSA_FALHA
+
+
 class Database(Observable):
-    """Classe para gerenciar conexões e operações do MySQL"""
+    """Classe para gerenciar conexões e operações do MySQL
     
-    def __init__(self, host='localhost', user='root', password='', database='kanban_projects'):
+    Com réplicas configuradas, as consultas do quadro, dos faturamentos e
+    das análises vão para uma réplica (escolhida uma vez por conexão) e as
+    mutações para o primário. Durante janela_leitura segundos depois de uma
+    escrita deste cliente, as leituras também vão ao primário.
+    """
+    
+    def __init__(self, host='localhost', user='root', password='', database='kanban_projects',
+                 journal: Optional[MutationJournal] = None, port: Optional[int] = None,
+                 replicas: Optional[List[dict]] = None, janela_leitura: float = 5.0,
+                 roteamento: Optional[RoteamentoLeitura] = None):
         super().__init__()
         self.config = {
             'host': host,
@@ -27,9 +89,19 @@ class Database(Observable):
             'database': database,
             'charset': 'utf8mb4',
             'collation': 'utf8mb4_unicode_ci',
-            'autocommit': True
+            'autocommit': True,
+            # Sem limite, um servidor inacessível prende quem chamou pelo
+            # timeout de TCP do sistema
+            'connection_timeout': DatabaseConfig.CONNECTION_TIMEOUT
         }
+        if port is not None:
+            self.config['port'] = port
         self.connection = None
+        self.journal = journal
+        if roteamento is None and replicas:
+            roteamento = RoteamentoLeitura(replicas, janela_leitura)
+        self.roteamento = roteamento
+        self.replica = None
         self._connect()
     
     def _connect(self):
@@ -38,13 +110,92 @@ class Database(Observable):
             self.connection = mysql.connector.connect(**self.config)
             print("✓ Conexão com MySQL estabelecida")
         except Error as e:
-            raise DatabaseError(f"Erro ao conectar com MySQL: {e}")
+            raise DatabaseError(f"Erro ao conectar com MySQL: {e}") from e
+    
+    def clonar(self) -> 'Database':
+        """Cria outro Database com a mesma configuração e uma conexão própria
+        
+        Usado por threads de background, já que uma conexão MySQL não pode
+        ser compartilhada entre threads. O journal é compartilhado.
+        """
+        return Database(
+            host=self.config['host'],
+            user=self.config['user'],
+            password=self.config['password'],
+            database=self.config['database'],
+            journal=self.journal,
+            port=self.config.get('port'),
+            roteamento=self.roteamento
+        )
     
     def _ensure_connection(self):
         """Garante que a conexão está ativa"""
         if not self.connection or not self.connection.is_connected():
             self._connect()
     
+    def _conexao_leitura(self, ignorar_janela: bool = False):
+        """Conexão para consultas que toleram o atraso de replicação
+        
+        É a réplica desta conexão, exceto sem réplicas configuradas, dentro
+        da janela de read-your-writes ou se nenhuma réplica conectar; nesses
+        casos é o primário.
+        """
+        roteamento = self.roteamento
+        if roteamento is None or (not ignorar_janela and roteamento.ler_do_primario()):
+            self._ensure_connection()
+            return self.connection
+        if self.replica is not None and self.replica.is_connected():
+            return self.replica
+        self._fechar_replica()
+        indice = roteamento.escolher()
+        while indice is not None:
+            destino = roteamento.replicas[indice]
+            try:
+                self.replica = mysql.connector.connect(**{**self.config, **destino})
+                print(f"✓ Conexão com a réplica {destino.get('host')}:{destino.get('port', 3306)} estabelecida")
+                return self.replica
+            except Error as e:
+                print(f"⚠️ Réplica {destino.get('host')}:{destino.get('port', 3306)} indisponível: {e}")
+                roteamento.marcar_falha(indice)
+                indice = roteamento.escolher()
+        self._ensure_connection()
+        return self.connection
+    
+    def _fechar_replica(self):
+        if self.replica is not None:
+            try:
+                self.replica.close()
+            except Error:
+                pass
+            self.replica = None
+    
+    def _registrar_escrita(self):
+        """Leituras dos próximos segundos deste cliente vão ao primário"""
+        if self.roteamento is not None:
+            self.roteamento.registrar_escrita()
+    
+    @staticmethod
+    def _erro_de_conexao(erro: Exception) -> bool:
+        """Indica se o erro do conector é de conexão (servidor inacessível ou caiu)"""
+        return isinstance(erro, (errors.InterfaceError, errors.OperationalError))
+    
+    def _pode_registrar_offline(self, erro: Exception) -> bool:
+        """Indica se o erro é de conexão e a mutação pode ir para o journal
+        
+        DatabaseError só conta pelo erro do conector que o causou (falha em
+        _connect ou na sincronização); os demais, como "Há mutações
+        pendentes", sobem para quem chamou. Se puder, o erro fica guardado
+        no journal e as próximas mutações vão direto para ele.
+        """
+        if self.journal is None:
+            return False
+        if isinstance(erro, DatabaseError):
+            erro = erro.__cause__
+        if not self._erro_de_conexao(erro):
+            return False
+        self.journal.falha_conexao = erro
+        return True
+    
     def execute_script(self, script_path: str):
         """Executa um script SQL"""
         self._ensure_connection()
@@ -86,34 +237,97 @@ class Database(Observable):
         except Error as e:
             raise DatabaseError(f"Erro ao buscar etapa: {e}")
     
+    @staticmethod
+    def _projeto_from_row(row) -> Projeto:
+        """Monta um Projeto a partir das colunas padrão de consulta"""
+        return Projeto(
+            id=row[0], nome=row[1], descricao=row[2],
+            pasta_local=row[3], arquivo_principal=row[4],
+            etapa_atual=row[5], data_criacao=row[6],
+            data_atualizacao=row[7], receita_total=row[8], posicao=row[9]
+        )
+    
     def get_projetos(self) -> List[Projeto]:
         """Retorna todos os projetos com receita total"""
-        self._ensure_connection()
+        return self._ler_projetos(self._conexao_leitura())
+    
+    def get_versao_e_projetos(self) -> Tuple[int, List[Projeto]]:
+        """Maior id do change_log e todos os projetos, lidos da mesma conexão
+        
+        A versão é lida primeiro e do mesmo servidor (réplica ou primário),
+        então os projetos nunca são mais antigos que ela: serve de ETag e de
+        ponto de partida para a sondagem do change_log.
+        """
+        conexao = self._conexao_leitura()
+        return self._ler_ultimo_change_id(conexao), self._ler_projetos(conexao)
+    
+    def get_versao(self) -> int:
+        """Maior id do change_log lido como get_versao_e_projetos o leria
+        
+        Ao contrário de get_ultimo_change_id, respeita a janela de
+        read-your-writes: logo depois de uma escrita vem do primário, então
+        não repete uma versão anterior à escrita lida de uma réplica atrasada.
+        """
+        return self._ler_ultimo_change_id(self._conexao_leitura())
+    
+    def _ler_projetos(self, conexao) -> List[Projeto]:
         try:
-            cursor = self.connection.cursor()
+            cursor = conexao.cursor()
             query = """
                 SELECT p.id, p.nome, p.descricao, p.pasta_local, p.arquivo_principal,
                        p.etapa_atual, p.data_criacao, p.data_atualizacao,
-                       COALESCE(v.receita_total, 0) as receita_total
+                       CAST(ROUND(COALESCE(v.receita_total, 0) * 100) AS SIGNED) as receita_total,
+                       p.posicao
                 FROM projetos p
                 LEFT JOIN view_receita_projetos v ON p.id = v.id
-                ORDER BY p.data_atualizacao DESC
+                ORDER BY p.etapa_atual, p.posicao, p.data_atualizacao DESC, p.id
             """
             cursor.execute(query)
             projetos = []
             for row in cursor.fetchall():
-                projeto = Projeto(
-                    id=row[0], nome=row[1], descricao=row[2],
-                    pasta_local=row[3], arquivo_principal=row[4],
-                    etapa_atual=row[5], data_criacao=row[6],
-                    data_atualizacao=row[7], receita_total=Decimal(str(row[8]))
-                )
-                projetos.append(projeto)
+                projetos.append(self._projeto_from_row(row))
             cursor.close()
             return projetos
         except Error as e:
             raise DatabaseError(f"Erro ao buscar projetos: {e}")
     
+    def iter_projetos(self, etapa: Optional[int] = None, lote: int = 500):
+        """Itera os projetos em streaming, sem carregar a lista inteira
+        
+        O cursor não é bufferizado: enquanto a iteração não terminar, a
+        conexão não pode ser usada para outras consultas.
+        """
+        self._ensure_connection()
+        try:
+            cursor = self.connection.cursor(buffered=False)
+            query = """
+                SELECT p.id, p.nome, p.descricao, p.pasta_local, p.arquivo_principal,
+                       p.etapa_atual, p.data_criacao, p.data_atualizacao,
+                       CAST(ROUND(COALESCE(v.receita_total, 0) * 100) AS SIGNED) as receita_total,
+                       p.posicao
+                FROM projetos p
+                LEFT JOIN view_receita_projetos v ON p.id = v.id
+            """
+            params = ()
+            if etapa is not None:
+                query += " WHERE p.etapa_atual = %s"
+                params = (etapa,)
+            query += " ORDER BY p.id"
+            cursor.execute(query, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(lote)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield self._projeto_from_row(row)
+            finally:
+                # Descarta o restante se o consumidor parar no meio
+                cursor.fetchall()
+                cursor.close()
+        except Error as e:
+            raise DatabaseError(f"Erro ao buscar projetos: {e}")
+    
     def get_projeto_by_id(self, projeto_id: int) -> Optional[Projeto]:
         """Retorna um projeto específico"""
         self._ensure_connection()
@@ -122,7 +336,8 @@ class Database(Observable):
             query = """
                 SELECT p.id, p.nome, p.descricao, p.pasta_local, p.arquivo_principal,
                        p.etapa_atual, p.data_criacao, p.data_atualizacao,
-                       COALESCE(v.receita_total, 0) as receita_total
+                       CAST(ROUND(COALESCE(v.receita_total, 0) * 100) AS SIGNED) as receita_total,
+                       p.posicao
                 FROM projetos p
                 LEFT JOIN view_receita_projetos v ON p.id = v.id
                 WHERE p.id = %s
@@ -132,38 +347,181 @@ class Database(Observable):
             cursor.close()
             
             if row:
-                return Projeto(
-                    id=row[0], nome=row[1], descricao=row[2],
-                    pasta_local=row[3], arquivo_principal=row[4],
-                    etapa_atual=row[5], data_criacao=row[6],
-                    data_atualizacao=row[7], receita_total=Decimal(str(row[8]))
-                )
+                return self._projeto_from_row(row)
             return None
         except Error as e:
             raise DatabaseError(f"Erro ao buscar projeto: {e}")
     
-    def criar_projeto(self, projeto: Projeto) -> int:
-        """Cria um novo projeto e retorna o ID"""
+    @staticmethod
+    def _termos_fulltext(query: str) -> List[str]:
+        """Quebra a consulta em termos sem os operadores do BOOLEAN MODE"""
+        limpa = re.sub(r'[+\-><()~*"@]', ' ', query)
+        return [termo for termo in limpa.split() if termo]
+    
+    def buscar_projetos(self, query: str, etapa: Optional[int] = None,
+                        limit: int = 50, offset: int = 0) -> List[Projeto]:
+        """Busca projetos pelo índice FULLTEXT de (nome, descricao)
+        
+        Cada termo vira um prefixo obrigatório (+termo*), e os resultados vêm
+        ordenados por relevância. Termos menores que o ft_min_token_size do
+        InnoDB (3) não entram no índice e são buscados com LIKE no nome.
+        """
+        termos = self._termos_fulltext(query)
+        if not termos:
+            return []
+        
+        longos = [t for t in termos if len(t) >= 3]
+        curtos = [t for t in termos if len(t) < 3]
+        
+        condicoes = []
+        params = []
+        if longos:
+            boolean_query = " ".join(f"+{t}*" for t in longos)
+            relevancia = "MATCH(p.nome, p.descricao) AGAINST (%s IN BOOLEAN MODE)"
+            condicoes.append(relevancia)
+            params = [boolean_query, boolean_query]
+        else:
+            relevancia = "0"
+        for termo in curtos:
+            condicoes.append("p.nome LIKE %s")
+            params.append(f"%{termo}%")
+        if etapa is not None:
+            condicoes.append("p.etapa_atual = %s")
+            params.append(etapa)
+        params.extend([limit, offset])
+        
+        self._ensure_connection()
+        try:
+            cursor = self.connection.cursor()
+            query_sql = f"""
+                SELECT p.id, p.nome, p.descricao, p.pasta_local, p.arquivo_principal,
+                       p.etapa_atual, p.data_criacao, p.data_atualizacao,
+                       CAST(ROUND(COALESCE(v.receita_total, 0) * 100) AS SIGNED) as receita_total,
+                       p.posicao, {relevancia} AS relevancia
+                FROM projetos p
+                LEFT JOIN view_receita_projetos v ON p.id = v.id
+                WHERE {" AND ".join(condicoes)}
+                ORDER BY relevancia DESC, p.id
+                LIMIT %s OFFSET %s
+            """
+            cursor.execute(query_sql, params)
+            projetos = [self._projeto_from_row(row) for row in cursor.fetchall()]
+            cursor.close()
+            return projetos
+        except Error as e:
+            raise DatabaseError(f"Erro ao buscar projetos: {e}")
+    
+    def get_projetos_por_ids(self, projeto_ids: List[int]) -> List[Projeto]:
+        """Retorna os projetos de uma lista de IDs em uma única consulta"""
+        if not projeto_ids:
+            return []
         self._ensure_connection()
         try:
             cursor = self.connection.cursor()
+            placeholders = ", ".join(["%s"] * len(projeto_ids))
+            query = f"""
+                SELECT p.id, p.nome, p.descricao, p.pasta_local, p.arquivo_principal,
+                       p.etapa_atual, p.data_criacao, p.data_atualizacao,
+                       CAST(ROUND(COALESCE(v.receita_total, 0) * 100) AS SIGNED) as receita_total,
+                       p.posicao
+                FROM projetos p
+                LEFT JOIN view_receita_projetos v ON p.id = v.id
+                WHERE p.id IN ({placeholders})
+            """
+            cursor.execute(query, list(projeto_ids))
+            projetos = [self._projeto_from_row(row) for row in cursor.fetchall()]
+            cursor.close()
+            return projetos
+        except Error as e:
+            raise DatabaseError(f"Erro ao buscar projetos: {e}")
+    
+    def criar_projeto(self, projeto: Projeto) -> int:
+        """Cria um novo projeto e retorna o ID (negativo se ficou no journal)"""
+        try:
+            self._sincronizar_antes_de_mutar()
+            self._ensure_connection()
+            cursor = self.connection.cursor()
+            projeto.posicao = self._posicao_no_topo(cursor, projeto.etapa_atual)
             query = """
-                INSERT INTO projetos (nome, descricao, pasta_local, arquivo_principal, etapa_atual)
-                VALUES (%s, %s, %s, %s, %s)
+                INSERT INTO projetos (nome, descricao, pasta_local, arquivo_principal, etapa_atual, posicao)
+                VALUES (%s, %s, %s, %s, %s, %s)
             """
             values = (projeto.nome, projeto.descricao, projeto.pasta_local,
-                     projeto.arquivo_principal, projeto.etapa_atual)
+                     projeto.arquivo_principal, projeto.etapa_atual, projeto.posicao)
             cursor.execute(query, values)
             projeto_id = cursor.lastrowid
             cursor.close()
+            self._registrar_escrita()
             
-            self.notify("projeto_criado", {"projeto_id": projeto_id})
+            self.notify("projeto_criado", {
+                "projeto_id": projeto_id,
+                "etapa": projeto.etapa_atual
+            })
+            return projeto_id
+        except (Error, DatabaseError) as e:
+            if not self._pode_registrar_offline(e):
+                raise DatabaseError(f"Erro ao criar projeto: {e}")
+            projeto_id = self.journal.proximo_id_temporario()
+            self.journal.registrar("criar_projeto", {
+                "projeto_id": projeto_id,
+                "nome": projeto.nome,
+                "descricao": projeto.descricao,
+                "pasta_local": projeto.pasta_local,
+                "arquivo_principal": projeto.arquivo_principal,
+                "etapa_atual": projeto.etapa_atual
+            })
+            projeto.id = projeto_id
+            self.notify("projeto_criado", {
+                "projeto_id": projeto_id,
+                "etapa": projeto.etapa_atual,
+                "projeto": projeto,
+                "pendente": True
+            })
             return projeto_id
+    
+    def importar_projetos(self, projetos: List[Projeto]) -> int:
+        """Insere vários projetos com um único executemany em uma transação
+        
+        Os projetos entram no topo de cada etapa, na ordem da lista.
+        """
+        if not projetos:
+            return 0
+        self._ensure_connection()
+        try:
+            self.connection.start_transaction()
+            cursor = self.connection.cursor()
+            por_etapa: Dict[int, List[Projeto]] = {}
+            for projeto in projetos:
+                por_etapa.setdefault(projeto.etapa_atual, []).append(projeto)
+            for etapa, lista in por_etapa.items():
+                primeira = self._primeira_posicao(cursor, etapa)
+                try:
+                    posicoes = ordem.distribuir(len(lista), None, primeira)
+                except ValueError:
+                    posicoes = [""] * len(lista)
+                for projeto, posicao in zip(lista, posicoes):
+                    projeto.posicao = posicao
+            query = """
+                INSERT INTO projetos (nome, descricao, pasta_local, arquivo_principal, etapa_atual, posicao)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """
+            cursor.executemany(query, [
+                (p.nome, p.descricao, p.pasta_local, p.arquivo_principal, p.etapa_atual, p.posicao)
+                for p in projetos
+            ])
+            cursor.close()
+            self.connection.commit()
         except Error as e:
-            raise DatabaseError(f"Erro ao criar projeto: {e}")
+            self.connection.rollback()
+            raise DatabaseError(f"Erro ao importar projetos: {e}")
+        
+        self._registrar_escrita()
+        self.notify("projetos_importados", {"quantidade": len(projetos)})
+        return len(projetos)
     
     def atualizar_projeto(self, projeto: Projeto):
         """Atualiza um projeto existente"""
+        self._exigir_journal_sincronizado("editar o projeto")
         self._ensure_connection()
         try:
             cursor = self.connection.cursor()
@@ -177,35 +535,205 @@ class Database(Observable):
                      projeto.arquivo_principal, projeto.etapa_atual, projeto.id)
             cursor.execute(query, values)
             cursor.close()
+            self._registrar_escrita()
             
-            self.notify("projeto_atualizado", {"projeto_id": projeto.id})
+            self.notify("projeto_atualizado", {
+                "projeto_id": projeto.id,
+                "etapa": projeto.etapa_atual
+            })
         except Error as e:
             raise DatabaseError(f"Erro ao atualizar projeto: {e}")
     
-    def mover_projeto_etapa(self, projeto_id: int, nova_etapa: int):
-        """Move um projeto para outra etapa"""
-        self._ensure_connection()
+    def mover_projeto_etapa(self, projeto_id: int, nova_etapa: int, etapa_origem: Optional[int] = None,
+                            posicao: Optional[str] = None):
+        """Move um projeto para outra etapa, ou para outra posição na mesma etapa
+        
+        etapa_origem é a etapa vista pelo cliente; ela é usada para detectar
+        conflitos quando o movimento é reaplicado a partir do journal.
+        posicao vem de ordem.entre() com os vizinhos do cartão; sem ela o
+        projeto vai para o topo da etapa. Só a linha do projeto é gravada, e
+        reordenar dentro da etapa não altera data_atualizacao.
+        """
         try:
+            self._sincronizar_antes_de_mutar()
+            self._ensure_connection()
             cursor = self.connection.cursor()
-            query = "UPDATE projetos SET etapa_atual = %s WHERE id = %s"
-            cursor.execute(query, (nova_etapa, projeto_id))
+            if posicao is None:
+                posicao = self._posicao_no_topo(cursor, nova_etapa)
+            cursor.execute(self.SQL_MOVER, (nova_etapa, nova_etapa, posicao, projeto_id))
             cursor.close()
+            self._registrar_escrita()
             
             self.notify("projeto_movido", {
                 "projeto_id": projeto_id, 
-                "nova_etapa": nova_etapa
+                "nova_etapa": nova_etapa,
+                "posicao": posicao
+            })
+        except (Error, DatabaseError) as e:
+            if not self._pode_registrar_offline(e):
+                raise DatabaseError(f"Erro ao mover projeto: {e}")
+            self.journal.registrar("mover_projeto_etapa", {
+                "projeto_id": projeto_id,
+                "nova_etapa": nova_etapa,
+                "etapa_origem": etapa_origem,
+                "posicao": posicao
+            })
+            self.notify("projeto_movido", {
+                "projeto_id": projeto_id,
+                "nova_etapa": nova_etapa,
+                "posicao": posicao,
+                "pendente": True
+            })
+    
+    def mover_projetos_etapa(self, projeto_ids: List[int], nova_etapa: int,
+                             posicoes: Optional[List[str]] = None,
+                             etapas_origem: Optional[Dict[int, int]] = None) -> int:
+        """Move vários projetos para uma etapa com um único UPDATE ... WHERE id IN (...)
+        
+        posicoes acompanha projeto_ids; sem ela os projetos vão para o topo
+        da etapa, na ordem da lista. Emite um único evento "projetos_movidos".
+        etapas_origem (a etapa de cada projeto vista pelo cliente) só é usada
+        se os movimentos forem para o journal. Retorna quantos foram movidos.
+        """
+        if not projeto_ids:
+            return 0
+        try:
+            self._sincronizar_antes_de_mutar()
+            self._ensure_connection()
+            self.connection.start_transaction()
+            try:
+                cursor = self.connection.cursor()
+                if posicoes is None:
+                    try:
+                        posicoes = ordem.distribuir(len(projeto_ids), None,
+                                                    self._primeira_posicao(cursor, nova_etapa))
+                    except ValueError:
+                        posicoes = [""] * len(projeto_ids)
+                casos = " ".join(["WHEN %s THEN %s"] * len(projeto_ids))
+                marcadores = ", ".join(["%s"] * len(projeto_ids))
+                cursor.execute(
+                    f"""
+                    UPDATE projetos
+                    SET data_atualizacao = IF(etapa_atual = %s, data_atualizacao, CURRENT_TIMESTAMP),
+                        posicao = CASE id {casos} END,
+                        etapa_atual = %s
+                    WHERE id IN ({marcadores})
+                    """,
+                    [nova_etapa]
+                    + [valor for par in zip(projeto_ids, posicoes) for valor in par]
+                    + [nova_etapa] + list(projeto_ids)
+                )
+                movidos = cursor.rowcount
+                cursor.close()
+                self.connection.commit()
+            except Error:
+                self.connection.rollback()
+                raise
+            self._registrar_escrita()
+            
+            self.notify("projetos_movidos", {
+                "projeto_ids": list(projeto_ids),
+                "nova_etapa": nova_etapa,
+                "posicoes": dict(zip(projeto_ids, posicoes)),
+                "quantidade": movidos
             })
+            return movidos
+        except (Error, DatabaseError) as e:
+            if not self._pode_registrar_offline(e):
+                raise DatabaseError(f"Erro ao mover projetos: {e}")
+            # Offline vira um movimento por projeto no journal, reaplicados
+            # (com detecção de conflito) na sincronização
+            etapas_origem = etapas_origem or {}
+            posicoes = posicoes or [None] * len(projeto_ids)
+            for projeto_id, posicao in zip(projeto_ids, posicoes):
+                self.journal.registrar("mover_projeto_etapa", {
+                    "projeto_id": projeto_id,
+                    "nova_etapa": nova_etapa,
+                    "etapa_origem": etapas_origem.get(projeto_id),
+                    "posicao": posicao
+                })
+            self.notify("projetos_movidos", {
+                "projeto_ids": list(projeto_ids),
+                "nova_etapa": nova_etapa,
+                "posicoes": {projeto_id: posicao for projeto_id, posicao in zip(projeto_ids, posicoes)
+                             if posicao is not None},
+                "quantidade": len(projeto_ids),
+                "pendente": True
+            })
+            return len(projeto_ids)
+    
+    # data_atualizacao vem antes de etapa_atual: o MySQL avalia as atribuições
+    # em ordem, e atribuí-la explicitamente desliga o ON UPDATE da coluna
+    SQL_MOVER = """
+        UPDATE projetos
+        SET data_atualizacao = IF(etapa_atual = %s, data_atualizacao, CURRENT_TIMESTAMP),
+            etapa_atual = %s, posicao = %s
+        WHERE id = %s
+    """
+    
+    @staticmethod
+    def _primeira_posicao(cursor, etapa: int) -> Optional[str]:
+        """Posição do primeiro cartão da etapa (None se vazia), pelo índice (etapa_atual, posicao)"""
+        cursor.execute("SELECT MIN(posicao) FROM projetos WHERE etapa_atual = %s", (etapa,))
+        return cursor.fetchone()[0]
+    
+    @classmethod
+    def _posicao_no_topo(cls, cursor, etapa: int) -> str:
+        """Posição antes do primeiro cartão ("" se a etapa ainda não foi numerada)"""
+        try:
+            return ordem.entre(None, cls._primeira_posicao(cursor, etapa))
+        except ValueError:
+            # Sem posição, o projeto fica entre os não numerados, que vêm
+            # primeiro (os mais recentes antes) até a etapa ser renumerada
+            return ""
+    
+    def renumerar_posicoes(self, etapa: int, projeto_ids: Optional[List[int]] = None) -> Dict[int, str]:
+        """Regrava as posições de uma etapa como posições curtas e espaçadas
+        
+        projeto_ids é a ordem desejada (a da coluna na tela); sem ela vale a
+        ordem atual do banco. É um único UPDATE ... CASE, que não altera
+        data_atualizacao; projetos que saíram da etapa nesse meio tempo são
+        ignorados. Retorna {projeto_id: nova posição}.
+        """
+        self._ensure_connection()
+        try:
+            cursor = self.connection.cursor()
+            if projeto_ids is None:
+                cursor.execute(
+                    "SELECT id FROM projetos WHERE etapa_atual = %s "
+                    "ORDER BY posicao, data_atualizacao DESC, id",
+                    (etapa,)
+                )
+                projeto_ids = [row[0] for row in cursor.fetchall()]
+            posicoes = dict(zip(projeto_ids, ordem.distribuir(len(projeto_ids))))
+            if posicoes:
+                casos = " ".join(["WHEN %s THEN %s"] * len(posicoes))
+                marcadores = ", ".join(["%s"] * len(posicoes))
+                params = [valor for par in posicoes.items() for valor in par]
+                cursor.execute(
+                    f"UPDATE projetos SET posicao = CASE id {casos} END, "
+                    f"data_atualizacao = data_atualizacao "
+                    f"WHERE etapa_atual = %s AND id IN ({marcadores})",
+                    params + [etapa] + list(posicoes)
+                )
+            cursor.close()
         except Error as e:
-            raise DatabaseError(f"Erro ao mover projeto: {e}")
+            raise DatabaseError(f"Erro ao renumerar posições: {e}")
+        
+        self._registrar_escrita()
+        self.notify("posicoes_renumeradas", {"etapa": etapa, "posicoes": posicoes})
+        return posicoes
     
     def excluir_projeto(self, projeto_id: int):
         """Exclui um projeto e seus faturamentos"""
+        self._exigir_journal_sincronizado("excluir o projeto")
         self._ensure_connection()
         try:
             cursor = self.connection.cursor()
             query = "DELETE FROM projetos WHERE id = %s"
             cursor.execute(query, (projeto_id,))
             cursor.close()
+            self._registrar_escrita()
             
             self.notify("projeto_excluido", {"projeto_id": projeto_id})
         except Error as e:
@@ -213,11 +741,12 @@ class Database(Observable):
     
     def get_faturamentos_projeto(self, projeto_id: int) -> List[Faturamento]:
         """Retorna todos os faturamentos de um projeto"""
-        self._ensure_connection()
+        conexao = self._conexao_leitura()
         try:
-            cursor = self.connection.cursor()
+            cursor = conexao.cursor()
             query = """
-                SELECT id, projeto_id, valor, descricao, data_faturamento, data_criacao
+                SELECT id, projeto_id, CAST(ROUND(valor * 100) AS SIGNED),
+                       descricao, data_faturamento, data_criacao
                 FROM faturamentos 
                 WHERE projeto_id = %s 
                 ORDER BY data_faturamento DESC
@@ -229,47 +758,845 @@ class Database(Observable):
         except Error as e:
             raise DatabaseError(f"Erro ao buscar faturamentos: {e}")
     
-    def adicionar_faturamento(self, faturamento: Faturamento) -> int:
-        """Adiciona um novo faturamento e retorna o ID"""
-        self._ensure_connection()
+    def get_faturamentos_pagina(self, projeto_id: int, depois: Optional[Tuple[date, int]] = None,
+                                limite: int = 50) -> List[Faturamento]:
+        """Página de faturamentos, mais recentes primeiro, por paginação de chave
+        
+        depois é o (data_faturamento, id) do último item da página anterior.
+        A ordem (data_faturamento, id) é a do índice idx_projeto_data_id_valor
+        (projeto_id, data_faturamento, id, valor): a página é lida do índice
+        sem filesort, então custa o mesmo independente de quantas vieram antes.
+        """
+        conexao = self._conexao_leitura()
+        try:
+            cursor = conexao.cursor()
+            query = """
+                SELECT id, projeto_id, CAST(ROUND(valor * 100) AS SIGNED),
+                       descricao, data_faturamento, data_criacao
+                FROM faturamentos
+                WHERE projeto_id = %s
+            """
+            params: list = [projeto_id]
+            if depois is not None:
+                query += " AND (data_faturamento < %s OR (data_faturamento = %s AND id < %s))"
+                params.extend([depois[0], depois[0], depois[1]])
+            query += " ORDER BY data_faturamento DESC, id DESC LIMIT %s"
+            params.append(limite)
+            cursor.execute(query, params)
+            faturamentos = [Faturamento(*row) for row in cursor.fetchall()]
+            cursor.close()
+            return faturamentos
+        except Error as e:
+            raise DatabaseError(f"Erro ao buscar faturamentos: {e}")
+    
+    def get_resumo_faturamentos(self, projeto_id: int) -> Tuple[int, int, Optional[date], Optional[date]]:
+        """(quantidade, total em centavos, primeira data, última data) lidos só do índice"""
+        conexao = self._conexao_leitura()
         try:
+            cursor = conexao.cursor()
+            cursor.execute(
+                """
+                SELECT COUNT(*), CAST(ROUND(COALESCE(SUM(valor), 0) * 100) AS SIGNED),
+                       MIN(data_faturamento), MAX(data_faturamento)
+                FROM faturamentos
+                WHERE projeto_id = %s
+                """,
+                (projeto_id,)
+            )
+            quantidade, total, primeira, ultima = cursor.fetchone()
+            cursor.close()
+            return quantidade, total, primeira, ultima
+        except Error as e:
+            raise DatabaseError(f"Erro ao resumir faturamentos: {e}")
+    
+    def get_faturamentos_recentes(self, projeto_ids: List[int], limite: int) -> Dict[int, List[Faturamento]]:
+        """Os faturamentos mais recentes de vários projetos em uma única consulta
+        
+        Cada projeto traz no máximo `limite` itens, na ordem de
+        get_faturamentos_pagina (a primeira página do histórico).
+        """
+        if not projeto_ids:
+            return {}
+        conexao = self._conexao_leitura()
+        try:
+            cursor = conexao.cursor()
+            placeholders = ", ".join(["%s"] * len(projeto_ids))
+            query = f"""
+                SELECT id, projeto_id, CAST(ROUND(valor * 100) AS SIGNED),
+                       descricao, data_faturamento, data_criacao
+                FROM (
+                    SELECT id, projeto_id, valor, descricao, data_faturamento, data_criacao,
+                           ROW_NUMBER() OVER (PARTITION BY projeto_id
+                                              ORDER BY data_faturamento DESC, id DESC) AS posicao
+                    FROM faturamentos
+                    WHERE projeto_id IN ({placeholders})
+                ) AS recentes
+                WHERE posicao <= %s
+                ORDER BY projeto_id, data_faturamento DESC, id DESC
+            """
+            cursor.execute(query, list(projeto_ids) + [limite])
+            faturamentos = {projeto_id: [] for projeto_id in projeto_ids}
+            for row in cursor.fetchall():
+                faturamentos[row[1]].append(Faturamento(*row))
+            cursor.close()
+            return faturamentos
+        except Error as e:
+            raise DatabaseError(f"Erro ao buscar faturamentos: {e}")
+    
+    def get_resumos_faturamentos(self, projeto_ids: List[int]) -> Dict[int, Tuple[int, int, Optional[date], Optional[date]]]:
+        """get_resumo_faturamentos de vários projetos em uma única consulta"""
+        if not projeto_ids:
+            return {}
+        conexao = self._conexao_leitura()
+        try:
+            cursor = conexao.cursor()
+            placeholders = ", ".join(["%s"] * len(projeto_ids))
+            cursor.execute(
+                f"""
+                SELECT projeto_id, COUNT(*), CAST(ROUND(SUM(valor) * 100) AS SIGNED),
+                       MIN(data_faturamento), MAX(data_faturamento)
+                FROM faturamentos
+                WHERE projeto_id IN ({placeholders})
+                GROUP BY projeto_id
+                """,
+                list(projeto_ids)
+            )
+            resumos = {projeto_id: (0, 0, None, None) for projeto_id in projeto_ids}
+            for projeto_id, quantidade, total, primeira, ultima in cursor.fetchall():
+                resumos[projeto_id] = (quantidade, total, primeira, ultima)
+            cursor.close()
+            return resumos
+        except Error as e:
+            raise DatabaseError(f"Erro ao resumir faturamentos: {e}")
+    
+    def adicionar_faturamento(self, faturamento: Faturamento) -> Optional[int]:
+        """Adiciona um novo faturamento e retorna o ID (None se ficou no journal)"""
+        try:
+            self._sincronizar_antes_de_mutar()
+            self._ensure_connection()
             cursor = self.connection.cursor()
             query = """
                 INSERT INTO faturamentos (projeto_id, valor, descricao, data_faturamento)
                 VALUES (%s, %s, %s, %s)
             """
-            values = (faturamento.projeto_id, faturamento.valor,
+            values = (faturamento.projeto_id, para_decimal(faturamento.valor),
                      faturamento.descricao, faturamento.data_faturamento)
             cursor.execute(query, values)
             faturamento_id = cursor.lastrowid
             cursor.close()
+            self._registrar_escrita()
             
             self.notify("faturamento_adicionado", {
                 "faturamento_id": faturamento_id,
-                "projeto_id": faturamento.projeto_id
+                "projeto_id": faturamento.projeto_id,
+                "valor": faturamento.valor
             })
             return faturamento_id
-        except Error as e:
-            raise DatabaseError(f"Erro ao adicionar faturamento: {e}")
+        except (Error, DatabaseError) as e:
+            if not self._pode_registrar_offline(e):
+                raise DatabaseError(f"Erro ao adicionar faturamento: {e}")
+            self.journal.registrar("adicionar_faturamento", {
+                "projeto_id": faturamento.projeto_id,
+                "valor": faturamento.valor,
+                "descricao": faturamento.descricao,
+                "data_faturamento": faturamento.data_faturamento
+            })
+            self.notify("faturamento_adicionado", {
+                "faturamento_id": None,
+                "projeto_id": faturamento.projeto_id,
+                "valor": faturamento.valor,
+                "pendente": True
+            })
+            return None
     
-    def excluir_faturamento(self, faturamento_id: int, projeto_id: int):
-        """Exclui um faturamento"""
+    def excluir_faturamento(self, faturamento_id: int, projeto_id: int, valor: Optional[int] = None):
+        """Exclui um faturamento
+        
+        valor (em centavos) é opcional e só repassado no evento para que os
+        totais da GUI sejam ajustados sem uma nova consulta.
+        """
+        self._exigir_journal_sincronizado("excluir o faturamento")
         self._ensure_connection()
         try:
             cursor = self.connection.cursor()
             query = "DELETE FROM faturamentos WHERE id = %s"
             cursor.execute(query, (faturamento_id,))
             cursor.close()
+            self._registrar_escrita()
             
             self.notify("faturamento_excluido", {
                 "faturamento_id": faturamento_id,
-                "projeto_id": projeto_id
+                "projeto_id": projeto_id,
+                "valor": valor
             })
         except Error as e:
             raise DatabaseError(f"Erro ao excluir faturamento: {e}")
     
+    def get_receita_mensal(self, desde: date, incluir_arquivados: bool = False) -> List[Tuple[str, int]]:
+        """Soma dos faturamentos em centavos por mês (AAAA-MM) a partir de uma data
+        
+        O filtro por intervalo em data_faturamento usa o índice idx_data.
+        """
+        conexao = self._conexao_leitura()
+        try:
+            cursor = conexao.cursor()
+            origem = "faturamentos"
+            params = (desde,)
+            if incluir_arquivados:
+                origem = """(
+                    SELECT valor, data_faturamento FROM faturamentos WHERE data_faturamento >= %s
+                    UNION ALL
+                    SELECT valor, data_faturamento FROM faturamentos_arquivados WHERE data_faturamento >= %s
+                ) f"""
+                params = (desde, desde, desde)
+            query = f"""
+                SELECT YEAR(data_faturamento) AS ano, MONTH(data_faturamento) AS mes,
+                       CAST(ROUND(SUM(valor) * 100) AS SIGNED)
+                FROM {origem}
+                WHERE data_faturamento >= %s
+                GROUP BY ano, mes
+                ORDER BY ano, mes
+            """
+            cursor.execute(query, params)
+            meses = [(f"{row[0]:04d}-{row[1]:02d}", row[2]) for row in cursor.fetchall()]
+            cursor.close()
+            return meses
+        except Error as e:
+            raise DatabaseError(f"Erro ao buscar receita mensal: {e}")
+    
+    def get_totais_por_etapa(self) -> Dict[int, Tuple[int, int]]:
+        """Quantidade de projetos e receita (centavos) de cada etapa em uma única consulta"""
+        conexao = self._conexao_leitura()
+        try:
+            cursor = conexao.cursor()
+            query = """
+                SELECT p.etapa_atual, COUNT(*),
+                       CAST(ROUND(COALESCE(SUM(v.receita_total), 0) * 100) AS SIGNED)
+                FROM projetos p
+                LEFT JOIN view_receita_projetos v ON p.id = v.id
+                GROUP BY p.etapa_atual
+            """
+            cursor.execute(query)
+            totais = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+            cursor.close()
+            return totais
+        except Error as e:
+            raise DatabaseError(f"Erro ao buscar totais por etapa: {e}")
+    
+    def get_receita_por_etapa(self) -> List[Tuple[Etapa, int, int]]:
+        """Quantidade de projetos e receita total (centavos) de cada etapa"""
+        conexao = self._conexao_leitura()
+        try:
+            cursor = conexao.cursor()
+            query = """
+                SELECT e.id, e.nome, e.ordem,
+                       COUNT(DISTINCT p.id) AS projetos,
+                       CAST(ROUND(COALESCE(SUM(f.valor), 0) * 100) AS SIGNED) AS receita
+                FROM etapas e
+                LEFT JOIN projetos p ON p.etapa_atual = e.id
+                LEFT JOIN faturamentos f ON f.projeto_id = p.id
+                GROUP BY e.id, e.nome, e.ordem
+                ORDER BY e.ordem
+            """
+            cursor.execute(query)
+            etapas = [(Etapa(row[0], row[1], row[2]), row[3], row[4]) for row in cursor.fetchall()]
+            cursor.close()
+            return etapas
+        except Error as e:
+            raise DatabaseError(f"Erro ao buscar receita por etapa: {e}")
+    
+    def get_top_projetos_receita(self, limit: int = 10,
+                                 incluir_arquivados: bool = False) -> List[Tuple[int, str, int]]:
+        """Projetos com maior receita acumulada (centavos)"""
+        conexao = self._conexao_leitura()
+        try:
+            cursor = conexao.cursor()
+            query = """
+                SELECT p.id, p.nome, CAST(ROUND(SUM(f.valor) * 100) AS SIGNED) AS receita
+                FROM faturamentos f
+                JOIN projetos p ON p.id = f.projeto_id
+                GROUP BY p.id, p.nome
+            """
+            if incluir_arquivados:
+                query += """
+                UNION ALL
+                SELECT p.id, p.nome, CAST(ROUND(SUM(f.valor) * 100) AS SIGNED) AS receita
+                FROM faturamentos_arquivados f
+                JOIN projetos_arquivados p ON p.id = f.projeto_id
+                GROUP BY p.id, p.nome
+                """
+            query += """
+                ORDER BY receita DESC
+                LIMIT %s
+            """
+            cursor.execute(query, (limit,))
+            top = [(row[0], row[1], row[2]) for row in cursor.fetchall()]
+            cursor.close()
+            return top
+        except Error as e:
+            raise DatabaseError(f"Erro ao buscar projetos com maior receita: {e}")
+    
+    def iter_faturamentos_brutos(self, apos_id: int = 0, lote: int = 50000):
+        """Itera lotes de (id, projeto_id, valor_centavos, data_faturamento)
+        
+        Usa paginação por chave no id, então cada lote é uma faixa da chave
+        primária, e o valor já vem convertido para centavos inteiros.
+        """
+        conexao = self._conexao_leitura()
+        ultimo_id = apos_id
+        try:
+            cursor = conexao.cursor()
+            while True:
+                cursor.execute(
+                    """
+                    SELECT id, projeto_id, CAST(ROUND(valor * 100) AS SIGNED), data_faturamento
+                    FROM faturamentos
+                    WHERE id > %s
+                    ORDER BY id
+                    LIMIT %s
+                    """,
+                    (ultimo_id, lote)
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                ultimo_id = rows[-1][0]
+                yield rows
+                if len(rows) < lote:
+                    break
+            cursor.close()
+        except Error as e:
+            raise DatabaseError(f"Erro ao ler faturamentos: {e}")
+    
+    def contar_faturamentos(self, ate_id: int) -> int:
+        """Quantidade de faturamentos com id <= ate_id"""
+        conexao = self._conexao_leitura()
+        try:
+            cursor = conexao.cursor()
+            cursor.execute("SELECT COUNT(*) FROM faturamentos WHERE id <= %s", (ate_id,))
+            total = cursor.fetchone()[0]
+            cursor.close()
+            return total
+        except Error as e:
+            raise DatabaseError(f"Erro ao contar faturamentos: {e}")
+    
+    def get_ultimo_change_id(self) -> int:
+        """Retorna o maior id do change_log (0 se vazio)
+        
+        Com réplicas vem sempre da réplica, mesmo dentro da janela: um id
+        atrasado só faz a sondagem reaplicar alterações já vistas, enquanto
+        um id mais novo que o quadro lido da réplica perderia alterações.
+        """
+        return self._ler_ultimo_change_id(self._conexao_leitura(ignorar_janela=True))
+    
+    @staticmethod
+    def _ler_ultimo_change_id(conexao) -> int:
+        try:
+            cursor = conexao.cursor()
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM change_log")
+            ultimo = cursor.fetchone()[0]
+            cursor.close()
+            return ultimo
+        except Error as e:
+            raise DatabaseError(f"Erro ao ler change_log: {e}")
+    
+    def get_changes(self, since_id: int, limit: int = 1000) -> Tuple[List[Alteracao], bool]:
+        """Retorna as alterações com id > since_id e se houve lacuna
+        
+        A lacuna indica que entradas posteriores a since_id já foram
+        removidas pela limpeza, e o cliente precisa recarregar tudo. O MIN(id)
+        vem na mesma consulta, então cada sondagem custa uma única faixa da
+        chave primária.
+        """
+        self._ensure_connection()
+        try:
+            cursor = self.connection.cursor()
+            query = """
+                SELECT c.id, c.tabela, c.operacao, c.registro_id, c.projeto_id,
+                       c.data_alteracao, m.min_id
+                FROM (SELECT MIN(id) AS min_id FROM change_log) m
+                LEFT JOIN change_log c ON c.id > %s
+                ORDER BY c.id
+                LIMIT %s
+            """
+            cursor.execute(query, (since_id, limit))
+            rows = cursor.fetchall()
+            cursor.close()
+        except Error as e:
+            raise DatabaseError(f"Erro ao ler change_log: {e}")
+        
+        min_id = rows[0][6] if rows else None
+        lacuna = since_id > 0 and min_id is not None and min_id > since_id + 1
+        alteracoes = [Alteracao(*row[:6]) for row in rows if row[0] is not None]
+        return alteracoes, lacuna
+    
+    def prune_changes(self, dias: int = 7) -> int:
+        """Remove entradas do change_log mais antigas que N dias"""
+        self._ensure_connection()
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(
+                "DELETE FROM change_log WHERE data_alteracao < NOW() - INTERVAL %s DAY",
+                (dias,)
+            )
+            removidas = cursor.rowcount
+            cursor.close()
+            return removidas
+        except Error as e:
+            raise DatabaseError(f"Erro ao limpar change_log: {e}")
+    
+    def aplicar_changes(self, alteracoes: List[Alteracao]):
+        """Busca o estado atual dos projetos alterados e emite um único evento
+        
+        Projetos excluídos vão em "excluidos"; os demais (inclusive os que só
+        tiveram faturamentos alterados) são relidos com uma consulta IN.
+        """
+        if not alteracoes:
+            return
+        excluidos = {a.projeto_id for a in alteracoes
+                     if a.tabela == "projetos" and a.operacao == "D"}
+        alterados = {a.projeto_id for a in alteracoes} - excluidos
+        projetos = self.get_projetos_por_ids(sorted(alterados))
+        # As releituras que os observers fazem agora (faturamentos, totais)
+        # vão ao primário: a réplica pode ainda não ter essas alterações
+        self._registrar_escrita()
+        self.notify("alteracoes_remotas", {
+            "projetos": projetos,
+            "excluidos": sorted(excluidos),
+            "ultimo_id": alteracoes[-1].id
+        })
+    
+    def _sincronizar_antes_de_mutar(self):
+        """Esvazia o journal antes de uma nova mutação para preservar a ordem
+        
+        Depois de uma falha de conexão não tenta de novo: as mutações são
+        chamadas da thread do Tk e cada tentativa esperaria o timeout. Quem
+        volta a tentar é a sincronização em background (sincronizar_journal).
+        """
+        if self.journal is None or not len(self.journal):
+            return
+        falha = self.journal.falha_conexao
+        if falha is not None:
+            raise DatabaseError("Sem conexão com o MySQL desde a última mutação") from falha
+        self.sincronizar_journal()
+        if len(self.journal):
+            raise DatabaseError("Há mutações pendentes no journal")
+    
+    def _exigir_journal_sincronizado(self, acao: str):
+        """Sincroniza o journal antes de uma mutação que não vai para ele
+        
+        Editar e excluir não são registrados offline (uma exclusão reaplicada
+        depois poderia apagar o que outro cliente alterou nesse meio tempo):
+        com mutações pendentes que não puderam ser sincronizadas, a operação
+        é recusada com uma mensagem clara.
+        """
+        try:
+            self._sincronizar_antes_de_mutar()
+        except DatabaseError as e:
+            raise DatabaseError(
+                f"Não é possível {acao} agora: há {len(self.journal)} alterações feitas "
+                "sem conexão aguardando sincronização. Tente de novo quando o banco voltar."
+            ) from e
+    
+    def sincronizar_journal(self, batch_size: int = 100) -> dict:
+        """Reaplica o journal em transações por lote
+        
+        Cada op_id aplicado é gravado em journal_operacoes na mesma transação
+        da mutação, então reaplicar um lote já confirmado não tem efeito.
+        Conflitos (projeto excluído, etapa alterada por outro cliente) e
+        entradas que o banco recusa (ex.: etapa excluída) são registrados e
+        descartados do journal; só erros de conexão interrompem a sincronização.
+        """
+        resumo = {"aplicadas": 0, "duplicadas": 0, "conflitos": [], "id_map": {}}
+        if self.journal is None or not len(self.journal):
+            return resumo
+        
+        self._ensure_connection()
+        entradas = self.journal.pendentes()
+        id_map = resumo["id_map"]
+        
+        for inicio in range(0, len(entradas), batch_size):
+            lote = entradas[inicio:inicio + batch_size]
+            try:
+                self.connection.start_transaction()
+                cursor = self.connection.cursor()
+                placeholders = ", ".join(["%s"] * len(lote))
+                cursor.execute(
+                    f"SELECT op_id, resultado_id FROM journal_operacoes WHERE op_id IN ({placeholders})",
+                    [entrada["op_id"] for entrada in lote]
+                )
+                ja_aplicadas = dict(cursor.fetchall())
+                
+                for entrada in lote:
+                    op = entrada["op"]
+                    args = dict(entrada["args"])
+                    if op != "criar_projeto" and args.get("projeto_id") in id_map:
+                        args["projeto_id"] = id_map[args["projeto_id"]]
+                    
+                    if entrada["op_id"] in ja_aplicadas:
+                        if op == "criar_projeto" and ja_aplicadas[entrada["op_id"]]:
+                            id_map[args["projeto_id"]] = ja_aplicadas[entrada["op_id"]]
+                        resumo["duplicadas"] += 1
+                        continue
+                    
+                    cursor.execute("SAVEPOINT entrada_journal")
+                    try:
+                        resultado_id, conflito = self._aplicar_entrada_journal(cursor, op, args)
+                    except Error as e:
+                        if self._erro_de_conexao(e):
+                            raise
+                        # Só esta entrada é desfeita; repeti-la falharia sempre
+                        cursor.execute("ROLLBACK TO SAVEPOINT entrada_journal")
+                        resultado_id, conflito = None, f"recusada pelo banco: {e}"
+                    if conflito:
+                        resumo["conflitos"].append({
+                            "op_id": entrada["op_id"], "op": op,
+                            "args": args, "motivo": conflito
+                        })
+                    else:
+                        resumo["aplicadas"] += 1
+                        if op == "criar_projeto":
+                            id_map[args["projeto_id"]] = resultado_id
+                    
+                    cursor.execute(
+                        "INSERT INTO journal_operacoes (op_id, operacao, resultado_id, status) "
+                        "VALUES (%s, %s, %s, %s)",
+                        (entrada["op_id"], op, resultado_id, "conflito" if conflito else "aplicada")
+                    )
+                
+                cursor.close()
+                self.connection.commit()
+            except Error as e:
+                try:
+                    self.connection.rollback()
+                except Error:
+                    pass
+                raise DatabaseError(f"Erro ao sincronizar journal: {e}") from e
+            
+            self._registrar_escrita()
+            self.journal.mapear_ids(id_map)
+            self.journal.remover(entrada["op_id"] for entrada in lote)
+        
+        # O banco voltou: as próximas mutações tentam o MySQL de novo
+        self.journal.falha_conexao = None
+        for conflito in resumo["conflitos"]:
+            print(f"⚠️ Conflito no journal ({conflito['op']}): {conflito['motivo']}")
+        print(f"✓ Journal sincronizado: {resumo['aplicadas']} aplicadas, "
+              f"{resumo['duplicadas']} duplicadas, {len(resumo['conflitos'])} conflitos")
+        
+        self.notify("journal_sincronizado", resumo)
+        return resumo
+    
+    @staticmethod
+    def _valor_journal(valor) -> Decimal:
+        """Valor de uma entrada do journal: centavos, ou texto em reais nas entradas antigas"""
+        if isinstance(valor, int):
+            return para_decimal(valor)
+        return Decimal(valor)
+    
+    def _aplicar_entrada_journal(self, cursor, op: str, args: dict) -> Tuple[Optional[int], Optional[str]]:
+        """Aplica uma entrada do journal; retorna (id_resultante, motivo_do_conflito)"""
+        if op == "criar_projeto":
+            cursor.execute(
+                """
+                INSERT INTO projetos (nome, descricao, pasta_local, arquivo_principal, etapa_atual, posicao)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                (args["nome"], args["descricao"], args["pasta_local"],
+                 args["arquivo_principal"], args["etapa_atual"],
+                 self._posicao_no_topo(cursor, args["etapa_atual"]))
+            )
+            return cursor.lastrowid, None
+        
+        if args["projeto_id"] < 0:
+            return None, "projeto criado offline não foi aplicado"
+        
+        if op == "mover_projeto_etapa":
+            # Entradas antigas não têm posição: o projeto vai para o topo
+            posicao = args.get("posicao")
+            if posicao is None:
+                posicao = self._posicao_no_topo(cursor, args["nova_etapa"])
+            params = (args["nova_etapa"], args["nova_etapa"], posicao, args["projeto_id"])
+            if args.get("etapa_origem") is None:
+                cursor.execute(self.SQL_MOVER, params)
+            else:
+                cursor.execute(self.SQL_MOVER + " AND etapa_atual = %s",
+                               params + (args["etapa_origem"],))
+            if cursor.rowcount:
+                return args["projeto_id"], None
+            
+            cursor.execute("SELECT etapa_atual FROM projetos WHERE id = %s", (args["projeto_id"],))
+            row = cursor.fetchone()
+            if row is None:
+                return None, "projeto foi excluído"
+            if row[0] != args["nova_etapa"]:
+                return None, "etapa alterada por outro cliente"
+            return args["projeto_id"], None
+        
+        if op == "adicionar_faturamento":
+            try:
+                cursor.execute(
+                    """
+                    INSERT INTO faturamentos (projeto_id, valor, descricao, data_faturamento)
+                    VALUES (%s, %s, %s, %s)
+                    """,
+                    (args["projeto_id"], self._valor_journal(args["valor"]),
+                     args["descricao"], args["data_faturamento"])
+                )
+            except errors.IntegrityError:
+                return None, "projeto foi excluído"
+            return cursor.lastrowid, None
+        
+        return None, f"operação desconhecida: {op}"
+    
+    # Arquivo de projetos concluídos
+    
+    COLUNAS_PROJETO_ARQUIVO = ("id, nome, descricao, pasta_local, arquivo_principal, "
+                               "etapa_atual, data_criacao, data_atualizacao")
+    COLUNAS_FATURAMENTO_ARQUIVO = "id, projeto_id, valor, descricao, data_faturamento, data_criacao"
+    
+    def arquivar_projetos(self, dias: int, etapa: Optional[int] = None, lote: int = 500) -> int:
+        """Move projetos da etapa final sem alteração há N dias para as tabelas de arquivo
+        
+        Projetos e faturamentos são copiados para projetos_arquivados e
+        faturamentos_arquivados e removidos das tabelas quentes (o DELETE em
+        projetos leva os faturamentos pelo ON DELETE CASCADE), tudo numa
+        transação. Sem etapa, usa a última etapa (Concluído).
+        """
+        self._ensure_connection()
+        try:
+            if etapa is None:
+                etapas = self.get_etapas()
+                if not etapas:
+                    return 0
+                etapa = etapas[-1].id
+            self.connection.start_transaction()
+            cursor = self.connection.cursor()
+            cursor.execute(
+                """
+                SELECT id FROM projetos
+                WHERE etapa_atual = %s AND data_atualizacao < NOW() - INTERVAL %s DAY
+                FOR UPDATE
+                """,
+                (etapa, dias)
+            )
+            projeto_ids = [row[0] for row in cursor.fetchall()]
+            for inicio in range(0, len(projeto_ids), lote):
+                ids = projeto_ids[inicio:inicio + lote]
+                marcadores = ", ".join(["%s"] * len(ids))
+                cursor.execute(
+                    f"INSERT INTO projetos_arquivados ({self.COLUNAS_PROJETO_ARQUIVO}) "
+                    f"SELECT {self.COLUNAS_PROJETO_ARQUIVO} FROM projetos WHERE id IN ({marcadores})",
+                    ids
+                )
+                cursor.execute(
+                    f"INSERT INTO faturamentos_arquivados ({self.COLUNAS_FATURAMENTO_ARQUIVO}) "
+                    f"SELECT {self.COLUNAS_FATURAMENTO_ARQUIVO} FROM faturamentos "
+                    f"WHERE projeto_id IN ({marcadores})",
+                    ids
+                )
+                cursor.execute(f"DELETE FROM projetos WHERE id IN ({marcadores})", ids)
+            cursor.close()
+            self.connection.commit()
+        except Error as e:
+            self.connection.rollback()
+            raise DatabaseError(f"Erro ao arquivar projetos: {e}")
+        
+        self._registrar_escrita()
+        if projeto_ids:
+            self.notify("projetos_arquivados", {
+                "projeto_ids": projeto_ids,
+                "quantidade": len(projeto_ids)
+            })
+        return len(projeto_ids)
+    
+    def desarquivar_projeto(self, projeto_id: int):
+        """Devolve um projeto arquivado (e seus faturamentos) ao quadro"""
+        self._ensure_connection()
+        try:
+            self.connection.start_transaction()
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT etapa_atual FROM projetos_arquivados WHERE id = %s", (projeto_id,))
+            row = cursor.fetchone()
+            if row is None:
+                self.connection.rollback()
+                raise DatabaseError(f"Projeto arquivado {projeto_id} não encontrado")
+            # Volta no topo da etapa, com data_atualizacao de agora: com a data
+            # antiga o projeto seria arquivado de novo na próxima abertura
+            cursor.execute(
+                f"INSERT INTO projetos ({self.COLUNAS_PROJETO_ARQUIVO}, posicao) "
+                f"SELECT id, nome, descricao, pasta_local, arquivo_principal, etapa_atual, "
+                f"data_criacao, CURRENT_TIMESTAMP, %s FROM projetos_arquivados WHERE id = %s",
+                (self._posicao_no_topo(cursor, row[0]), projeto_id)
+            )
+            cursor.execute(
+                f"INSERT INTO faturamentos ({self.COLUNAS_FATURAMENTO_ARQUIVO}) "
+                f"SELECT {self.COLUNAS_FATURAMENTO_ARQUIVO} FROM faturamentos_arquivados "
+                f"WHERE projeto_id = %s",
+                (projeto_id,)
+            )
+            # Os faturamentos arquivados saem pelo ON DELETE CASCADE
+            cursor.execute("DELETE FROM projetos_arquivados WHERE id = %s", (projeto_id,))
+            cursor.close()
+            self.connection.commit()
+        except Error as e:
+            self.connection.rollback()
+            raise DatabaseError(f"Erro ao desarquivar projeto: {e}")
+        
+        self._registrar_escrita()
+        projeto = self.get_projeto_by_id(projeto_id)
+        self.notify("projeto_desarquivado", {
+            "projeto_id": projeto_id,
+            "etapa": projeto.etapa_atual if projeto else None,
+            "projeto": projeto
+        })
+    
+    def contar_arquivados_por_etapa(self) -> Dict[int, int]:
+        """Quantidade de projetos arquivados de cada etapa"""
+        self._ensure_connection()
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT etapa_atual, COUNT(*) FROM projetos_arquivados GROUP BY etapa_atual")
+            contagem = {row[0]: row[1] for row in cursor.fetchall()}
+            cursor.close()
+            return contagem
+        except Error as e:
+            raise DatabaseError(f"Erro ao contar projetos arquivados: {e}")
+    
+    def get_projetos_arquivados(self, etapa: Optional[int] = None, busca: Optional[str] = None,
+                                limit: int = 50, offset: int = 0) -> List[Projeto]:
+        """Página de projetos arquivados, mais recentes primeiro, com a receita do arquivo"""
+        self._ensure_connection()
+        try:
+            cursor = self.connection.cursor()
+            query = """
+                SELECT p.id, p.nome, p.descricao, p.pasta_local, p.arquivo_principal,
+                       p.etapa_atual, p.data_criacao, p.data_atualizacao,
+                       CAST(ROUND(COALESCE((SELECT SUM(f.valor) FROM faturamentos_arquivados f
+                                            WHERE f.projeto_id = p.id), 0) * 100) AS SIGNED) AS receita_total,
+                       '' AS posicao
+                FROM projetos_arquivados p
+            """
+            condicoes, params = [], []
+            if etapa is not None:
+                condicoes.append("p.etapa_atual = %s")
+                params.append(etapa)
+            if busca:
+                condicoes.append("(p.nome LIKE %s OR p.descricao LIKE %s)")
+                params.extend([f"%{busca}%"] * 2)
+            if condicoes:
+                query += " WHERE " + " AND ".join(condicoes)
+            query += " ORDER BY p.data_atualizacao DESC, p.id DESC LIMIT %s OFFSET %s"
+            cursor.execute(query, params + [limit, offset])
+            projetos = [self._projeto_from_row(row) for row in cursor.fetchall()]
+            cursor.close()
+            return projetos
+        except Error as e:
+            raise DatabaseError(f"Erro ao buscar projetos arquivados: {e}")
+    
+    # Backup e restauração
+    
+    # Colunas de cada tabela e a coluna usada como marca d'água incremental
+    TABELAS_BACKUP = {
+        "etapas": (("id", "nome", "ordem"), None),
+        # Sem marca: reordenar não altera data_atualizacao, então os
+        # incrementais levam a tabela inteira (pequena perto de faturamentos)
+        "projetos": (("id", "nome", "descricao", "pasta_local", "arquivo_principal",
+                      "etapa_atual", "data_criacao", "data_atualizacao", "posicao"), None),
+        "faturamentos": (("id", "projeto_id", "valor", "descricao", "data_faturamento",
+                          "data_criacao"), "data_criacao"),
+        "projetos_arquivados": (("id", "nome", "descricao", "pasta_local", "arquivo_principal",
+                                 "etapa_atual", "data_criacao", "data_atualizacao",
+                                 "data_arquivamento"), "data_arquivamento"),
+        "faturamentos_arquivados": (("id", "projeto_id", "valor", "descricao", "data_faturamento",
+                                     "data_criacao", "data_arquivamento"), "data_arquivamento"),
+    }
+    
+    @contextmanager
+    def snapshot_leitura(self):
+        """Transação somente leitura com snapshot consistente entre as tabelas"""
+        self._ensure_connection()
+        try:
+            self.connection.start_transaction(consistent_snapshot=True,
+                                              isolation_level="REPEATABLE READ",
+                                              readonly=True)
+        except Error as e:
+            raise DatabaseError(f"Erro ao iniciar snapshot: {e}")
+        try:
+            yield self
+        finally:
+            self.connection.commit()
+    
+    def iter_backup(self, tabela: str, desde: Optional[datetime] = None, lote: int = 5000):
+        """Itera lotes de linhas brutas de uma tabela com cursor não bufferizado
+        
+        Com desde, traz só as linhas com a marca d'água da tabela >= desde
+        (o >= repete as linhas do mesmo segundo; a restauração é idempotente).
+        """
+        colunas, marca = self.TABELAS_BACKUP[tabela]
+        self._ensure_connection()
+        try:
+            cursor = self.connection.cursor(buffered=False)
+            query = f"SELECT {', '.join(colunas)} FROM {tabela}"
+            params = ()
+            if desde is not None and marca is not None:
+                query += f" WHERE {marca} >= %s"
+                params = (desde,)
+            cursor.execute(query + " ORDER BY id", params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(lote)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.fetchall()
+                cursor.close()
+        except Error as e:
+            raise DatabaseError(f"Erro ao ler {tabela} para backup: {e}")
+    
+    def restaurar_backup(self, lotes) -> Dict[str, int]:
+        """Grava lotes (tabela, colunas, linhas) com executemany numa única transação
+        
+        Cada lote vira um INSERT de várias linhas com ON DUPLICATE KEY UPDATE,
+        então restaurar um backup incremental sobre a base atualiza as linhas
+        existentes. colunas são as do backup (os antigos não têm posicao) e
+        precisam estar em TABELAS_BACKUP. Qualquer erro desfaz a restauração inteira.
+        """
+        self._ensure_connection()
+        contagem: Dict[str, int] = {}
+        try:
+            self.connection.start_transaction()
+            cursor = self.connection.cursor()
+            for tabela, colunas, linhas in lotes:
+                conhecidas, _ = self.TABELAS_BACKUP[tabela]
+                if not colunas or not set(colunas) <= set(conhecidas):
+                    raise DatabaseError(f"Colunas desconhecidas no backup de {tabela}: {colunas}")
+                atualizacoes = ", ".join(f"{c} = VALUES({c})" for c in colunas if c != "id")
+                cursor.executemany(
+                    f"INSERT INTO {tabela} ({', '.join(colunas)}) "
+                    f"VALUES ({', '.join(['%s'] * len(colunas))}) "
+                    f"ON DUPLICATE KEY UPDATE {atualizacoes}",
+                    linhas
+                )
+                contagem[tabela] = contagem.get(tabela, 0) + len(linhas)
+            cursor.close()
+            self.connection.commit()
+        except Error as e:
+            self.connection.rollback()
+            raise DatabaseError(f"Erro ao restaurar backup: {e}")
+        except Exception:
+            # Falha ao ler o arquivo no meio da restauração
+            self.connection.rollback()
+            raise
+        
+        self._registrar_escrita()
+        self.notify("projetos_importados", {"quantidade": contagem.get("projetos", 0)})
+        return contagem
+    
     def close(self):
         """Fecha a conexão com o banco"""
+        self._fechar_replica()
         if self.connection and self.connection.is_connected():
             self.connection.close()
             print("✓ Conexão com MySQL fechada")
\ No newline at end of file
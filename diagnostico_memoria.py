@@ -0,0 +1,187 @@
+"""
+Diagnóstico de vazamentos de memória e widgets ao recarregar o quadro
+
+Uso:
+    python diagnostico_memoria.py [--ciclos 20] [--aquecimento 3] [--renderer widgets|canvas]
+
+Abre a interface com o banco configurado, sem entrar no mainloop, e roda N
+vezes o _load_projetos (que destrói e recria todos os cartões). Depois de
+cada ciclo mede a memória alocada pelo Python (tracemalloc), os widgets Tk
+vivos, os comandos Tcl registrados (cada callback de bind/command vira um
+comando que só some quando o widget é destruído) e os objetos Python por
+tipo. O crescimento por ciclo é calculado a partir do fim do aquecimento.
+
+Os snapshots do tracemalloc e as contagens por tipo só são feitos no fim
+do aquecimento e no último ciclo, sempre depois de ler a memória, e os da
+base ficam num arquivo temporário: guardados em memória, eles mesmos
+apareceriam como crescimento.
+
+Sai com código 1 se algum crescimento por ciclo passar do limite, para
+poder rodar como teste em CI.
+"""
+import argparse
+import gc
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+from config import UIConfig, get_database_config
+from db import Database
+
+
+def contar_widgets(widget) -> int:
+    """Widgets vivos na árvore, incluindo o próprio"""
+    return 1 + sum(contar_widgets(filho) for filho in widget.winfo_children())
+
+
+def contar_comandos_tcl(root) -> int:
+    return len(root.tk.splitlist(root.tk.call("info", "commands")))
+
+
+def contar_objetos() -> Counter:
+    """Objetos rastreados pelo gc, por nome de tipo"""
+    return Counter(type(objeto).__name__ for objeto in gc.get_objects())
+
+
+def medir(app) -> dict:
+    """Medidas do ciclo, só números: a memória é lida antes de qualquer outra alocação"""
+    gc.collect()
+    memoria = tracemalloc.get_traced_memory()[0]
+    return {
+        "memoria": memoria,
+        "widgets": contar_widgets(app.root),
+        "comandos": contar_comandos_tcl(app.root),
+        "objetos": len(gc.get_objects()),
+        "cards": sum(len(coluna.cards) for coluna in app.colunas.values()),
+    }
+
+
+def tirar_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+
+
+def guardar_base(pasta: str):
+    """Grava o snapshot e os tipos da base em disco e libera os objetos"""
+    tirar_snapshot().dump(os.path.join(pasta, "base.snapshot"))
+    with open(os.path.join(pasta, "base.tipos"), "wb") as f:
+        pickle.dump(contar_objetos(), f)
+    gc.collect()
+
+
+def carregar_base(pasta: str) -> tuple:
+    snapshot = tracemalloc.Snapshot.load(os.path.join(pasta, "base.snapshot"))
+    with open(os.path.join(pasta, "base.tipos"), "rb") as f:
+        return snapshot, pickle.load(f)
+
+
+def ciclo(app):
+    """Um refresh completo do quadro, processando os eventos pendentes do Tk"""
+    app._load_projetos()
+    app.root.update()
+
+
+def encerrar(app):
+    """Fecha a janela e os recursos sem gravar o snapshot do quadro"""
+    app.root.destroy()
+    app.scanner.close()
+    app.faturamentos.close()
+    app.writer.close()
+    app.db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Detector de vazamentos ao recarregar o quadro")
+    parser.add_argument("--ciclos", type=int, default=20)
+    parser.add_argument("--aquecimento", type=int, default=3,
+                        help="ciclos iniciais fora da conta (caches, fontes, imagens)")
+    parser.add_argument("--renderer", choices=["widgets", "canvas"], default=UIConfig.BOARD_RENDERER)
+    parser.add_argument("--frames", type=int, default=1,
+                        help="profundidade das pilhas guardadas pelo tracemalloc")
+    parser.add_argument("--top", type=int, default=10, help="linhas e tipos mostrados no relatório")
+    parser.add_argument("--limite-kb", type=float, default=50.0,
+                        help="crescimento máximo de memória por ciclo, em KB")
+    parser.add_argument("--limite-widgets", type=float, default=0.0,
+                        help="crescimento máximo de widgets Tk por ciclo")
+    parser.add_argument("--limite-comandos", type=float, default=0.0,
+                        help="crescimento máximo de comandos Tcl por ciclo")
+    parser.add_argument("--limite-objetos", type=float, default=200.0,
+                        help="crescimento máximo de objetos Python por ciclo")
+    args = parser.parse_args()
+    if args.ciclos <= args.aquecimento:
+        parser.error("--ciclos precisa ser maior que --aquecimento")
+
+    UIConfig.BOARD_RENDERER = args.renderer
+    from gui import KanbanGUI
+
+    tracemalloc.start(args.frames)
+    app = KanbanGUI(Database(**get_database_config()))
+    app.root.update()
+
+    base = None
+    pasta_base = tempfile.TemporaryDirectory(prefix="diagnostico-")
+    print(f"{'ciclo':>5} {'memória KB':>11} {'widgets':>8} {'cmds Tcl':>9} {'objetos':>9} {'cartões':>8} {'tempo ms':>9}")
+    try:
+        for numero in range(1, args.ciclos + 1):
+            inicio = time.perf_counter()
+            ciclo(app)
+            duracao = (time.perf_counter() - inicio) * 1000
+            medida = medir(app)
+            print(f"{numero:>5} {medida['memoria'] / 1024:>11.1f} {medida['widgets']:>8} "
+                  f"{medida['comandos']:>9} {medida['objetos']:>9} "
+                  f"{medida['cards']:>8} {duracao:>9.1f}")
+            if numero == args.aquecimento:
+                base = medida
+                guardar_base(pasta_base.name)
+        final = medida
+        # Só depois da última leitura: snapshots e contagens não entram na conta
+        snapshot_final, tipos_final = tirar_snapshot(), contar_objetos()
+        snapshot_base, tipos_base = carregar_base(pasta_base.name)
+    finally:
+        encerrar(app)
+        tracemalloc.stop()
+        pasta_base.cleanup()
+
+    medidos = args.ciclos - args.aquecimento
+    crescimento = {
+        "memória (KB)": ((final["memoria"] - base["memoria"]) / 1024 / medidos, args.limite_kb),
+        "widgets": ((final["widgets"] - base["widgets"]) / medidos, args.limite_widgets),
+        "comandos Tcl": ((final["comandos"] - base["comandos"]) / medidos, args.limite_comandos),
+        "objetos": ((final["objetos"] - base["objetos"]) / medidos, args.limite_objetos),
+    }
+
+    print(f"\n=== Tipos que mais cresceram ({medidos} ciclos) ===")
+    tipos = (tipos_final - tipos_base).most_common(args.top)
+    for nome, quantidade in tipos:
+        print(f"  {nome:<40} +{quantidade:>7}  ({quantidade / medidos:+.1f}/ciclo)")
+    if not tipos:
+        print("  nenhum")
+
+    print("\n=== Linhas que mais cresceram (tracemalloc) ===")
+    for estatistica in snapshot_final.compare_to(snapshot_base, "lineno")[:args.top]:
+        if estatistica.size_diff <= 0:
+            break
+        print(f"  {estatistica}")
+
+    print("\n=== Crescimento por ciclo ===")
+    falhou = False
+    for nome, (valor, limite) in crescimento.items():
+        passou = valor <= limite
+        falhou = falhou or not passou
+        print(f"  {'✓' if passou else '❌'} {nome:<14} {valor:+10.2f}  (limite {limite:g})")
+
+    if falhou:
+        print("\n❌ Crescimento acima do limite: provável vazamento entre recargas")
+        return 1
+    print("\n✓ Sem crescimento acima dos limites")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Dinheiro - Valores monetários como centavos inteiros
+
+Models e Database representam dinheiro como int de centavos. As consultas
+já devolvem centavos (CAST(ROUND(valor * 100) AS SIGNED)), as escritas
+passam por para_decimal(), e Decimal só aparece nessas bordas e na leitura
+do que o usuário digita. Somas e ajustes de totais viram aritmética de int.
+"""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+
+CENTAVO = Decimal("0.01")
+
+# Maior valor que cabe em DECIMAL(12, 2), em centavos
+MAXIMO = 10 ** 12 - 1
+
+
+def centavos(valor) -> int:
+    """Converte Decimal, int de reais, ou texto ("1234,56" ou "1234.56") em centavos
+
+    Levanta ValueError para valores inválidos, não finitos ou fora do que o
+    DECIMAL(12, 2) comporta. Frações de centavo são arredondadas como o
+    MySQL faria (metade para cima).
+    """
+    original = valor
+    try:
+        if isinstance(valor, str):
+            valor = valor.strip().replace(",", ".")
+        resultado = int(Decimal(valor).quantize(CENTAVO, rounding=ROUND_HALF_UP).scaleb(2))
+    except (InvalidOperation, TypeError, ValueError):
+        # quantize levanta InvalidOperation para expoentes grandes ("1e100")
+        raise ValueError(f"Valor inválido: {original!r}") from None
+    if abs(resultado) > MAXIMO:
+        raise ValueError(f"Valor fora do limite: {original!r}")
+    return resultado
+
+
+def para_decimal(valor_centavos: int) -> Decimal:
+    """Decimal exato com duas casas, para parâmetros de colunas DECIMAL"""
+    return Decimal(valor_centavos).scaleb(-2)
+
+
+def texto(valor_centavos: int) -> str:
+    """"1234.56" - mesmo texto que str() dava no Decimal de duas casas"""
+    sinal = "-" if valor_centavos < 0 else ""
+    reais, resto = divmod(abs(valor_centavos), 100)
+    return f"{sinal}{reais}.{resto:02d}"
+
+
+@lru_cache(maxsize=8192)
+def formatar(valor_centavos: int) -> str:
+    """"R$ 1,234.56" - mesmo texto de f"R$ {valor:,.2f}" no Decimal
+
+    Guardado em cache: o quadro formata os mesmos valores a cada recarga.
+    """
+    sinal = "-" if valor_centavos < 0 else ""
+    reais, resto = divmod(abs(valor_centavos), 100)
+    return f"R$ {sinal}{reais:,}.{resto:02d}"
@@ -0,0 +1,135 @@
+"""
+Editor - Abertura de pastas e arquivos de projeto sem bloquear a interface
+"""
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+from typing import Callable, List, Optional, Tuple
+
+
+# Editores procurados no PATH, em ordem de preferência. Os que aceitam
+# pasta e arquivo juntos abrem o arquivo principal dentro do projeto.
+EDITORES = [
+    # (executável, aceita pasta + arquivo)
+    ("code", True),
+    ("devenv", False),
+]
+
+if sys.platform == "win32":
+    ABRIDOR_PADRAO = None  # os.startfile
+elif sys.platform == "darwin":
+    ABRIDOR_PADRAO = "open"
+else:
+    ABRIDOR_PADRAO = "xdg-open"
+
+
+class EditorLauncher:
+    """Abre projetos no editor disponível em processos desacoplados
+
+    O editor é descoberto uma única vez (shutil.which) e guardado. Cada
+    abertura só faz o Popen e retorna; uma thread curta acompanha o processo
+    durante alguns segundos e, se ele terminar com erro, a falha vai para uma
+    fila que a interface drena com processar_falhas(), na thread do Tk.
+    """
+
+    def __init__(self, comando: Optional[str] = None, tempo_verificacao: float = 5.0):
+        self._comando = comando
+        self._editor: Optional[Tuple[Optional[str], bool]] = None
+        self._tempo_verificacao = tempo_verificacao
+        self._falhas: queue.Queue = queue.Queue()
+
+    def editor(self) -> Tuple[Optional[str], bool]:
+        """Retorna (caminho do executável, aceita pasta + arquivo); None usa o abridor do sistema"""
+        if self._editor is None:
+            self._editor = self._descobrir()
+        return self._editor
+
+    def _descobrir(self) -> Tuple[Optional[str], bool]:
+        if self._comando:
+            caminho = shutil.which(self._comando)
+            if caminho:
+                return caminho, os.path.basename(caminho).lower().startswith("code")
+            print(f"⚠️ Editor configurado não encontrado: {self._comando}")
+        for nome, multiplos in EDITORES:
+            caminho = shutil.which(nome)
+            if caminho:
+                print(f"✓ Editor encontrado: {caminho}")
+                return caminho, multiplos
+        if ABRIDOR_PADRAO is None:
+            return None, False
+        return shutil.which(ABRIDOR_PADRAO) or ABRIDOR_PADRAO, False
+
+    def redescobrir(self):
+        """Esquece o editor guardado (ex.: após instalar o VS Code)"""
+        self._editor = None
+
+    def _argumentos(self, pasta: str, arquivo: Optional[str]) -> Tuple[Optional[str], List[str]]:
+        executavel, multiplos = self.editor()
+        if multiplos:
+            return executavel, [pasta] + ([arquivo] if arquivo else [])
+        return executavel, [arquivo or pasta]
+
+    def abrir(self, pasta: str, arquivo: Optional[str] = None,
+              on_error: Optional[Callable] = None):
+        """Abre a pasta (e o arquivo, relativo à pasta) e retorna imediatamente
+
+        Falhas, síncronas ou não, chegam a on_error(mensagem) por processar_falhas().
+        """
+        if arquivo:
+            arquivo = os.path.join(pasta, arquivo)
+            if not os.path.exists(arquivo):
+                arquivo = None
+        executavel, argumentos = self._argumentos(pasta, arquivo)
+        try:
+            if executavel is None:
+                os.startfile(argumentos[0])
+                return
+            processo = subprocess.Popen([executavel] + argumentos, **self._opcoes_desacoplado())
+        except OSError as e:
+            # O executável guardado pode ter sido removido: descobre de novo na próxima
+            self.redescobrir()
+            self._falhas.put((on_error, f"Não foi possível abrir o editor: {e}"))
+            return
+
+        threading.Thread(target=self._acompanhar, args=(processo, on_error),
+                         name="kanban-editor", daemon=True).start()
+
+    @staticmethod
+    def _opcoes_desacoplado() -> dict:
+        """Processo filho sem stdio herdado e fora do grupo da aplicação"""
+        opcoes = {
+            "stdin": subprocess.DEVNULL,
+            "stdout": subprocess.DEVNULL,
+            "stderr": subprocess.DEVNULL,
+            "close_fds": True,
+        }
+        if sys.platform == "win32":
+            opcoes["creationflags"] = (subprocess.DETACHED_PROCESS
+                                       | subprocess.CREATE_NEW_PROCESS_GROUP)
+        else:
+            opcoes["start_new_session"] = True
+        return opcoes
+
+    def _acompanhar(self, processo: subprocess.Popen, on_error):
+        """Reporta o processo que sai com erro logo após ser iniciado"""
+        try:
+            codigo = processo.wait(timeout=self._tempo_verificacao)
+        except subprocess.TimeoutExpired:
+            return
+        if codigo != 0:
+            self._falhas.put((on_error, f"O editor terminou com código {codigo}"))
+
+    def processar_falhas(self):
+        """Entrega as falhas de abertura (chamar na thread do Tk)"""
+        while True:
+            try:
+                callback, mensagem = self._falhas.get_nowait()
+            except queue.Empty:
+                break
+            if callback is not None:
+                callback(mensagem)
+            else:
+                print(f"❌ {mensagem}")
@@ -4,15 +4,22 @@ Design moderno com paleta de cores harmoniosa
 """
 import customtkinter as ctk
 from datetime import datetime
-from decimal import Decimal, InvalidOperation
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import messagebox, simpledialog, ttk
 import os
-import subprocess
-import sys
 from typing import Dict, List, Optional
 from models import Projeto, Etapa, Faturamento
+import dinheiro
 from db import Database, DatabaseError
+from config import AppConfig, UIConfig
+from busca import BuscaProjetos
+from analytics import ReceitaAnalytics, TotaisEtapas
+from tarefas import BackgroundWriter
+from editor import EditorLauncher
+from scanner import InfoPasta, ScannerPastas
+from prefetch import CacheFaturamentos
+import ordem
+import snapshot
 
 
 # PALETA DE CORES MODERNA - Baseada em Material Design
@@ -53,7 +60,89 @@ ctk.set_appearance_mode("light")  # Modo claro
 ctk.set_default_color_theme("blue")
 
 
-class ProjetoCard(ctk.CTkFrame):
+class AcoesProjeto:
+    """Ações de um cartão de projeto, comuns aos dois renderizadores do quadro
+    
+    Quem herda precisa ter projeto, etapas, database e on_update_callback,
+    e informar em _parent_dialogos() o widget pai dos diálogos.
+    """
+    
+    def _parent_dialogos(self):
+        return self
+    
+    def _abrir_no_vscode(self):
+        """Abre o projeto no VS Code"""
+        if not self.projeto.pasta_local:
+            messagebox.showwarning("Aviso", "Pasta do projeto não definida!")
+            return
+        
+        if not os.path.exists(self.projeto.pasta_local):
+            messagebox.showerror("Erro", "Pasta do projeto não existe!")
+            return
+        
+        # A GUI abre pelo EditorLauncher, que retorna sem esperar o editor
+        self.on_update_callback("abrir_editor", {
+            "projeto_id": self.projeto.id,
+            "pasta": self.projeto.pasta_local,
+            "arquivo": self.projeto.arquivo_principal
+        })
+    
+    def _adicionar_receita(self):
+        """Abre dialog para adicionar receita"""
+        parent = self._parent_dialogos()
+        dialog = ReceitaDialog(parent, self.projeto.id, self.database)
+        parent.wait_window(dialog.dialog)
+        
+        if dialog.resultado:
+            self.on_update_callback()
+    
+    def _editar_projeto(self):
+        """Abre dialog para editar projeto"""
+        parent = self._parent_dialogos()
+        dialog = ProjetoDialog(parent, self.database, self.projeto)
+        parent.wait_window(dialog.dialog)
+        
+        if dialog.resultado:
+            self.on_update_callback()
+    
+    def _abrir_historico(self):
+        """Abre o histórico paginado de faturamentos"""
+        self.on_update_callback("abrir_historico", {"projeto": self.projeto})
+    
+    def _voltar_projeto(self):
+        """Move o projeto para a etapa anterior"""
+        etapas_ordenadas = sorted(self.etapas, key=lambda e: e.ordem)
+        etapa_atual_idx = next((i for i, e in enumerate(etapas_ordenadas) 
+                               if e.id == self.projeto.etapa_atual), 0)
+        
+        if etapa_atual_idx > 0:
+            nova_etapa = etapas_ordenadas[etapa_atual_idx - 1]
+            self.on_update_callback("mover_projeto", {
+                "projeto_id": self.projeto.id,
+                "nova_etapa": nova_etapa.id,
+                "etapa_origem": self.projeto.etapa_atual
+            })
+        else:
+            messagebox.showinfo("Info", "Projeto já está na primeira etapa!")
+    
+    def _avancar_projeto(self):
+        """Move o projeto para a próxima etapa"""
+        etapas_ordenadas = sorted(self.etapas, key=lambda e: e.ordem)
+        etapa_atual_idx = next((i for i, e in enumerate(etapas_ordenadas) 
+                               if e.id == self.projeto.etapa_atual), 0)
+        
+        if etapa_atual_idx < len(etapas_ordenadas) - 1:
+            nova_etapa = etapas_ordenadas[etapa_atual_idx + 1]
+            self.on_update_callback("mover_projeto", {
+                "projeto_id": self.projeto.id,
+                "nova_etapa": nova_etapa.id,
+                "etapa_origem": self.projeto.etapa_atual
+            })
+        else:
+            messagebox.showinfo("Info", "Projeto já está na última etapa!")
+
+
+class ProjetoCard(AcoesProjeto, ctk.CTkFrame):
     """Widget para exibir um cartão de projeto com design moderno"""
     
     def __init__(self, parent, projeto: Projeto, etapas: List[Etapa], on_update_callback, database: Database):
@@ -72,6 +161,7 @@ class ProjetoCard(ctk.CTkFrame):
         self.etapas = etapas
         self.on_update_callback = on_update_callback
         self.database = database
+        self.selecionado = False
         
         self._create_widgets()
         self._setup_layout()
@@ -79,6 +169,16 @@ class ProjetoCard(ctk.CTkFrame):
         # Efeito hover
         self.bind("<Enter>", self._on_enter)
         self.bind("<Leave>", self._on_leave)
+        
+        # Drag-and-drop entre colunas (pelo cartão e pelos textos)
+        self._arraste_inicio = None
+        self._arrastando = False
+        for widget in (self, self.titulo, self.receita, self.etapa):
+            widget.bind("<ButtonPress-1>", self._iniciar_arraste)
+            widget.bind("<B1-Motion>", self._arrastar)
+            widget.bind("<ButtonRelease-1>", self._soltar)
+            # Ctrl+clique seleciona vários cartões para mover de uma vez
+            widget.bind("<Control-Button-1>", self._alternar_selecao)
     
     def _on_enter(self, event):
         """Efeito hover ao passar o mouse"""
@@ -86,7 +186,18 @@ class ProjetoCard(ctk.CTkFrame):
     
     def _on_leave(self, event):
         """Remove o efeito hover"""
-        self.configure(border_color=COLOR_PALETTE['card_border'])
+        self.configure(border_color=self._cor_borda())
+    
+    def _cor_borda(self) -> str:
+        return COLOR_PALETTE['primary'] if self.selecionado else COLOR_PALETTE['card_border']
+    
+    def _alternar_selecao(self, event):
+        self.on_update_callback("alternar_selecao", {"projeto_id": self.projeto.id})
+    
+    def marcar_selecao(self, selecionado: bool):
+        """Destaca (ou não) o cartão como parte da seleção"""
+        self.selecionado = selecionado
+        self.configure(border_width=2 if selecionado else 1, border_color=self._cor_borda())
     
     def _create_widgets(self):
         """Cria os widgets do cartão com design moderno"""
@@ -100,7 +211,7 @@ class ProjetoCard(ctk.CTkFrame):
         )
         
         # Receita total com destaque
-        receita_text = f"R$ {self.projeto.receita_total:,.2f}"
+        receita_text = dinheiro.formatar(self.projeto.receita_total)
         self.receita = ctk.CTkLabel(
             self, 
             text=receita_text,
@@ -117,6 +228,15 @@ class ProjetoCard(ctk.CTkFrame):
             text_color=COLOR_PALETTE['text_muted']
         )
         
+        # Resumo da pasta local, exibido quando o scanner termina
+        self.info_pasta = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color=COLOR_PALETTE['text_muted'],
+            wraplength=250
+        )
+        
         # Container para botões
         self.btn_container = ctk.CTkFrame(self, fg_color="transparent")
         
@@ -160,6 +280,19 @@ class ProjetoCard(ctk.CTkFrame):
             corner_radius=6
         )
         
+        # Botão histórico de receitas
+        self.btn_historico = ctk.CTkButton(
+            self.btn_secondary,
+            text="📜",
+            command=self._abrir_historico,
+            height=32,
+            width=45,
+            font=ctk.CTkFont(size=12),
+            fg_color=COLOR_PALETTE['success'],
+            hover_color="#059669",
+            corner_radius=6
+        )
+        
         # Botão voltar etapa
         self.btn_voltar = ctk.CTkButton(
             self.btn_secondary,
@@ -201,7 +334,7 @@ class ProjetoCard(ctk.CTkFrame):
         self.etapa.grid(row=2, column=0, sticky="ew", padx=16, pady=(0, 16))
         
         # Container de botões
-        self.btn_container.grid(row=3, column=0, sticky="ew", padx=12, pady=(0, 16))
+        self.btn_container.grid(row=4, column=0, sticky="ew", padx=12, pady=(0, 16))
         self.btn_container.grid_columnconfigure(0, weight=1)
         
         # Botões principais com espaçamento
@@ -210,93 +343,67 @@ class ProjetoCard(ctk.CTkFrame):
         
         # Frame de botões secundários
         self.btn_secondary.grid(row=2, column=0, sticky="ew")
-        self.btn_secondary.grid_columnconfigure(0, weight=1)
-        self.btn_secondary.grid_columnconfigure(1, weight=0)
+        self.btn_secondary.grid_columnconfigure(0, weight=0)
+        self.btn_secondary.grid_columnconfigure(1, weight=1)
         self.btn_secondary.grid_columnconfigure(2, weight=0)
+        self.btn_secondary.grid_columnconfigure(3, weight=0)
         
         # Botões secundários alinhados
         self.btn_editar.grid(row=0, column=0, sticky="w")
-        self.btn_voltar.grid(row=0, column=1, sticky="e", padx=(8, 4))
-        self.btn_avancar.grid(row=0, column=2, sticky="e", padx=(4, 0))
-    
-    def _abrir_no_vscode(self):
-        """Abre o projeto no VS Code"""
-        if not self.projeto.pasta_local:
-            messagebox.showwarning("Aviso", "Pasta do projeto não definida!")
-            return
-        
-        if not os.path.exists(self.projeto.pasta_local):
-            messagebox.showerror("Erro", "Pasta do projeto não existe!")
-            return
-        
-        try:
-            if sys.platform == "win32":
-                subprocess.run(["code", self.projeto.pasta_local], shell=True, check=True)
-            else:
-                subprocess.run(["code", self.projeto.pasta_local], check=True)
-        except subprocess.CalledProcessError:
-            try:
-                if sys.platform == "win32":
-                    subprocess.run(["devenv", self.projeto.pasta_local], shell=True, check=True)
-                else:
-                    subprocess.run(["xdg-open", self.projeto.pasta_local], check=True)
-            except subprocess.CalledProcessError:
-                messagebox.showerror("Erro", "Não foi possível abrir o editor. Verifique se o VS Code está instalado.")
+        self.btn_historico.grid(row=0, column=1, sticky="w", padx=(8, 0))
+        self.btn_voltar.grid(row=0, column=2, sticky="e", padx=(8, 4))
+        self.btn_avancar.grid(row=0, column=3, sticky="e", padx=(4, 0))
     
-    def _adicionar_receita(self):
-        """Abre dialog para adicionar receita"""
-        dialog = ReceitaDialog(self, self.projeto.id, self.database)
-        self.wait_window(dialog.dialog)
-        
-        if dialog.resultado:
-            self.on_update_callback()
-    
-    def _editar_projeto(self):
-        """Abre dialog para editar projeto"""
-        dialog = ProjetoDialog(self, self.database, self.projeto)
-        self.wait_window(dialog.dialog)
-        
-        if dialog.resultado:
-            self.on_update_callback()
+    def _iniciar_arraste(self, event):
+        """Registra o ponto inicial de um possível arraste"""
+        self._arraste_inicio = (event.x_root, event.y_root)
+        self._arrastando = False
     
-    def _voltar_projeto(self):
-        """Move o projeto para a etapa anterior"""
-        etapas_ordenadas = sorted(self.etapas, key=lambda e: e.ordem)
-        etapa_atual_idx = next((i for i, e in enumerate(etapas_ordenadas) 
-                               if e.id == self.projeto.etapa_atual), 0)
-        
-        if etapa_atual_idx > 0:
-            nova_etapa = etapas_ordenadas[etapa_atual_idx - 1]
-            self.on_update_callback("mover_projeto", {
-                "projeto_id": self.projeto.id,
-                "nova_etapa": nova_etapa.id
-            })
-        else:
-            messagebox.showinfo("Info", "Projeto já está na primeira etapa!")
+    def _arrastar(self, event):
+        """Inicia o arraste após um deslocamento mínimo e destaca a coluna alvo"""
+        if self._arraste_inicio is None:
+            return
+        if not self._arrastando:
+            dx = abs(event.x_root - self._arraste_inicio[0])
+            dy = abs(event.y_root - self._arraste_inicio[1])
+            if max(dx, dy) < 8:
+                return
+            self._arrastando = True
+            self.configure(cursor="fleur", border_color=COLOR_PALETTE['primary'])
+        self.on_update_callback("arrastando_projeto", {
+            "projeto_id": self.projeto.id,
+            "x_root": event.x_root,
+            "y_root": event.y_root
+        })
     
-    def _avancar_projeto(self):
-        """Move o projeto para a próxima etapa"""
-        etapas_ordenadas = sorted(self.etapas, key=lambda e: e.ordem)
-        etapa_atual_idx = next((i for i, e in enumerate(etapas_ordenadas) 
-                               if e.id == self.projeto.etapa_atual), 0)
-        
-        if etapa_atual_idx < len(etapas_ordenadas) - 1:
-            nova_etapa = etapas_ordenadas[etapa_atual_idx + 1]
-            self.on_update_callback("mover_projeto", {
-                "projeto_id": self.projeto.id,
-                "nova_etapa": nova_etapa.id
-            })
-        else:
-            messagebox.showinfo("Info", "Projeto já está na última etapa!")
+    def _soltar(self, event):
+        """Solta o cartão sobre a coluna sob o cursor"""
+        arrastando = self._arrastando
+        self._arraste_inicio = None
+        self._arrastando = False
+        if not arrastando:
+            return
+        self.configure(cursor="", border_color=self._cor_borda())
+        self.on_update_callback("soltar_projeto", {
+            "projeto_id": self.projeto.id,
+            "x_root": event.x_root,
+            "y_root": event.y_root
+        })
     
     def atualizar_dados(self, projeto: Projeto):
         """Atualiza os dados exibidos no cartão"""
         self.projeto = projeto
         self.titulo.configure(text=projeto.nome)
-        self.receita.configure(text=f"R$ {projeto.receita_total:,.2f}")
+        self.receita.configure(text=dinheiro.formatar(projeto.receita_total))
         
         etapa_atual = next((e.nome for e in self.etapas if e.id == projeto.etapa_atual), "Desconhecida")
         self.etapa.configure(text=f"📍 {etapa_atual}")
+    
+    def atualizar_pasta(self, info: InfoPasta):
+        """Mostra o resumo da pasta local vindo do scanner"""
+        cor = COLOR_PALETTE['warning'] if "⚠️" in info.resumo() else COLOR_PALETTE['text_muted']
+        self.info_pasta.configure(text=info.resumo(), text_color=cor)
+        self.info_pasta.grid(row=3, column=0, sticky="ew", padx=16, pady=(0, 12))
 
 
 class ReceitaDialog:
@@ -456,11 +563,10 @@ class ReceitaDialog:
         """Salva a receita no banco de dados"""
         # Validação dos campos
         try:
-            valor_str = self.valor_entry.get().strip()
-            valor = Decimal(valor_str.replace(',', '.'))
+            valor = dinheiro.centavos(self.valor_entry.get())
             if valor <= 0:
                 raise ValueError("Valor deve ser positivo")
-        except (ValueError, InvalidOperation):
+        except ValueError:
             messagebox.showerror("Erro", "Valor inválido! Use formato: 123.45")
             return
         
@@ -785,146 +891,1244 @@ class ProjetoDialog:
         self.dialog.destroy()
 
 
-class KanbanColumn(ctk.CTkFrame):
-    """Coluna do Kanban com design moderno"""
+class AnalyticsDialog:
+    """Painel de receitas: mensal, comparativo anual, por etapa e top projetos"""
     
-    def __init__(self, parent, etapa: Etapa, etapas: List[Etapa], on_update_callback, database: Database):
-        super().__init__(
-            parent, 
-            corner_radius=12,
-            border_width=1,
-            border_color=COLOR_PALETTE['card_border'],
-            fg_color=COLOR_PALETTE['column_bg']
-        )
-        
-        # Armazena todas as propriedades necessárias
-        self.etapa = etapa
-        self.etapas = etapas
-        self.on_update_callback = on_update_callback
-        self.database = database
-        self.cards: List[ProjetoCard] = []
+    def __init__(self, parent, analytics: ReceitaAnalytics):
+        self.parent = parent
+        self.analytics = analytics
         
-        if self.database is None:
-            raise ValueError(f"Database não foi fornecido para coluna {etapa.nome}")
+        self.dialog = ctk.CTkToplevel(parent)
+        self.dialog.title("Receitas")
+        self.dialog.geometry("720x640")
+        self.dialog.configure(fg_color=COLOR_PALETTE['bg_primary'])
+        self.dialog.transient(parent)
         
         self._create_widgets()
         self._setup_layout()
+        self._load_data()
     
     def _create_widgets(self):
-        """Cria os widgets da coluna com design moderno"""
-        # Cabeçalho da coluna com ícones
-        icons = {
-            'Backlog': '📋',
-            'Em Andamento': '⚡',
-            'Em Revisão': '🔍',
-            'Concluído': '✅'
-        }
-        icon = icons.get(self.etapa.nome, '📌')
-        
-        self.header = ctk.CTkLabel(
-            self,
-            text=f"{icon} {self.etapa.nome}",
-            font=ctk.CTkFont(size=16, weight="bold"),
-            text_color=COLOR_PALETTE['text_primary'],
-            height=50
+        """Cria os widgets do painel"""
+        self.titulo = ctk.CTkLabel(
+            self.dialog,
+            text="📊 Receitas",
+            font=ctk.CTkFont(size=20, weight="bold"),
+            text_color=COLOR_PALETTE['text_primary']
         )
-        
-        # Frame scrollable para os cartões com design moderno
-        self.scrollable_frame = ctk.CTkScrollableFrame(
-            self,
-            width=300,
-            height=600,
-            corner_radius=8,
-            fg_color=COLOR_PALETTE['bg_secondary'],
+        self.conteudo = ctk.CTkScrollableFrame(
+            self.dialog,
+            corner_radius=16,
+            fg_color=COLOR_PALETTE['card_bg'],
             border_width=1,
             border_color=COLOR_PALETTE['card_border']
         )
+        self.fonte_secao = ctk.CTkFont(size=16, weight="bold")
+        self.fonte_linha = ctk.CTkFont(size=13)
     
     def _setup_layout(self):
-        """Organiza o layout com espaçamentos modernos"""
-        self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(1, weight=1)
-        
-        # Header com padding
-        self.header.grid(row=0, column=0, sticky="ew", padx=16, pady=(16, 8))
-        
-        # Frame scrollable com padding
-        self.scrollable_frame.grid(row=1, column=0, sticky="nsew", padx=16, pady=(0, 16))
-        self.scrollable_frame.grid_columnconfigure(0, weight=1)
+        """Organiza o layout do painel"""
+        self.titulo.pack(pady=(20, 10))
+        self.conteudo.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        self.conteudo.grid_columnconfigure(0, weight=1)
+        self._linha_atual = 0
+    
+    def _secao(self, texto: str):
+        """Adiciona o título de uma seção"""
+        ctk.CTkLabel(
+            self.conteudo, text=texto, font=self.fonte_secao,
+            text_color=COLOR_PALETTE['primary']
+        ).grid(row=self._linha_atual, column=0, columnspan=3, sticky="w", padx=16, pady=(16, 6))
+        self._linha_atual += 1
     
-    def adicionar_projeto(self, projeto: Projeto):
-        """Adiciona um projeto à coluna"""
+    def _linha(self, *colunas: str):
+        """Adiciona uma linha de tabela"""
+        for i, texto in enumerate(colunas):
+            ctk.CTkLabel(
+                self.conteudo, text=texto, font=self.fonte_linha,
+                text_color=COLOR_PALETTE['text_secondary'] if i == 0 else COLOR_PALETTE['text_primary']
+            ).grid(row=self._linha_atual, column=i, sticky="w" if i == 0 else "e", padx=16, pady=1)
+        self._linha_atual += 1
+    
+    def _load_data(self):
+        """Preenche o painel a partir do cache de agregados"""
         try:
-            if self.database is None:
-                raise ValueError(f"Database é None na coluna {self.etapa.nome}")
-            
-            # Cria o card com espaçamento moderno
-            card = ProjetoCard(
-                self.scrollable_frame,
-                projeto,
-                self.etapas,
-                self.on_update_callback,
-                self.database
-            )
+            self._secao("Últimos 12 meses × ano anterior")
+            for mes, valor, anterior in self.analytics.comparativo_anual():
+                if anterior:
+                    variacao = f"{(valor - anterior) / anterior * 100:+.1f}%"
+                else:
+                    variacao = "—"
+                self._linha(mes, dinheiro.formatar(valor), f"{variacao}  ({dinheiro.formatar(anterior)})")
             
-            # Grid com espaçamento entre cards
-            card.grid(row=len(self.cards), column=0, sticky="ew", padx=8, pady=8)
-            self.cards.append(card)
+            self._secao("Receita por etapa")
+            for etapa, quantidade, receita in self.analytics.receita_por_etapa():
+                self._linha(etapa.nome, f"{quantidade} projetos", dinheiro.formatar(receita))
             
-        except Exception as e:
-            print(f"ERRO ao adicionar projeto '{projeto.nome}': {e}")
-            import traceback
-            traceback.print_exc()
-            messagebox.showerror("Erro", f"Erro ao adicionar projeto: {e}")
-    
-    def remover_projeto(self, projeto_id: int):
-        """Remove um projeto da coluna"""
-        for i, card in enumerate(self.cards):
-            if card.projeto.id == projeto_id:
-                card.destroy()
-                self.cards.pop(i)
-                # Reorganiza os cartões restantes
-                for j, remaining_card in enumerate(self.cards[i:], start=i):
-                    remaining_card.grid_forget()
-                    remaining_card.grid(row=j, column=0, sticky="ew", padx=8, pady=8)
-                break
-    
-    def atualizar_projeto(self, projeto: Projeto):
-        """Atualiza um projeto específico na coluna"""
-        for card in self.cards:
-            if card.projeto.id == projeto.id:
-                card.atualizar_dados(projeto)
-                break
-    
-    def limpar(self):
-        """Remove todos os cartões da coluna"""
-        for card in self.cards:
-            card.destroy()
-        self.cards.clear()
+            self._secao("Top projetos")
+            for posicao, (_, nome, receita) in enumerate(self.analytics.top_projetos(), start=1):
+                self._linha(f"{posicao}. {nome}", "", dinheiro.formatar(receita))
+        except DatabaseError as e:
+            messagebox.showerror("Erro", f"Erro ao carregar receitas: {e}")
 
 
-class KanbanGUI:
-    """Interface principal do sistema Kanban com design moderno"""
+class HistoricoReceitaDialog:
+    """Histórico de faturamentos de um projeto, paginado sob demanda
     
-    def __init__(self, database: Database):
-        self.db = database
-        self.db.add_observer(self)
-        
-        # Configuração da janela principal
-        self.root = ctk.CTk()
-        self.root.title("🔧 Kanban Projects Manager")
-        self.root.geometry("1400x800")
-        self.root.state('zoomed')
+    Abre com o resumo (uma consulta de agregados no índice) e a primeira
+    página. As páginas seguintes são buscadas em background pelo
+    BackgroundWriter quando a rolagem se aproxima do fim da lista.
+    """
+    
+    def __init__(self, parent, database: Database, projeto: Projeto, writer: BackgroundWriter,
+                 cache: Optional[CacheFaturamentos] = None):
+        self.parent = parent
+        self.database = database
+        self.projeto = projeto
+        self.writer = writer
+        self.cache = cache
+        self._faturamentos: Dict[str, Faturamento] = {}
+        self._ultimo = None
+        self._carregando = False
+        self._fim = False
+        self._quantidade = 0
+        self._total = 0
         
-        # Configura a cor de fundo da janela
-        self.root.configure(fg_color=COLOR_PALETTE['bg_primary'])
+        self.dialog = ctk.CTkToplevel(parent)
+        self.dialog.title(f"Histórico - {projeto.nome}")
+        self.dialog.geometry("640x560")
+        self.dialog.configure(fg_color=COLOR_PALETTE['bg_primary'])
+        self.dialog.transient(parent)
+        
+        self._create_widgets()
+        self._setup_layout()
+        self._load_data()
+    
+    def _create_widgets(self):
+        """Cria os widgets do histórico"""
+        self.titulo = ctk.CTkLabel(
+            self.dialog,
+            text=f"📜 {self.projeto.nome}",
+            font=ctk.CTkFont(size=20, weight="bold"),
+            text_color=COLOR_PALETTE['text_primary']
+        )
+        self.resumo = ctk.CTkLabel(
+            self.dialog,
+            text="",
+            font=ctk.CTkFont(size=13),
+            text_color=COLOR_PALETTE['text_secondary']
+        )
+        
+        self.lista_frame = ctk.CTkFrame(self.dialog, fg_color=COLOR_PALETTE['card_bg'], corner_radius=12)
+        estilo = ttk.Style(self.dialog)
+        estilo.configure("Historico.Treeview", rowheight=26, font=("", 11))
+        estilo.configure("Historico.Treeview.Heading", font=("", 11, "bold"))
+        self.lista = ttk.Treeview(
+            self.lista_frame,
+            columns=("data", "valor", "descricao"),
+            show="headings",
+            selectmode="browse",
+            style="Historico.Treeview"
+        )
+        self.lista.heading("data", text="Data")
+        self.lista.heading("valor", text="Valor")
+        self.lista.heading("descricao", text="Descrição")
+        self.lista.column("data", width=100, anchor="center", stretch=False)
+        self.lista.column("valor", width=130, anchor="e", stretch=False)
+        self.lista.column("descricao", width=320, anchor="w")
+        self.scrollbar = ctk.CTkScrollbar(self.lista_frame, command=self.lista.yview)
+        self.lista.configure(yscrollcommand=self._on_scroll)
+        
+        self.status = ctk.CTkLabel(
+            self.dialog,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color=COLOR_PALETTE['text_muted']
+        )
+        self.btn_excluir = ctk.CTkButton(
+            self.dialog,
+            text="🗑️ Excluir selecionado",
+            command=self._excluir,
+            height=36,
+            fg_color=COLOR_PALETTE['danger'],
+            hover_color="#DC2626"
+        )
+    
+    def _setup_layout(self):
+        """Organiza o layout do histórico"""
+        self.titulo.pack(pady=(20, 4))
+        self.resumo.pack(pady=(0, 10))
+        self.lista_frame.pack(fill="both", expand=True, padx=20)
+        self.lista.pack(side="left", fill="both", expand=True, padx=(8, 0), pady=8)
+        self.scrollbar.pack(side="right", fill="y", pady=8)
+        self.status.pack(pady=(6, 0))
+        self.btn_excluir.pack(pady=(6, 20))
+    
+    def _load_data(self):
+        """Resumo e primeira página, do cache de prefetch ou lidos de forma síncrona"""
+        entrada = self.cache.get(self.projeto.id) if self.cache is not None else None
+        if entrada is not None:
+            self._quantidade, self._total, primeira, _ = entrada.resumo
+            self._atualizar_resumo(primeira)
+            self._acrescentar(entrada.faturamentos)
+            return
+        try:
+            self._quantidade, self._total, primeira, _ = \
+                self.database.get_resumo_faturamentos(self.projeto.id)
+            self._atualizar_resumo(primeira)
+            self._acrescentar(self.database.get_faturamentos_pagina(
+                self.projeto.id, limite=AppConfig.HISTORY_PAGE_SIZE))
+        except DatabaseError as e:
+            messagebox.showerror("Erro", f"Erro ao carregar histórico: {e}")
+    
+    def _atualizar_resumo(self, primeira=None):
+        rotulo = "faturamento" if self._quantidade == 1 else "faturamentos"
+        texto = f"{self._quantidade} {rotulo} · {dinheiro.formatar(self._total)}"
+        if primeira:
+            texto += f" · desde {primeira:%d/%m/%Y}"
+        self.resumo.configure(text=texto)
+    
+    def _on_scroll(self, primeiro, ultimo):
+        """Repassa à barra de rolagem e pede a próxima página perto do fim"""
+        self.scrollbar.set(primeiro, ultimo)
+        if float(ultimo) >= 0.8:
+            self._carregar_proxima()
+    
+    def _carregar_proxima(self):
+        """Busca a próxima página em background"""
+        if self._carregando or self._fim or self._ultimo is None:
+            return
+        self._carregando = True
+        self.status.configure(text="Carregando...")
+        projeto_id, depois = self.projeto.id, self._ultimo
+        self.writer.submit(
+            lambda db: db.get_faturamentos_pagina(projeto_id, depois, AppConfig.HISTORY_PAGE_SIZE),
+            on_success=self._on_pagina,
+            on_error=self._on_erro_pagina
+        )
+    
+    def _on_pagina(self, pagina: List[Faturamento]):
+        if not self.dialog.winfo_exists():
+            return
+        self._carregando = False
+        self._acrescentar(pagina)
+    
+    def _on_erro_pagina(self, erro):
+        if not self.dialog.winfo_exists():
+            return
+        self._carregando = False
+        self.status.configure(text=f"⚠️ Erro ao carregar mais: {erro}")
+    
+    def _acrescentar(self, pagina: List[Faturamento]):
+        """Acrescenta uma página ao fim da lista"""
+        for faturamento in pagina:
+            iid = str(faturamento.id)
+            self._faturamentos[iid] = faturamento
+            self.lista.insert("", "end", iid=iid, values=(
+                f"{faturamento.data_faturamento:%d/%m/%Y}",
+                dinheiro.formatar(faturamento.valor),
+                faturamento.descricao or ""
+            ))
+        if pagina:
+            self._ultimo = (pagina[-1].data_faturamento, pagina[-1].id)
+        if len(pagina) < AppConfig.HISTORY_PAGE_SIZE:
+            self._fim = True
+        carregados = len(self._faturamentos)
+        self.status.configure(text=f"{carregados} de {self._quantidade} carregados")
+    
+    def _excluir(self):
+        """Exclui o faturamento selecionado"""
+        selecao = self.lista.selection()
+        if not selecao:
+            messagebox.showinfo("Info", "Selecione um faturamento.", parent=self.dialog)
+            return
+        faturamento = self._faturamentos[selecao[0]]
+        if not messagebox.askyesno(
+            "Confirmar",
+            f"Excluir o faturamento de {dinheiro.formatar(faturamento.valor)} "
+            f"de {faturamento.data_faturamento:%d/%m/%Y}?",
+            parent=self.dialog
+        ):
+            return
+        try:
+            self.database.excluir_faturamento(faturamento.id, faturamento.projeto_id, faturamento.valor)
+        except DatabaseError as e:
+            messagebox.showerror("Erro", f"Erro ao excluir faturamento: {e}", parent=self.dialog)
+            return
+        self.lista.delete(selecao[0])
+        del self._faturamentos[selecao[0]]
+        self._quantidade -= 1
+        self._total -= faturamento.valor
+        self._atualizar_resumo()
+        self.status.configure(text=f"{len(self._faturamentos)} de {self._quantidade} carregados")
+
+
+class ArquivadosDialog:
+    """Lista paginada dos projetos arquivados de uma etapa, carregada sob demanda"""
+    
+    def __init__(self, parent, database: Database, etapa: Etapa):
+        self.parent = parent
+        self.database = database
+        self.etapa = etapa
+        self._offset = 0
+        self._busca_pendente = None
+        
+        self.dialog = ctk.CTkToplevel(parent)
+        self.dialog.title(f"Arquivados - {etapa.nome}")
+        self.dialog.geometry("640x600")
+        self.dialog.configure(fg_color=COLOR_PALETTE['bg_primary'])
+        self.dialog.transient(parent)
+        
+        self._create_widgets()
+        self._setup_layout()
+        self._carregar_pagina()
+    
+    def _create_widgets(self):
+        """Cria os widgets da lista"""
+        self.titulo = ctk.CTkLabel(
+            self.dialog,
+            text=f"🗄️ Arquivados · {self.etapa.nome}",
+            font=ctk.CTkFont(size=20, weight="bold"),
+            text_color=COLOR_PALETTE['text_primary']
+        )
+        self.busca_entry = ctk.CTkEntry(
+            self.dialog,
+            placeholder_text="🔎 Buscar nos arquivados...",
+            height=36,
+            corner_radius=8
+        )
+        self.busca_entry.bind("<KeyRelease>", self._on_busca_alterada)
+        self.conteudo = ctk.CTkScrollableFrame(
+            self.dialog,
+            corner_radius=16,
+            fg_color=COLOR_PALETTE['card_bg'],
+            border_width=1,
+            border_color=COLOR_PALETTE['card_border']
+        )
+        self.btn_mais = ctk.CTkButton(
+            self.dialog,
+            text="Carregar mais",
+            command=self._carregar_pagina,
+            height=36,
+            fg_color=COLOR_PALETTE['primary'],
+            hover_color=COLOR_PALETTE['primary_dark']
+        )
+        self.fonte_linha = ctk.CTkFont(size=13)
+    
+    def _setup_layout(self):
+        """Organiza o layout da lista"""
+        self.titulo.pack(pady=(20, 10))
+        self.busca_entry.pack(fill="x", padx=20, pady=(0, 10))
+        self.conteudo.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+        self.conteudo.grid_columnconfigure(0, weight=1)
+        self.btn_mais.pack(pady=(0, 20))
+        self._linha_atual = 0
+    
+    def _on_busca_alterada(self, event=None):
+        """Refaz a lista após uma pausa na digitação"""
+        if self._busca_pendente is not None:
+            self.dialog.after_cancel(self._busca_pendente)
+        self._busca_pendente = self.dialog.after(AppConfig.SEARCH_DEBOUNCE_MS, self._reiniciar)
+    
+    def _reiniciar(self):
+        self._busca_pendente = None
+        for widget in self.conteudo.winfo_children():
+            widget.destroy()
+        self._linha_atual = 0
+        self._offset = 0
+        self._carregar_pagina()
+    
+    def _carregar_pagina(self):
+        """Busca a próxima página no banco e acrescenta à lista"""
+        try:
+            projetos = self.database.get_projetos_arquivados(
+                self.etapa.id, self.busca_entry.get().strip() or None,
+                limit=AppConfig.ARCHIVE_PAGE_SIZE, offset=self._offset
+            )
+        except DatabaseError as e:
+            messagebox.showerror("Erro", f"Erro ao carregar arquivados: {e}")
+            return
+        self._offset += len(projetos)
+        for projeto in projetos:
+            self._linha(projeto)
+        if len(projetos) < AppConfig.ARCHIVE_PAGE_SIZE:
+            self.btn_mais.configure(state="disabled", text="Fim da lista")
+        else:
+            self.btn_mais.configure(state="normal", text="Carregar mais")
+    
+    def _linha(self, projeto: Projeto):
+        """Adiciona um projeto arquivado à lista"""
+        data = f"{projeto.data_atualizacao:%d/%m/%Y}" if projeto.data_atualizacao else ""
+        widgets = [
+            ctk.CTkLabel(self.conteudo, text=projeto.nome, font=self.fonte_linha,
+                         text_color=COLOR_PALETTE['text_primary'], anchor="w"),
+            ctk.CTkLabel(self.conteudo, text=data, font=self.fonte_linha,
+                         text_color=COLOR_PALETTE['text_muted']),
+            ctk.CTkLabel(self.conteudo, text=dinheiro.formatar(projeto.receita_total),
+                         font=self.fonte_linha, text_color=COLOR_PALETTE['success']),
+        ]
+        botao = ctk.CTkButton(
+            self.conteudo, text="↩ Desarquivar", width=110, height=28,
+            font=ctk.CTkFont(size=12),
+            fg_color=COLOR_PALETTE['info'], hover_color="#0891B2"
+        )
+        botao.configure(command=lambda: self._desarquivar(projeto, widgets + [botao]))
+        for i, widget in enumerate(widgets + [botao]):
+            widget.grid(row=self._linha_atual, column=i, sticky="ew" if i == 0 else "e",
+                        padx=(16 if i == 0 else 8, 16 if i == 3 else 0), pady=3)
+        self._linha_atual += 1
+    
+    def _desarquivar(self, projeto: Projeto, widgets: list):
+        """Devolve o projeto ao quadro e o tira da lista"""
+        try:
+            self.database.desarquivar_projeto(projeto.id)
+        except DatabaseError as e:
+            messagebox.showerror("Erro", f"Erro ao desarquivar projeto: {e}")
+            return
+        for widget in widgets:
+            widget.destroy()
+        self._offset -= 1
+
+
+class KanbanColumn(ctk.CTkFrame):
+    """Coluna do Kanban com design moderno"""
+    
+    def __init__(self, parent, etapa: Etapa, etapas: List[Etapa], on_update_callback, database: Database,
+                 info_pastas: Optional[Dict[int, InfoPasta]] = None):
+        super().__init__(
+            parent, 
+            corner_radius=12,
+            border_width=1,
+            border_color=COLOR_PALETTE['card_border'],
+            fg_color=COLOR_PALETTE['column_bg']
+        )
+        
+        # Armazena todas as propriedades necessárias
+        self.etapa = etapa
+        self.etapas = etapas
+        self.on_update_callback = on_update_callback
+        self.database = database
+        self.info_pastas = info_pastas if info_pastas is not None else {}
+        self.cards: List[ProjetoCard] = []
+        
+        if self.database is None:
+            raise ValueError(f"Database não foi fornecido para coluna {etapa.nome}")
+        
+        self._create_widgets()
+        self._setup_layout()
+    
+    def _create_widgets(self):
+        """Cria os widgets da coluna com design moderno"""
+        # Cabeçalho da coluna com ícones
+        icons = {
+            'Backlog': '📋',
+            'Em Andamento': '⚡',
+            'Em Revisão': '🔍',
+            'Concluído': '✅'
+        }
+        icon = icons.get(self.etapa.nome, '📌')
+        
+        self.header = ctk.CTkLabel(
+            self,
+            text=f"{icon} {self.etapa.nome}",
+            font=ctk.CTkFont(size=16, weight="bold"),
+            text_color=COLOR_PALETTE['text_primary'],
+            height=50
+        )
+        
+        # Quantidade de projetos e receita da etapa
+        self.totais = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color=COLOR_PALETTE['text_muted']
+        )
+        
+        # Projetos arquivados da etapa: só a contagem; a lista abre sob demanda
+        self.btn_arquivados = ctk.CTkButton(
+            self,
+            text="",
+            command=lambda: self.on_update_callback("abrir_arquivados", {"etapa": self.etapa}),
+            height=28,
+            font=ctk.CTkFont(size=12),
+            fg_color="transparent",
+            text_color=COLOR_PALETTE['text_secondary'],
+            hover_color=COLOR_PALETTE['hover_light']
+        )
+        
+        self._create_area_cards()
+    
+    def _create_area_cards(self):
+        """Cria a área dos cartões: um CTkScrollableFrame com um widget por cartão"""
+        # Frame scrollable para os cartões com design moderno
+        self.scrollable_frame = ctk.CTkScrollableFrame(
+            self,
+            width=300,
+            height=600,
+            corner_radius=8,
+            fg_color=COLOR_PALETTE['bg_secondary'],
+            border_width=1,
+            border_color=COLOR_PALETTE['card_border']
+        )
+    
+    def _setup_layout(self):
+        """Organiza o layout com espaçamentos modernos"""
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+        
+        # Header com padding
+        self.header.grid(row=0, column=0, sticky="ew", padx=16, pady=(16, 0))
+        self.totais.grid(row=1, column=0, sticky="ew", padx=16, pady=(0, 8))
+        
+        self._layout_area_cards()
+    
+    def _layout_area_cards(self):
+        # Frame scrollable com padding
+        self.scrollable_frame.grid(row=2, column=0, sticky="nsew", padx=16, pady=(0, 16))
+        self.scrollable_frame.grid_columnconfigure(0, weight=1)
+    
+    def adicionar_projeto(self, projeto: Projeto, indice: Optional[int] = None):
+        """Adiciona um projeto à coluna, no fim ou na posição indicada"""
+        try:
+            if self.database is None:
+                raise ValueError(f"Database é None na coluna {self.etapa.nome}")
+            
+            # Cria o card com espaçamento moderno
+            card = ProjetoCard(
+                self.scrollable_frame,
+                projeto,
+                self.etapas,
+                self.on_update_callback,
+                self.database
+            )
+            
+            # Grid com espaçamento entre cards
+            if indice is None or indice >= len(self.cards):
+                indice = len(self.cards)
+            card.grid(row=indice, column=0, sticky="ew", padx=8, pady=8)
+            self.cards.insert(indice, card)
+            self._regridar(indice + 1)
+            if projeto.id in self.info_pastas:
+                card.atualizar_pasta(self.info_pastas[projeto.id])
+            
+        except Exception as e:
+            print(f"ERRO ao adicionar projeto '{projeto.nome}': {e}")
+            import traceback
+            traceback.print_exc()
+            messagebox.showerror("Erro", f"Erro ao adicionar projeto: {e}")
+    
+    def remover_projeto(self, projeto_id: int):
+        """Remove um projeto da coluna"""
+        for i, card in enumerate(self.cards):
+            if card.projeto.id == projeto_id:
+                card.destroy()
+                self.cards.pop(i)
+                # Reorganiza os cartões restantes
+                self._regridar(i)
+                break
+    
+    def adicionar_projetos(self, projetos: List[Projeto], indice: int = 0):
+        """Insere vários projetos a partir de indice, com um único relayout dos seguintes"""
+        indice = min(indice, len(self.cards))
+        novos = []
+        for j, projeto in enumerate(projetos, start=indice):
+            card = ProjetoCard(
+                self.scrollable_frame,
+                projeto,
+                self.etapas,
+                self.on_update_callback,
+                self.database
+            )
+            card.grid(row=j, column=0, sticky="ew", padx=8, pady=8)
+            if projeto.id in self.info_pastas:
+                card.atualizar_pasta(self.info_pastas[projeto.id])
+            novos.append(card)
+        self.cards[indice:indice] = novos
+        self._regridar(indice + len(novos))
+    
+    def remover_projetos(self, projeto_ids: set):
+        """Remove vários projetos com um único relayout dos cartões seguintes"""
+        primeiro = None
+        restantes = []
+        for i, card in enumerate(self.cards):
+            if card.projeto.id in projeto_ids:
+                card.destroy()
+                if primeiro is None:
+                    primeiro = i
+            else:
+                restantes.append(card)
+        if primeiro is not None:
+            self.cards[:] = restantes
+            self._regridar(primeiro)
+    
+    def _regridar(self, inicio: int, fim: Optional[int] = None):
+        """Atualiza a linha do grid dos cartões de inicio até fim (inclusive)
+        
+        Cartões escondidos pela busca continuam escondidos: o grid_remove
+        guarda a nova linha para quando voltarem.
+        """
+        fim = len(self.cards) - 1 if fim is None else fim
+        for j in range(inicio, fim + 1):
+            card = self.cards[j]
+            oculto = not card.winfo_manager()
+            card.grid(row=j, column=0, sticky="ew", padx=8, pady=8)
+            if oculto:
+                card.grid_remove()
+    
+    def indice_projeto(self, projeto_id: int) -> Optional[int]:
+        """Posição do cartão do projeto na coluna"""
+        for i, card in enumerate(self.cards):
+            if card.projeto.id == projeto_id:
+                return i
+        return None
+    
+    def reposicionar_projeto(self, projeto_id: int, indice: int):
+        """Leva o cartão para outra posição, relayout só dos cartões entre as duas"""
+        atual = self.indice_projeto(projeto_id)
+        if atual is None:
+            return
+        indice = min(indice, len(self.cards) - 1)
+        if indice == atual:
+            return
+        self.cards.insert(indice, self.cards.pop(atual))
+        self._regridar(min(atual, indice), max(atual, indice))
+    
+    def _meio_do_card(self, card) -> Optional[float]:
+        """Altura (na tela) do meio do cartão; None se estiver escondido"""
+        if not card.winfo_ismapped():
+            return None
+        return card.winfo_rooty() + card.winfo_height() / 2
+    
+    def indice_em(self, y_root: int, ignorar: Optional[int] = None) -> int:
+        """Posição em que um cartão solto na altura y_root da tela entra
+        
+        Contada sem o cartão ignorar (o que está sendo arrastado), que é a
+        posição final dele depois de sair do lugar atual.
+        """
+        outros = [card for card in self.cards if card.projeto.id != ignorar]
+        for i, card in enumerate(outros):
+            meio = self._meio_do_card(card)
+            if meio is not None and y_root < meio:
+                return i
+        return len(outros)
+    
+    def indice_para_posicao(self, posicao: str, ignorar: Optional[int] = None) -> int:
+        """Posição na coluna de um cartão com essa posição de ordenação"""
+        outros = [card for card in self.cards if card.projeto.id != ignorar]
+        for i, card in enumerate(outros):
+            if card.projeto.posicao > posicao:
+                return i
+        return len(outros)
+    
+    def posicao_para(self, indice: int, ignorar: Optional[int] = None) -> Optional[str]:
+        """Posição de ordenação entre os vizinhos de indice (sem o cartão ignorar)
+        
+        None se os vizinhos não estiverem numerados em ordem; nesse caso a
+        coluna precisa ser renumerada.
+        """
+        outros = [card for card in self.cards if card.projeto.id != ignorar]
+        antes = outros[indice - 1].projeto.posicao if indice > 0 else None
+        depois = outros[indice].projeto.posicao if indice < len(outros) else None
+        try:
+            return ordem.entre(antes, depois)
+        except ValueError:
+            return None
+    
+    def precisa_renumerar(self) -> bool:
+        """Indica se as posições da coluna estão vazias, fora de ordem ou longas demais"""
+        return ordem.precisa_renumerar([card.projeto.posicao for card in self.cards
+                                        if card.projeto.id is not None and card.projeto.id > 0],
+                                       AppConfig.RANK_MAX_LENGTH)
+    
+    def aplicar_posicoes(self, posicoes: Dict[int, str]):
+        """Guarda as posições renumeradas (a ordem dos cartões não muda)"""
+        for card in self.cards:
+            if card.projeto.id in posicoes:
+                card.projeto.posicao = posicoes[card.projeto.id]
+    
+    def atualizar_projeto(self, projeto: Projeto):
+        """Atualiza um projeto específico na coluna"""
+        for card in self.cards:
+            if card.projeto.id == projeto.id:
+                card.atualizar_dados(projeto)
+                break
+    
+    def atualizar_arquivados(self, quantidade: int):
+        """Mostra o atalho "N arquivados" abaixo dos cartões quando houver algum"""
+        if quantidade:
+            rotulo = "arquivado" if quantidade == 1 else "arquivados"
+            self.btn_arquivados.configure(text=f"🗄️ {quantidade} {rotulo}")
+            self.btn_arquivados.grid(row=3, column=0, sticky="ew", padx=16, pady=(0, 12))
+        else:
+            self.btn_arquivados.grid_remove()
+    
+    def atualizar_totais(self, quantidade: int, receita: int):
+        """Mostra a quantidade de projetos e a receita (centavos) da etapa no cabeçalho"""
+        rotulo = "projeto" if quantidade == 1 else "projetos"
+        self.totais.configure(text=f"{quantidade} {rotulo} · {dinheiro.formatar(receita)}")
+    
+    def filtrar(self, visiveis: Optional[set]):
+        """Esconde os cartões fora do conjunto de IDs (None mostra todos)
+        
+        Só cartões cuja visibilidade muda são tocados, então digitar na busca
+        não re-grida a coluna inteira.
+        """
+        for card in self.cards:
+            mostrar = visiveis is None or card.projeto.id in visiveis
+            if mostrar != bool(card.winfo_manager()):
+                if mostrar:
+                    card.grid()
+                else:
+                    card.grid_remove()
+    
+    def limpar(self):
+        """Remove todos os cartões da coluna"""
+        for card in self.cards:
+            card.destroy()
+        self.cards.clear()
+    
+    def projetos_visiveis(self) -> List[int]:
+        """IDs dos cartões que aparecem na área visível da coluna"""
+        topo = self.winfo_rooty()
+        base = topo + self.winfo_height()
+        visiveis = []
+        for card in self.cards:
+            if not card.winfo_ismapped():
+                continue
+            y = card.winfo_rooty()
+            if y < base and y + card.winfo_height() > topo:
+                visiveis.append(card.projeto.id)
+        return visiveis
+
+
+class CanvasCard(AcoesProjeto):
+    """Cartão desenhado como itens de um tk.Canvas compartilhado pela coluna
+    
+    Não cria widgets: guarda o projeto e a posição no canvas. Todos os itens
+    do cartão levam a tag do cartão, então mover, esconder ou apagar o
+    cartão é uma única chamada ao canvas.
+    """
+    
+    def __init__(self, coluna: "CanvasKanbanColumn", projeto: Projeto):
+        self.coluna = coluna
+        self.projeto = projeto
+        self.etapas = coluna.etapas
+        self.on_update_callback = coluna.on_update_callback
+        self.database = coluna.database
+        self.tag = f"card{projeto.id}"
+        self.info_pasta: Optional[InfoPasta] = coluna.info_pastas.get(projeto.id)
+        self.y = 0
+        self.altura = 0
+        self.visivel = True
+        self.selecionado = False
+    
+    def _parent_dialogos(self):
+        return self.coluna.canvas
+    
+    def marcar_selecao(self, selecionado: bool):
+        """Destaca (ou não) o cartão como parte da seleção"""
+        self.selecionado = selecionado
+        self.coluna.canvas.itemconfigure(f"{self.tag}&&borda", width=2 if selecionado else 1,
+                                         outline=self.coluna._cor_borda(self))
+    
+    def atualizar_dados(self, projeto: Projeto):
+        """Atualiza os dados exibidos no cartão"""
+        self.projeto = projeto
+        self.coluna._redesenhar(self)
+    
+    def atualizar_pasta(self, info: InfoPasta):
+        """Mostra o resumo da pasta local vindo do scanner"""
+        self.info_pasta = info
+        self.coluna._redesenhar(self)
+
+
+class CanvasKanbanColumn(KanbanColumn):
+    """Coluna que desenha todos os cartões num único tk.Canvas
+    
+    Alternativa ao KanbanColumn para quadros grandes: em vez de um CTkFrame
+    com labels e cinco CTkButtons por projeto, cada cartão é um punhado de
+    itens de canvas (retângulos arredondados e textos). Hover, cliques e
+    arraste são tratados por bindings do próprio canvas, a partir das tags
+    do item sob o cursor. Selecionado por UIConfig.BOARD_RENDERER = "canvas".
+    """
+    
+    LARGURA = 300
+    MARGEM = 8
+    
+    # (ação, texto, cor, cor do hover); a ação é o método de AcoesProjeto
+    BOTOES_PRINCIPAIS = [
+        ("_abrir_no_vscode", "🎯 Abrir VS Code", COLOR_PALETTE['primary'], COLOR_PALETTE['primary_dark']),
+        ("_adicionar_receita", "💰 + Receita", COLOR_PALETTE['success'], "#059669"),
+    ]
+    BOTAO_EDITAR = ("_editar_projeto", "✏️ Editar", COLOR_PALETTE['info'], "#0891B2")
+    BOTAO_HISTORICO = ("_abrir_historico", "📜", COLOR_PALETTE['success'], "#059669")
+    BOTOES_ETAPA = [
+        ("_voltar_projeto", "⬅️", COLOR_PALETTE['warning'], "#D97706"),
+        ("_avancar_projeto", "➡️", COLOR_PALETTE['warning'], "#D97706"),
+    ]
+    
+    _fontes = None
+    
+    def _create_area_cards(self):
+        """Cria a área dos cartões: um canvas com barra de rolagem"""
+        if CanvasKanbanColumn._fontes is None:
+            # Fontes compartilhadas por todas as colunas e cartões
+            CanvasKanbanColumn._fontes = {
+                "titulo": ctk.CTkFont(size=15, weight="bold"),
+                "receita": ctk.CTkFont(size=14, weight="bold"),
+                "etapa": ctk.CTkFont(size=12),
+                "info": ctk.CTkFont(size=11),
+                "botao": ctk.CTkFont(size=13, weight="bold"),
+                "botao_secundario": ctk.CTkFont(size=12),
+            }
+        self._cards_por_tag: Dict[str, CanvasCard] = {}
+        self._altura_total = 0
+        self._hover_card: Optional[CanvasCard] = None
+        self._hover_botao = None
+        self._clique = None
+        self._arrastando = False
+        
+        self.area_cards = ctk.CTkFrame(
+            self,
+            corner_radius=8,
+            fg_color=COLOR_PALETTE['bg_secondary'],
+            border_width=1,
+            border_color=COLOR_PALETTE['card_border']
+        )
+        self.canvas = tk.Canvas(
+            self.area_cards,
+            width=self.LARGURA,
+            height=600,
+            bg=COLOR_PALETTE['bg_secondary'],
+            highlightthickness=0
+        )
+        self.scrollbar = ctk.CTkScrollbar(self.area_cards, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<Leave>", lambda e: self._definir_hover(None, None))
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self._on_release)
+        self.canvas.bind("<Control-Button-1>", self._on_ctrl_clique)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-3, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(3, "units"))
+    
+    def _layout_area_cards(self):
+        self.area_cards.grid(row=2, column=0, sticky="nsew", padx=16, pady=(0, 16))
+        self.area_cards.grid_rowconfigure(0, weight=1)
+        self.area_cards.grid_columnconfigure(0, weight=1)
+        self.canvas.grid(row=0, column=0, sticky="nsew", padx=(4, 0), pady=4)
+        self.scrollbar.grid(row=0, column=1, sticky="ns", pady=4)
+    
+    # Desenho
+    
+    @staticmethod
+    def _pontos_arredondados(x0, y0, x1, y1, r):
+        """Pontos de um polígono suavizado que forma um retângulo arredondado"""
+        return [x0 + r, y0, x1 - r, y0, x1, y0, x1, y0 + r,
+                x1, y1 - r, x1, y1, x1 - r, y1, x0 + r, y1,
+                x0, y1, x0, y1 - r, x0, y0 + r, x0, y0]
+    
+    def _desenhar_botao(self, card: CanvasCard, botao, x0, y0, x1, y1, fonte, raio):
+        acao, texto, cor, _ = botao
+        tags = (card.tag, "botao", f"acao:{acao}")
+        self.canvas.create_polygon(
+            self._pontos_arredondados(x0, y0, x1, y1, raio),
+            smooth=True, fill=cor, outline="", tags=tags + ("fundo_botao",)
+        )
+        self.canvas.create_text((x0 + x1) / 2, (y0 + y1) / 2, text=texto,
+                                font=self._fontes[fonte], fill="#FFFFFF", tags=tags)
+    
+    def _desenhar(self, card: CanvasCard, y: int):
+        """Desenha o cartão a partir da coordenada y e define sua altura"""
+        canvas = self.canvas
+        fontes = self._fontes
+        x0, x1 = self.MARGEM, self.LARGURA - self.MARGEM
+        y0 = y + self.MARGEM
+        projeto = card.projeto
+        
+        fundo = canvas.create_polygon(
+            self._pontos_arredondados(x0, y0, x1, y0 + 1, 12),
+            smooth=True, fill=COLOR_PALETTE['card_bg'],
+            outline=self._cor_borda(card), width=2 if card.selecionado else 1,
+            tags=(card.tag, "borda")
+        )
+        
+        titulo = canvas.create_text(
+            x0 + 16, y0 + 16, anchor="nw", text=projeto.nome,
+            width=x1 - x0 - 32, font=fontes["titulo"],
+            fill=COLOR_PALETTE['text_primary'], tags=(card.tag,)
+        )
+        cursor = canvas.bbox(titulo)[3] + 8
+        
+        canvas.create_text(
+            (x0 + x1) / 2, cursor, anchor="n", text=dinheiro.formatar(projeto.receita_total),
+            font=fontes["receita"], fill=COLOR_PALETTE['success'], tags=(card.tag,)
+        )
+        cursor += fontes["receita"].metrics("linespace") + 8
+        
+        etapa_atual = next((e.nome for e in self.etapas if e.id == projeto.etapa_atual), "Desconhecida")
+        canvas.create_text(
+            (x0 + x1) / 2, cursor, anchor="n", text=f"📍 {etapa_atual}",
+            font=fontes["etapa"], fill=COLOR_PALETTE['text_muted'], tags=(card.tag,)
+        )
+        cursor += fontes["etapa"].metrics("linespace") + 16
+        
+        if card.info_pasta is not None:
+            resumo = card.info_pasta.resumo()
+            info = canvas.create_text(
+                (x0 + x1) / 2, cursor - 8, anchor="n", text=resumo, justify="center",
+                width=x1 - x0 - 32, font=fontes["info"],
+                fill=COLOR_PALETTE['warning'] if "⚠️" in resumo else COLOR_PALETTE['text_muted'],
+                tags=(card.tag,)
+            )
+            cursor = canvas.bbox(info)[3] + 12
+        
+        bx0, bx1 = x0 + 12, x1 - 12
+        for botao in self.BOTOES_PRINCIPAIS:
+            self._desenhar_botao(card, botao, bx0, cursor, bx1, cursor + 35, "botao", 8)
+            cursor += 35 + 8
+        cursor += 4
+        
+        self._desenhar_botao(card, self.BOTAO_EDITAR, bx0, cursor, bx0 + 80,
+                             cursor + 32, "botao_secundario", 6)
+        self._desenhar_botao(card, self.BOTAO_HISTORICO, bx0 + 88, cursor, bx0 + 133,
+                             cursor + 32, "botao_secundario", 6)
+        self._desenhar_botao(card, self.BOTOES_ETAPA[1], bx1 - 45, cursor, bx1,
+                             cursor + 32, "botao_secundario", 6)
+        self._desenhar_botao(card, self.BOTOES_ETAPA[0], bx1 - 45 - 8 - 45, cursor,
+                             bx1 - 45 - 8, cursor + 32, "botao_secundario", 6)
+        cursor += 32 + 16
+        
+        canvas.coords(fundo, *self._pontos_arredondados(x0, y0, x1, cursor, 12))
+        card.y = y
+        card.altura = cursor + self.MARGEM - y
+        if not card.visivel:
+            canvas.itemconfigure(card.tag, state="hidden")
+    
+    def _redesenhar(self, card: CanvasCard):
+        """Redesenha um cartão no lugar e desloca os seguintes se a altura mudar"""
+        altura_anterior = card.altura
+        self.canvas.delete(card.tag)
+        self._desenhar(card, card.y)
+        if card.visivel and card.altura != altura_anterior:
+            self._reposicionar()
+        if card is self._hover_card:
+            self._hover_card = None
+            self._hover_botao = None
+    
+    def _reposicionar(self):
+        """Empilha os cartões visíveis, movendo só os que mudaram de posição"""
+        y = 0
+        for card in self.cards:
+            if not card.visivel:
+                continue
+            if card.y != y:
+                self.canvas.move(card.tag, 0, y - card.y)
+                card.y = y
+            y += card.altura
+        self._altura_total = y
+        self.canvas.configure(scrollregion=(0, 0, self.LARGURA, y))
+    
+    # Interface de KanbanColumn
+    
+    def adicionar_projeto(self, projeto: Projeto, indice: Optional[int] = None):
+        """Adiciona um projeto à coluna, no fim ou na posição indicada"""
+        card = CanvasCard(self, projeto)
+        self._cards_por_tag[card.tag] = card
+        if indice is None or indice >= len(self.cards):
+            self._desenhar(card, self._altura_total)
+            self._altura_total += card.altura
+            self.cards.append(card)
+            self.canvas.configure(scrollregion=(0, 0, self.LARGURA, self._altura_total))
+            return
+        # Desenhado no lugar do cartão atual; só os seguintes descem
+        self._desenhar(card, self.cards[indice].y)
+        self.cards.insert(indice, card)
+        self._reposicionar()
+    
+    def adicionar_projetos(self, projetos: List[Projeto], indice: int = 0):
+        """Insere vários projetos a partir de indice, reposicionando os seguintes uma vez"""
+        indice = min(indice, len(self.cards))
+        y = self.cards[indice].y if indice < len(self.cards) else self._altura_total
+        novos = []
+        for projeto in projetos:
+            card = CanvasCard(self, projeto)
+            self._cards_por_tag[card.tag] = card
+            self._desenhar(card, y)
+            y += card.altura
+            novos.append(card)
+        self.cards[indice:indice] = novos
+        self._reposicionar()
+    
+    def remover_projetos(self, projeto_ids: set):
+        """Remove vários projetos, reposicionando os restantes uma vez"""
+        for projeto_id in projeto_ids:
+            card = self._cards_por_tag.pop(f"card{projeto_id}", None)
+            if card is None:
+                continue
+            self.canvas.delete(card.tag)
+            if card is self._hover_card:
+                self._hover_card = None
+                self._hover_botao = None
+        self.cards[:] = [card for card in self.cards if card.projeto.id not in projeto_ids]
+        self._reposicionar()
+    
+    def reposicionar_projeto(self, projeto_id: int, indice: int):
+        """Leva o cartão para outra posição; só os cartões entre as duas se movem"""
+        card = self._cards_por_tag.get(f"card{projeto_id}")
+        if card is None:
+            return
+        atual = self.cards.index(card)
+        indice = min(indice, len(self.cards) - 1)
+        if indice == atual:
+            return
+        self.cards.insert(indice, self.cards.pop(atual))
+        self._reposicionar()
+    
+    def _meio_do_card(self, card: CanvasCard) -> Optional[float]:
+        if not card.visivel:
+            return None
+        return self.canvas.winfo_rooty() + card.y + card.altura / 2 - self.canvas.canvasy(0)
+    
+    def remover_projeto(self, projeto_id: int):
+        """Remove um projeto da coluna"""
+        card = self._cards_por_tag.pop(f"card{projeto_id}", None)
+        if card is None:
+            return
+        self.canvas.delete(card.tag)
+        self.cards.remove(card)
+        if card is self._hover_card:
+            self._hover_card = None
+            self._hover_botao = None
+        self._reposicionar()
+    
+    def atualizar_projeto(self, projeto: Projeto):
+        """Atualiza um projeto específico na coluna"""
+        card = self._cards_por_tag.get(f"card{projeto.id}")
+        if card is not None:
+            card.atualizar_dados(projeto)
+    
+    def filtrar(self, visiveis: Optional[set]):
+        """Esconde os cartões fora do conjunto de IDs (None mostra todos)"""
+        mudou = False
+        for card in self.cards:
+            mostrar = visiveis is None or card.projeto.id in visiveis
+            if mostrar != card.visivel:
+                card.visivel = mostrar
+                self.canvas.itemconfigure(card.tag, state="normal" if mostrar else "hidden")
+                mudou = True
+        if mudou:
+            self._reposicionar()
+    
+    def limpar(self):
+        """Remove todos os cartões da coluna"""
+        self.canvas.delete("all")
+        self.cards.clear()
+        self._cards_por_tag.clear()
+        self._altura_total = 0
+        self._hover_card = None
+        self._hover_botao = None
+        self.canvas.configure(scrollregion=(0, 0, self.LARGURA, 0))
+    
+    def projetos_visiveis(self) -> List[int]:
+        """IDs dos cartões dentro da janela de rolagem do canvas"""
+        topo = self.canvas.canvasy(0)
+        base = topo + self.canvas.winfo_height()
+        return [card.projeto.id for card in self.cards
+                if card.visivel and card.y < base and card.y + card.altura > topo]
+    
+    # Eventos
+    
+    def _item_sob_cursor(self):
+        """Retorna (cartão, ação) do item sob o cursor"""
+        itens = self.canvas.find_withtag("current")
+        if not itens:
+            return None, None
+        return self._tags_do_item(itens[0])
+    
+    def _item_em(self, x: int, y: int):
+        """Retorna (cartão, ação) do item mais acima no ponto (coordenadas do widget)
+        
+        Com o botão pressionado o Tk não atualiza o item "current", então a
+        soltura procura o item pela posição.
+        """
+        x, y = self.canvas.canvasx(x), self.canvas.canvasy(y)
+        itens = self.canvas.find_overlapping(x, y, x, y)
+        if not itens:
+            return None, None
+        return self._tags_do_item(itens[-1])
+    
+    def _tags_do_item(self, item):
+        card, acao = None, None
+        for tag in self.canvas.gettags(item):
+            if tag.startswith("card"):
+                card = self._cards_por_tag.get(tag)
+            elif tag.startswith("acao:"):
+                acao = tag[5:]
+        return card, acao
+    
+    def _definir_hover(self, card: Optional[CanvasCard], acao: Optional[str]):
+        """Destaca a borda do cartão e o botão sob o cursor"""
+        botao = (card, acao) if card is not None and acao is not None else None
+        if botao != self._hover_botao:
+            if self._hover_botao is not None:
+                self._colorir_botao(*self._hover_botao, hover=False)
+            if botao is not None:
+                self._colorir_botao(*botao, hover=True)
+            self._hover_botao = botao
+        if card is not self._hover_card:
+            if self._hover_card is not None:
+                self.canvas.itemconfigure(f"{self._hover_card.tag}&&borda",
+                                          outline=self._cor_borda(self._hover_card))
+            if card is not None:
+                self.canvas.itemconfigure(f"{card.tag}&&borda",
+                                          outline=COLOR_PALETTE['primary_light'])
+            self._hover_card = card
+        self.canvas.configure(cursor="hand2" if botao is not None else "")
+    
+    def _colorir_botao(self, card: CanvasCard, acao: str, hover: bool):
+        for botao in self.BOTOES_PRINCIPAIS + [self.BOTAO_EDITAR, self.BOTAO_HISTORICO] + self.BOTOES_ETAPA:
+            if botao[0] == acao:
+                self.canvas.itemconfigure(f"{card.tag}&&acao:{acao}&&fundo_botao",
+                                          fill=botao[3] if hover else botao[2])
+                return
+    
+    @staticmethod
+    def _cor_borda(card: CanvasCard) -> str:
+        return COLOR_PALETTE['primary'] if card.selecionado else COLOR_PALETTE['card_border']
+    
+    def _on_motion(self, event):
+        self._definir_hover(*self._item_sob_cursor())
+    
+    def _on_ctrl_clique(self, event):
+        card, _ = self._item_sob_cursor()
+        if card is not None:
+            self.on_update_callback("alternar_selecao", {"projeto_id": card.projeto.id})
+    
+    def _on_wheel(self, event):
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+    
+    def _on_press(self, event):
+        card, acao = self._item_sob_cursor()
+        self._clique = (card, acao, event.x_root, event.y_root) if card is not None else None
+        self._arrastando = False
+    
+    def _on_drag(self, event):
+        """Arrasta o cartão pelo corpo (não pelos botões), como o ProjetoCard"""
+        if self._clique is None or self._clique[1] is not None:
+            return
+        card, _, x_inicio, y_inicio = self._clique
+        if not self._arrastando:
+            if max(abs(event.x_root - x_inicio), abs(event.y_root - y_inicio)) < 8:
+                return
+            self._arrastando = True
+            self.canvas.configure(cursor="fleur")
+            self.canvas.itemconfigure(f"{card.tag}&&borda", outline=COLOR_PALETTE['primary'])
+        self.on_update_callback("arrastando_projeto", {
+            "projeto_id": card.projeto.id,
+            "x_root": event.x_root,
+            "y_root": event.y_root
+        })
+    
+    def _on_release(self, event):
+        clique, arrastando = self._clique, self._arrastando
+        self._clique = None
+        self._arrastando = False
+        if clique is None:
+            return
+        card, acao, _, _ = clique
+        if arrastando:
+            self.canvas.configure(cursor="")
+            self._hover_card = None
+            self.canvas.itemconfigure(f"{card.tag}&&borda", outline=self._cor_borda(card))
+            self.on_update_callback("soltar_projeto", {
+                "projeto_id": card.projeto.id,
+                "x_root": event.x_root,
+                "y_root": event.y_root
+            })
+        elif acao is not None and self._item_em(event.x, event.y) == (card, acao):
+            # Como num botão: a ação só dispara se o clique termina sobre ele
+            getattr(card, acao)()
+
+
+class KanbanGUI:
+    """Interface principal do sistema Kanban com design moderno"""
+    
+    def __init__(self, database: Database):
+        self.db = database
+        # O índice de busca observa antes da GUI para já estar atualizado
+        # quando o quadro for redesenhado. No modo "servidor" o índice local
+        # não existe e a busca usa o FULLTEXT do MySQL.
+        self.busca: Optional[BuscaProjetos] = None
+        if AppConfig.SEARCH_MODE == "local":
+            self.busca = BuscaProjetos(database)
+            self.db.add_observer(self.busca)
+        self.analytics = ReceitaAnalytics(database)
+        self.db.add_observer(self.analytics)
+        # Os totais precisam ver cada evento antes de o quadro ser recarregado
+        self.totais = TotaisEtapas(database, on_change=self._atualizar_totais_coluna)
+        self.db.add_observer(self.totais)
+        # Faturamentos dos cartões visíveis, para o histórico abrir da memória
+        self.faturamentos = CacheFaturamentos(database.clonar, AppConfig.FATURAMENTOS_CACHE_SIZE,
+                                              AppConfig.HISTORY_PAGE_SIZE)
+        self.db.add_observer(self.faturamentos)
+        self.db.add_observer(self)
+        self._busca_after_id = None
+        self._resultado_servidor: Optional[set] = None
+        self._ultimo_change_id = 0
+        self._snapshot_sujo = False
+        # Projetos movidos enquanto o snapshot é reconciliado com o banco
+        self._movidos_na_carga: Optional[set] = None
+        # Etapas com renumeração das posições em andamento
+        self._renumerando: set = set()
+        # Sincronização do journal em andamento no writer
+        self._sincronizando_journal = False
+        # IDs dos cartões marcados com Ctrl+clique para mover em lote
+        self._selecionados: set = set()
+        
+        # Configuração da janela principal
+        self.root = ctk.CTk()
+        self.root.title("🔧 Kanban Projects Manager")
+        self.root.geometry("1400x800")
+        self.root.state('zoomed')
+        
+        # Configura a cor de fundo da janela
+        self.root.configure(fg_color=COLOR_PALETTE['bg_primary'])
         
         self.etapas: List[Etapa] = []
         self.colunas: Dict[int, KanbanColumn] = {}
         
+        # Varredura das pastas locais em processos separados; os resumos
+        # chegam aos cartões conforme cada pasta termina
+        self.scanner = ScannerPastas(AppConfig.CACHE_DIR / "pastas.json",
+                                     AppConfig.SCAN_WORKERS, self._aplicar_info_pasta)
+        
+        # Escritas em background (movimentos otimistas e leitura do quadro
+        # na abertura a partir do snapshot)
+        self.writer = BackgroundWriter(self.db.clonar)
+        self.editor = EditorLauncher(AppConfig.EDITOR_COMMAND)
+        self._coluna_destacada: Optional[KanbanColumn] = None
+        
         self._create_widgets()
         self._setup_layout()
         self._load_initial_data()
+        
+        # Sincronização periódica do journal offline
+        self.root.after(AppConfig.JOURNAL_SYNC_INTERVAL, self._sincronizar_journal)
+        # Reconciliação periódica dos totais por etapa
+        self.root.after(AppConfig.TOTAIS_RECONCILE_INTERVAL, self._reconciliar_totais_periodico)
+        
+        # Sondagem do change_log para ver alterações de outros clientes
+        self.root.after(AppConfig.REFRESH_INTERVAL, self._sincronizar_alteracoes)
+        self.root.after(AppConfig.CHANGE_LOG_PRUNE_INTERVAL, self._limpar_change_log_periodico)
+        
+        self.root.after(AppConfig.WRITER_POLL_INTERVAL, self._processar_writer)
+        self.root.after(AppConfig.SCAN_INTERVAL, self._escanear_pastas_periodico)
+        self.root.after(AppConfig.SNAPSHOT_INTERVAL, self._salvar_snapshot_periodico)
+        self.root.after(AppConfig.PREFETCH_INTERVAL, self._prefetch_visiveis)
     
     def _create_widgets(self):
         """Cria os widgets principais com design moderno"""
@@ -954,6 +2158,31 @@ class KanbanGUI:
             text_color=COLOR_PALETTE['text_muted']
         )
         
+        # Campo de busca instantânea
+        self.busca_entry = ctk.CTkEntry(
+            self.header_frame,
+            placeholder_text="🔎 Buscar projetos...",
+            width=320,
+            height=40,
+            font=ctk.CTkFont(size=14),
+            corner_radius=8,
+            border_color=COLOR_PALETTE['card_border']
+        )
+        self.busca_entry.bind("<KeyRelease>", self._on_busca_alterada)
+        
+        # Botão do painel de receitas
+        self.btn_receitas = ctk.CTkButton(
+            self.header_frame,
+            text="📊 Receitas",
+            command=self._abrir_analytics,
+            width=140,
+            height=50,
+            font=ctk.CTkFont(size=13, weight="bold"),
+            fg_color=COLOR_PALETTE['success'],
+            hover_color="#059669",
+            corner_radius=12
+        )
+        
         # Botão novo projeto com design destacado
         self.btn_novo_projeto = ctk.CTkButton(
             self.header_frame,
@@ -967,6 +2196,38 @@ class KanbanGUI:
             corner_radius=12
         )
         
+        # Barra da seleção múltipla, visível enquanto houver cartões marcados
+        self.barra_selecao = ctk.CTkFrame(self.header_frame, fg_color="transparent")
+        self.selecao_label = ctk.CTkLabel(
+            self.barra_selecao,
+            text="",
+            font=ctk.CTkFont(size=13, weight="bold"),
+            text_color=COLOR_PALETTE['text_primary']
+        )
+        self.selecao_destino = ctk.CTkOptionMenu(
+            self.barra_selecao,
+            values=[],
+            command=self._on_destino_selecao,
+            width=200,
+            height=32,
+            font=ctk.CTkFont(size=13),
+            fg_color=COLOR_PALETTE['primary'],
+            button_color=COLOR_PALETTE['primary_dark'],
+            button_hover_color=COLOR_PALETTE['primary_dark']
+        )
+        self.btn_limpar_selecao = ctk.CTkButton(
+            self.barra_selecao,
+            text="✖ Limpar seleção",
+            command=self._limpar_selecao,
+            width=140,
+            height=32,
+            font=ctk.CTkFont(size=12),
+            fg_color="transparent",
+            text_color=COLOR_PALETTE['text_secondary'],
+            hover_color=COLOR_PALETTE['hover_light']
+        )
+        self.root.bind("<Escape>", lambda event: self._limpar_selecao())
+        
         # Frame principal para as colunas
         self.main_frame = ctk.CTkFrame(
             self.root,
@@ -997,7 +2258,16 @@ class KanbanGUI:
         # Layout do header
         self.title.grid(row=0, column=0, sticky="w", padx=30, pady=(20, 5))
         self.subtitle.grid(row=1, column=0, sticky="w", padx=30, pady=(0, 20))
-        self.btn_novo_projeto.grid(row=0, column=2, rowspan=2, padx=30, pady=20)
+        self.busca_entry.grid(row=0, column=1, rowspan=2, sticky="e", padx=(30, 0), pady=20)
+        self.btn_receitas.grid(row=0, column=2, rowspan=2, padx=(30, 0), pady=20)
+        self.btn_novo_projeto.grid(row=0, column=3, rowspan=2, padx=30, pady=20)
+        
+        # Barra de seleção (só aparece com cartões marcados)
+        self.selecao_label.grid(row=0, column=0, padx=(0, 16))
+        self.selecao_destino.grid(row=0, column=1, padx=(0, 8))
+        self.btn_limpar_selecao.grid(row=0, column=2)
+        self.barra_selecao.grid(row=2, column=0, columnspan=4, sticky="w", padx=30, pady=(0, 16))
+        self.barra_selecao.grid_remove()
         
         # Main frame
         self.main_frame.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0, 20))
@@ -1008,25 +2278,35 @@ class KanbanGUI:
         self.kanban_frame.grid(row=0, column=0, sticky="nsew", padx=16, pady=16)
     
     def _load_initial_data(self):
-        """Carrega os dados iniciais do banco"""
+        """Carrega os dados iniciais do snapshot local ou, sem ele, do banco"""
+        quadro = snapshot.carregar(AppConfig.SNAPSHOT_FILE, self._banco_snapshot())
+        if quadro is not None:
+            self._carregar_snapshot(quadro)
+            return
         try:
             print("🚀 Carregando dados iniciais...")
             
             # Carrega as etapas
             self.etapas = self.db.get_etapas()
             print(f"✓ {len(self.etapas)} etapas carregadas")
+            self._criar_colunas()
             
-            # Cria as colunas do Kanban com espaçamento moderno
-            for etapa in self.etapas:
-                coluna = KanbanColumn(
-                    self.kanban_frame, etapa, self.etapas,
-                    self._handle_update_callback, self.db
-                )
-                coluna.grid(row=0, column=etapa.ordem-1, sticky="ns", padx=8, pady=8)
-                self.colunas[etapa.id] = coluna
+            # Posição no change_log antes da carga: o que mudar depois
+            # disso chega pela sondagem incremental
+            self._ultimo_change_id = self.db.get_ultimo_change_id()
+            self.db.prune_changes(AppConfig.CHANGE_LOG_RETENTION_DAYS)
+            
+            # Concluídos antigos saem do quadro antes da carga
+            if AppConfig.ARCHIVE_AFTER_DAYS is not None:
+                arquivados = self.db.arquivar_projetos(AppConfig.ARCHIVE_AFTER_DAYS)
+                if arquivados:
+                    print(f"🗄️ {arquivados} projetos concluídos arquivados")
             
             # Carrega os projetos
             self._load_projetos()
+            self.totais.reconciliar()
+            self._atualizar_arquivados()
+            self._snapshot_sujo = True
             
         except DatabaseError as e:
             print(f"❌ Erro de database: {e}")
@@ -1037,8 +2317,136 @@ class KanbanGUI:
             traceback.print_exc()
             messagebox.showerror("Erro", f"Erro inesperado: {e}")
     
+    def _criar_colunas(self):
+        """Cria uma coluna do Kanban por etapa, descartando as anteriores"""
+        for coluna in self.colunas.values():
+            coluna.destroy()
+        self.colunas = {}
+        classe_coluna = KanbanColumn
+        if UIConfig.BOARD_RENDERER == "canvas":
+            classe_coluna = CanvasKanbanColumn
+        for etapa in self.etapas:
+            coluna = classe_coluna(
+                self.kanban_frame, etapa, self.etapas,
+                self._handle_update_callback, self.db,
+                info_pastas=self.scanner.resultados
+            )
+            coluna.grid(row=0, column=etapa.ordem-1, sticky="ns", padx=8, pady=8)
+            self.colunas[etapa.id] = coluna
+    
+    def _banco_snapshot(self) -> str:
+        """Identifica o banco do snapshot, para não abrir o quadro de outro"""
+        return f"{self.db.config['host']}/{self.db.config['database']}"
+    
+    def _carregar_snapshot(self, quadro: snapshot.SnapshotQuadro):
+        """Desenha o quadro salvo e agenda a leitura do banco em background"""
+        print(f"⚡ Quadro restaurado do snapshot de {quadro.salvo_em:%d/%m/%Y %H:%M} "
+              f"({len(quadro.projetos)} projetos)")
+        self.etapas = quadro.etapas
+        self._criar_colunas()
+        for projeto in quadro.projetos:
+            if projeto.etapa_atual in self.colunas:
+                self.colunas[projeto.etapa_atual].adicionar_projeto(projeto)
+        self.totais.registrar_projetos(quadro.projetos)
+        self.totais.semear(quadro.totais)
+        if self.busca is not None:
+            self.busca.carregar(quadro.projetos)
+        self._aplicar_filtro()
+        self.scanner.escanear(quadro.projetos)
+        # Se o banco não responder, a sondagem continua a partir do snapshot
+        self._ultimo_change_id = quadro.change_id
+        
+        self._movidos_na_carga = set()
+        self.writer.submit(self._ler_quadro, on_success=self._reconciliar_snapshot,
+                           on_error=self._falha_reconciliar_snapshot)
+    
+    @staticmethod
+    def _ler_quadro(db: Database) -> dict:
+        """Lê do banco tudo o que a abertura precisa (roda na thread do writer)"""
+        db.prune_changes(AppConfig.CHANGE_LOG_RETENTION_DAYS)
+        if AppConfig.ARCHIVE_AFTER_DAYS is not None:
+            arquivados = db.arquivar_projetos(AppConfig.ARCHIVE_AFTER_DAYS)
+            if arquivados:
+                print(f"🗄️ {arquivados} projetos concluídos arquivados")
+        # Posição no change_log lida antes dos projetos e da mesma conexão:
+        # o que mudar depois disso chega pela sondagem incremental
+        change_id, projetos = db.get_versao_e_projetos()
+        return {
+            "change_id": change_id,
+            "etapas": db.get_etapas(),
+            "projetos": projetos,
+            "totais": db.get_totais_por_etapa(),
+            "arquivados": db.contar_arquivados_por_etapa()
+        }
+    
+    def _reconciliar_snapshot(self, quadro: dict):
+        """Redesenha só os cartões que diferem do snapshot"""
+        movidos, self._movidos_na_carga = self._movidos_na_carga, None
+        self._ultimo_change_id = quadro["change_id"]
+        
+        if [(e.id, e.nome, e.ordem) for e in quadro["etapas"]] != \
+                [(e.id, e.nome, e.ordem) for e in self.etapas]:
+            print("⚠️ Etapas mudaram desde o snapshot, recriando as colunas")
+            self.etapas = quadro["etapas"]
+            self._criar_colunas()
+        
+        if not self._journal_pendente():
+            # Com journal pendente o quadro mostra o estado otimista até a
+            # sincronização, que recarrega tudo
+            atuais = {card.projeto.id: card.projeto
+                      for coluna in self.colunas.values() for card in coluna.cards}
+            novos = {projeto.id for projeto in quadro["projetos"]}
+            alterados = [projeto for projeto in quadro["projetos"]
+                         if projeto.id not in movidos and (
+                             projeto.id not in atuais
+                             or snapshot.projeto_difere(atuais[projeto.id], projeto))]
+            excluidos = [projeto_id for projeto_id in atuais if projeto_id not in novos]
+            self._aplicar_diferencas(alterados, excluidos)
+            self.totais.registrar_projetos(quadro["projetos"])
+            if self.busca is not None:
+                self.busca.carregar(quadro["projetos"])
+                self._aplicar_filtro()
+            self.scanner.escanear(quadro["projetos"])
+            print(f"✓ Snapshot reconciliado: {len(alterados)} alterados, {len(excluidos)} removidos")
+        
+        self.totais.reconciliar(quadro["totais"])
+        self._atualizar_arquivados(quadro["arquivados"])
+        self._snapshot_sujo = True
+    
+    def _falha_reconciliar_snapshot(self, erro):
+        """Mantém o quadro do snapshot quando o banco não responde"""
+        self._movidos_na_carga = None
+        print(f"⚠️ Não foi possível ler o banco, mostrando o último quadro salvo: {erro}")
+        self._mostrar_toast("Sem conexão com o banco: mostrando o último quadro salvo")
+    
+    def _salvar_snapshot(self):
+        """Grava o quadro atual para a próxima abertura"""
+        if not self.etapas:
+            return
+        projetos = [card.projeto for coluna in self.colunas.values() for card in coluna.cards]
+        quadro = snapshot.SnapshotQuadro(
+            etapas=self.etapas,
+            projetos=[projeto for projeto in projetos if projeto.id is not None and projeto.id > 0],
+            totais={etapa.id: self.totais.get(etapa.id) for etapa in self.etapas},
+            change_id=self._ultimo_change_id
+        )
+        try:
+            snapshot.salvar(AppConfig.SNAPSHOT_FILE, self._banco_snapshot(), quadro)
+            self._snapshot_sujo = False
+        except OSError as e:
+            print(f"⚠️ Não foi possível salvar o snapshot do quadro: {e}")
+    
+    def _salvar_snapshot_periodico(self):
+        """Salva o snapshot quando a interface estiver ociosa, se algo mudou"""
+        if self._snapshot_sujo:
+            self.root.after_idle(self._salvar_snapshot)
+        self.root.after(AppConfig.SNAPSHOT_INTERVAL, self._salvar_snapshot_periodico)
+    
     def _load_projetos(self):
         """Carrega todos os projetos nas colunas apropriadas"""
+        if self._journal_pendente():
+            # O quadro mostra o estado otimista até o journal ser sincronizado
+            return
         try:
             # Limpa as colunas
             for coluna in self.colunas.values():
@@ -1054,6 +2462,18 @@ class KanbanGUI:
                     self.colunas[projeto.etapa_atual].adicionar_projeto(projeto)
                 else:
                     print(f"⚠️ Projeto {projeto.nome} tem etapa inválida: {projeto.etapa_atual}")
+            
+            self.totais.registrar_projetos(projetos)
+            # O índice local da busca acompanha a lista nova (inclusive nas
+            # recargas completas depois de uma lacuna no change_log)
+            if self.busca is not None:
+                self.busca.carregar(projetos)
+            self._aplicar_filtro()
+            self.scanner.escanear(projetos)
+            self._verificar_posicoes()
+            self._atualizar_selecao()
+            self._snapshot_sujo = True
+            return projetos
                     
         except DatabaseError as e:
             messagebox.showerror("Erro", f"Erro ao carregar projetos: {e}")
@@ -1063,6 +2483,41 @@ class KanbanGUI:
             traceback.print_exc()
             messagebox.showerror("Erro", f"Erro inesperado: {e}")
     
+    def _on_busca_alterada(self, event=None):
+        """Filtra na hora (modo local) ou agenda a busca no servidor"""
+        if self.busca is not None:
+            self._aplicar_filtro()
+            return
+        
+        # Debounce: só consulta o MySQL após uma pausa na digitação
+        if self._busca_after_id is not None:
+            self.root.after_cancel(self._busca_after_id)
+        self._busca_after_id = self.root.after(AppConfig.SEARCH_DEBOUNCE_MS, self._buscar_no_servidor)
+    
+    def _buscar_no_servidor(self):
+        """Executa a busca FULLTEXT com o texto atual do campo"""
+        self._busca_after_id = None
+        texto = self.busca_entry.get().strip()
+        if not texto:
+            self._resultado_servidor = None
+        else:
+            try:
+                projetos = self.db.buscar_projetos(texto, limit=AppConfig.SEARCH_LIMIT)
+                self._resultado_servidor = {p.id for p in projetos}
+            except DatabaseError as e:
+                print(f"❌ Erro na busca: {e}")
+                return
+        self._aplicar_filtro()
+    
+    def _aplicar_filtro(self):
+        """Mostra apenas os cartões que casam com o texto de busca"""
+        if self.busca is not None:
+            visiveis = self.busca.buscar(self.busca_entry.get())
+        else:
+            visiveis = self._resultado_servidor
+        for coluna in self.colunas.values():
+            coluna.filtrar(visiveis)
+    
     def _novo_projeto(self):
         """Abre dialog para criar novo projeto"""
         try:
@@ -1077,28 +2532,545 @@ class KanbanGUI:
             traceback.print_exc()
             messagebox.showerror("Erro", f"Erro ao criar projeto: {e}")
     
+    def _atualizar_totais_coluna(self, etapa_id: int):
+        """Atualiza o cabeçalho de uma coluna com os totais da etapa"""
+        coluna = self.colunas.get(etapa_id)
+        if coluna is not None:
+            coluna.atualizar_totais(*self.totais.get(etapa_id))
+    
+    def _reconciliar_totais(self):
+        """Relê os totais por etapa do banco"""
+        try:
+            self.totais.reconciliar()
+        except DatabaseError as e:
+            print(f"⚠️ Não foi possível reconciliar os totais: {e}")
+    
+    def _reconciliar_totais_periodico(self):
+        """Reconcilia os totais e agenda a próxima rodada"""
+        if not self._journal_pendente():
+            self._reconciliar_totais()
+        self.root.after(AppConfig.TOTAIS_RECONCILE_INTERVAL, self._reconciliar_totais_periodico)
+    
+    def _abrir_analytics(self):
+        """Abre o painel de receitas"""
+        AnalyticsDialog(self.root, self.analytics)
+    
     def _handle_update_callback(self, action=None, data=None):
         """Manipula callbacks de atualização dos cartões"""
         if action == "mover_projeto":
-            try:
-                self.db.mover_projeto_etapa(data["projeto_id"], data["nova_etapa"])
-                self._load_projetos()
-            except DatabaseError as e:
-                print(f"❌ Erro ao mover projeto: {e}")
-                messagebox.showerror("Erro", f"Erro ao mover projeto: {e}")
+            self._mover_otimista(data["projeto_id"], data["nova_etapa"])
+        elif action == "arrastando_projeto":
+            self._destacar_coluna(self._coluna_em(data["x_root"], data["y_root"]))
+        elif action == "soltar_projeto":
+            self._destacar_coluna(None)
+            coluna = self._coluna_em(data["x_root"], data["y_root"])
+            if coluna is not None and data["projeto_id"] in self._selecionados \
+                    and len(self._selecionados) > 1:
+                # Arrastar um cartão da seleção leva a seleção inteira
+                self._mover_lote(coluna.etapa.id, coluna.indice_em(data["y_root"],
+                                                                   ignorar=data["projeto_id"]))
+            elif coluna is not None:
+                indice = coluna.indice_em(data["y_root"], ignorar=data["projeto_id"])
+                self._mover_otimista(data["projeto_id"], coluna.etapa.id, indice)
+        elif action == "alternar_selecao":
+            self._alternar_selecao(data["projeto_id"])
+        elif action == "abrir_historico":
+            HistoricoReceitaDialog(self.root, self.db, data["projeto"], self.writer,
+                                   cache=self.faturamentos)
+        elif action == "abrir_arquivados":
+            ArquivadosDialog(self.root, self.db, data["etapa"])
+        elif action == "abrir_editor":
+            self.editor.abrir(data["pasta"], data["arquivo"], on_error=self._mostrar_toast)
         else:
             self._load_projetos()
     
+    def _journal_pendente(self) -> bool:
+        """Indica se há mutações aguardando sincronização"""
+        return self.db.journal is not None and len(self.db.journal) > 0
+    
+    def _sincronizar_journal(self):
+        """Agenda a reaplicação do journal no writer e a próxima tentativa
+        
+        Com o servidor inacessível cada tentativa espera o timeout de
+        conexão, então ela não roda na thread do Tk.
+        """
+        if self._journal_pendente() and not self._sincronizando_journal:
+            self._sincronizando_journal = True
+            self.writer.submit(
+                lambda db: db.sincronizar_journal(AppConfig.JOURNAL_BATCH_SIZE),
+                on_success=self._journal_sincronizado,
+                on_error=self._falha_sincronizar_journal
+            )
+        self.root.after(AppConfig.JOURNAL_SYNC_INTERVAL, self._sincronizar_journal)
+    
+    def _journal_sincronizado(self, resumo: dict):
+        self._sincronizando_journal = False
+        if resumo["aplicadas"] or resumo["duplicadas"] or resumo["conflitos"]:
+            # O clone do writer não tem observers: o aviso sai pelo Database da GUI
+            self.db.notify("journal_sincronizado", resumo)
+    
+    def _falha_sincronizar_journal(self, erro: Exception):
+        self._sincronizando_journal = False
+        print(f"⚠️ Banco ainda indisponível, journal mantido: {erro}")
+    
+    def _sincronizar_alteracoes(self):
+        """Aplica as alterações do change_log e agenda a próxima sondagem"""
+        try:
+            if not self._journal_pendente():
+                alteracoes, lacuna = self.db.get_changes(self._ultimo_change_id,
+                                                         AppConfig.CHANGE_LOG_BATCH)
+                if lacuna:
+                    print("⚠️ change_log foi limpo desde a última sondagem, recarregando o quadro")
+                    self._ultimo_change_id = self.db.get_ultimo_change_id()
+                    self._load_projetos()
+                    self._reconciliar_totais()
+                elif alteracoes:
+                    self.db.aplicar_changes(alteracoes)
+                    self._ultimo_change_id = alteracoes[-1].id
+        except DatabaseError as e:
+            print(f"⚠️ Não foi possível sondar alterações: {e}")
+        finally:
+            self.root.after(AppConfig.REFRESH_INTERVAL, self._sincronizar_alteracoes)
+    
+    def _limpar_change_log_periodico(self):
+        """Remove do change_log o que passou da retenção (na thread do writer)
+        
+        Sem isso a tabela só seria limpa ao abrir o quadro, e um cliente
+        aberto por dias a deixaria crescer sem limite.
+        """
+        self.writer.submit(
+            lambda db: db.prune_changes(AppConfig.CHANGE_LOG_RETENTION_DAYS),
+            on_error=lambda erro: print(f"⚠️ Não foi possível limpar o change_log: {erro}")
+        )
+        self.root.after(AppConfig.CHANGE_LOG_PRUNE_INTERVAL, self._limpar_change_log_periodico)
+    
+    def _aplicar_alteracoes_remotas(self, data: dict):
+        """Atualiza apenas os cartões dos projetos alterados"""
+        self._aplicar_diferencas(data["projetos"], data["excluidos"])
+        if data["excluidos"]:
+            # Exclusões remotas podem ser arquivamentos feitos por outro cliente
+            self._atualizar_arquivados()
+    
+    def _aplicar_diferencas(self, projetos: List[Projeto], excluidos: List[int]):
+        """Redesenha os cartões dos projetos alterados e remove os excluídos"""
+        for projeto_id in excluidos:
+            card = self._encontrar_card(projeto_id)
+            if card is not None:
+                self.colunas[card.projeto.etapa_atual].remover_projeto(projeto_id)
+        
+        for projeto in projetos:
+            coluna = self.colunas.get(projeto.etapa_atual)
+            if coluna is None:
+                continue
+            card = self._encontrar_card(projeto.id)
+            if card is None:
+                coluna.adicionar_projeto(projeto, coluna.indice_para_posicao(projeto.posicao))
+            elif card.projeto.etapa_atual != projeto.etapa_atual:
+                self.colunas[card.projeto.etapa_atual].remover_projeto(projeto.id)
+                coluna.adicionar_projeto(projeto, coluna.indice_para_posicao(projeto.posicao))
+            else:
+                reordenado = card.projeto.posicao != projeto.posicao
+                card.atualizar_dados(projeto)
+                if reordenado:
+                    coluna.reposicionar_projeto(
+                        projeto.id, coluna.indice_para_posicao(projeto.posicao, ignorar=projeto.id))
+        
+        self._aplicar_filtro()
+        self.scanner.escanear(projetos)
+        self._verificar_posicoes()
+        self._atualizar_selecao()
+        self._snapshot_sujo = True
+    
+    def _encontrar_card(self, projeto_id: int) -> Optional[ProjetoCard]:
+        """Localiza o cartão de um projeto em qualquer coluna"""
+        for coluna in self.colunas.values():
+            for card in coluna.cards:
+                if card.projeto.id == projeto_id:
+                    return card
+        return None
+    
+    def _coluna_em(self, x_root: int, y_root: int) -> Optional[KanbanColumn]:
+        """Retorna a coluna sob um ponto da tela"""
+        widget = self.root.winfo_containing(x_root, y_root)
+        while widget is not None and not isinstance(widget, KanbanColumn):
+            widget = widget.master
+        return widget
+    
+    def _destacar_coluna(self, coluna: Optional[KanbanColumn]):
+        """Destaca a coluna alvo de um arraste"""
+        if coluna is self._coluna_destacada:
+            return
+        if self._coluna_destacada is not None:
+            self._coluna_destacada.configure(border_color=COLOR_PALETTE['card_border'])
+        if coluna is not None:
+            coluna.configure(border_color=COLOR_PALETTE['primary_light'])
+        self._coluna_destacada = coluna
+    
+    def _mover_card(self, projeto: Projeto, destino: int, indice: int = 0):
+        """Move apenas o cartão do projeto para a posição indice da coluna de destino"""
+        if projeto.etapa_atual == destino:
+            self.colunas[destino].reposicionar_projeto(projeto.id, indice)
+        else:
+            self.colunas[projeto.etapa_atual].remover_projeto(projeto.id)
+            projeto.etapa_atual = destino
+            self.colunas[destino].adicionar_projeto(projeto, indice)
+        self._aplicar_filtro()
+        self._snapshot_sujo = True
+    
+    def _mover_otimista(self, projeto_id: int, nova_etapa: int, indice: int = 0):
+        """Move o cartão imediatamente e confirma o UPDATE em background
+        
+        indice é a posição na coluna de destino (o topo, pelos botões de
+        etapa). A nova posição de ordenação fica entre as dos vizinhos, então
+        só a linha do projeto é gravada; se os vizinhos não permitirem, ou a
+        posição ficar longa demais, a coluna é renumerada logo em seguida.
+        """
+        card = self._encontrar_card(projeto_id)
+        if card is None or nova_etapa not in self.colunas:
+            return
+        projeto = card.projeto
+        origem = projeto.etapa_atual
+        indice_origem = self.colunas[origem].indice_projeto(projeto_id)
+        if origem == nova_etapa and indice == indice_origem:
+            return
+        posicao_origem = projeto.posicao
+        posicao = self.colunas[nova_etapa].posicao_para(indice, ignorar=projeto_id)
+        
+        self._mover_card(projeto, nova_etapa, indice)
+        projeto.posicao = posicao or ""
+        if self._movidos_na_carga is not None:
+            # A leitura do banco em andamento ainda vê a etapa antiga
+            self._movidos_na_carga.add(projeto_id)
+        
+        def confirmar(_):
+            # Avisa os demais observers; a GUI já está no estado final
+            self.db.notify("projeto_movido", {
+                "projeto_id": projeto_id,
+                "nova_etapa": nova_etapa,
+                "etapa_origem": origem,
+                "posicao": posicao,
+                "local": True
+            })
+        
+        def reverter(erro):
+            print(f"❌ Erro ao mover projeto: {erro}")
+            if projeto.etapa_atual == nova_etapa:
+                self._mover_card(projeto, origem, indice_origem)
+                projeto.posicao = posicao_origem
+            self._mostrar_toast(f"Não foi possível mover '{projeto.nome}': {erro}")
+        
+        # Sem posição o banco põe o projeto no topo, e a renumeração que
+        # vem logo atrás na mesma fila grava a ordem da tela
+        self.writer.submit(
+            lambda db: db.mover_projeto_etapa(projeto_id, nova_etapa, origem, posicao),
+            on_success=confirmar,
+            on_error=reverter
+        )
+        if self.colunas[nova_etapa].precisa_renumerar():
+            self._renumerar_coluna(nova_etapa)
+    
+    def _alternar_selecao(self, projeto_id: int):
+        """Inclui ou retira um cartão da seleção múltipla"""
+        card = self._encontrar_card(projeto_id)
+        if card is None or projeto_id is None or projeto_id <= 0:
+            # Projetos ainda no journal ficam fora do lote
+            return
+        if projeto_id in self._selecionados:
+            self._selecionados.discard(projeto_id)
+            card.marcar_selecao(False)
+        else:
+            self._selecionados.add(projeto_id)
+            card.marcar_selecao(True)
+        self._atualizar_barra_selecao()
+    
+    def _atualizar_selecao(self):
+        """Remarca os cartões selecionados depois de o quadro ser redesenhado"""
+        no_quadro = set()
+        for coluna in self.colunas.values():
+            for card in coluna.cards:
+                if card.projeto.id in self._selecionados:
+                    no_quadro.add(card.projeto.id)
+                    if not card.selecionado:
+                        card.marcar_selecao(True)
+        self._selecionados = no_quadro
+        self._atualizar_barra_selecao()
+    
+    def _limpar_selecao(self):
+        """Desmarca todos os cartões"""
+        for coluna in self.colunas.values():
+            for card in coluna.cards:
+                if card.selecionado:
+                    card.marcar_selecao(False)
+        self._selecionados = set()
+        self._atualizar_barra_selecao()
+    
+    def _atualizar_barra_selecao(self):
+        """Mostra a barra com a quantidade selecionada, ou a esconde"""
+        if not self._selecionados:
+            self.barra_selecao.grid_remove()
+            return
+        quantidade = len(self._selecionados)
+        rotulo = "projeto selecionado" if quantidade == 1 else "projetos selecionados"
+        self.selecao_label.configure(text=f"☑️ {quantidade} {rotulo}")
+        self.selecao_destino.configure(values=[etapa.nome for etapa in self.etapas])
+        self.selecao_destino.set("Mover para...")
+        self.barra_selecao.grid()
+    
+    def _on_destino_selecao(self, nome: str):
+        """Move a seleção para a etapa escolhida no menu da barra"""
+        self.selecao_destino.set("Mover para...")
+        etapa = next((e for e in self.etapas if e.nome == nome), None)
+        if etapa is not None:
+            self._mover_lote(etapa.id)
+    
+    def _mover_lote(self, nova_etapa: int, indice: int = 0):
+        """Move todos os cartões selecionados para uma etapa de uma vez
+        
+        Os cartões saem das colunas de origem e entram juntos na posição
+        indice do destino, na ordem em que estavam no quadro, com um único
+        relayout por coluna. O banco recebe um único UPDATE em background e
+        os observers um único evento "projetos_movidos".
+        """
+        destino = self.colunas.get(nova_etapa)
+        if destino is None:
+            return
+        # Ordem do quadro: etapas da esquerda para a direita, cartões de cima para baixo
+        cards = [card for etapa in self.etapas if etapa.id in self.colunas
+                 for card in self.colunas[etapa.id].cards if card.projeto.id in self._selecionados]
+        if not cards:
+            return
+        projetos = [card.projeto for card in cards]
+        projeto_ids = [projeto.id for projeto in projetos]
+        origens = {projeto.id: projeto.etapa_atual for projeto in projetos}
+        
+        # Posições entre os vizinhos do destino, sem os cartões que saem dele
+        restantes = [card for card in destino.cards if card.projeto.id not in origens]
+        indice = min(indice, len(restantes))
+        antes = restantes[indice - 1].projeto.posicao if indice > 0 else None
+        depois = restantes[indice].projeto.posicao if indice < len(restantes) else None
+        try:
+            posicoes = ordem.distribuir(len(projetos), antes, depois)
+        except ValueError:
+            # Vizinhos sem numeração: a renumeração logo abaixo acerta a ordem
+            posicoes = None
+        
+        self._limpar_selecao()
+        for etapa_id in set(origens.values()):
+            self.colunas[etapa_id].remover_projetos(set(origens))
+        for projeto, posicao in zip(projetos, posicoes or [""] * len(projetos)):
+            projeto.etapa_atual = nova_etapa
+            projeto.posicao = posicao
+        destino.adicionar_projetos(projetos, indice)
+        self._aplicar_filtro()
+        self._snapshot_sujo = True
+        if self._movidos_na_carga is not None:
+            self._movidos_na_carga.update(projeto_ids)
+        
+        def confirmar(_):
+            # Um único aviso aos demais observers; a GUI já está no estado final
+            self.db.notify("projetos_movidos", {
+                "projeto_ids": projeto_ids,
+                "nova_etapa": nova_etapa,
+                "etapas_origem": origens,
+                "posicoes": dict(zip(projeto_ids, posicoes or [])),
+                "quantidade": len(projeto_ids),
+                "local": True
+            })
+        
+        def reverter(erro):
+            print(f"❌ Erro ao mover projetos: {erro}")
+            self._mostrar_toast(f"Não foi possível mover {len(projeto_ids)} projetos: {erro}")
+            self._load_projetos()
+        
+        self.writer.submit(
+            lambda db: db.mover_projetos_etapa(projeto_ids, nova_etapa, posicoes, origens),
+            on_success=confirmar,
+            on_error=reverter
+        )
+        if destino.precisa_renumerar():
+            self._renumerar_coluna(nova_etapa)
+    
+    def _aplicar_movidos(self, data: dict):
+        """Leva para o destino só os cartões de um movimento em lote"""
+        destino = self.colunas.get(data["nova_etapa"])
+        movidos = set(data["projeto_ids"])
+        projetos = [card.projeto for coluna in self.colunas.values()
+                    for card in coluna.cards if card.projeto.id in movidos]
+        if destino is None or not projetos:
+            return
+        for etapa_id in {projeto.etapa_atual for projeto in projetos}:
+            self.colunas[etapa_id].remover_projetos(movidos)
+        posicoes = data.get("posicoes") or {}
+        for projeto in projetos:
+            projeto.etapa_atual = data["nova_etapa"]
+            projeto.posicao = posicoes.get(projeto.id) or ""
+        projetos.sort(key=lambda projeto: projeto.posicao)
+        destino.adicionar_projetos(projetos, destino.indice_para_posicao(projetos[0].posicao))
+        self._aplicar_filtro()
+        self._atualizar_selecao()
+    
+    def _verificar_posicoes(self):
+        """Agenda a renumeração das colunas com posições vazias, repetidas ou longas"""
+        if self._journal_pendente():
+            return
+        for etapa_id, coluna in self.colunas.items():
+            if coluna.precisa_renumerar():
+                self._renumerar_coluna(etapa_id)
+    
+    def _renumerar_coluna(self, etapa_id: int):
+        """Regrava em background as posições da coluna, na ordem da tela"""
+        if etapa_id in self._renumerando:
+            return
+        projeto_ids = [card.projeto.id for card in self.colunas[etapa_id].cards
+                       if card.projeto.id is not None and card.projeto.id > 0]
+        self._renumerando.add(etapa_id)
+        
+        def aplicar(posicoes):
+            self._renumerando.discard(etapa_id)
+            coluna = self.colunas.get(etapa_id)
+            if coluna is not None:
+                coluna.aplicar_posicoes(posicoes)
+                self._snapshot_sujo = True
+            print(f"↕️ {len(posicoes)} posições renumeradas na etapa {etapa_id}")
+        
+        def falhou(erro):
+            self._renumerando.discard(etapa_id)
+            print(f"⚠️ Não foi possível renumerar as posições da etapa {etapa_id}: {erro}")
+        
+        self.writer.submit(lambda db: db.renumerar_posicoes(etapa_id, projeto_ids),
+                           on_success=aplicar, on_error=falhou)
+    
+    def _atualizar_arquivados(self, contagem: Optional[Dict[int, int]] = None):
+        """Atualiza o atalho de arquivados de cada coluna (uma consulta GROUP BY)"""
+        if contagem is None:
+            try:
+                contagem = self.db.contar_arquivados_por_etapa()
+            except DatabaseError as e:
+                print(f"⚠️ Não foi possível contar os arquivados: {e}")
+                return
+        for etapa_id, coluna in self.colunas.items():
+            coluna.atualizar_arquivados(contagem.get(etapa_id, 0))
+    
+    def _aplicar_info_pasta(self, projeto_id: int, info: InfoPasta):
+        """Mostra no cartão o resultado de uma varredura assim que ele chega"""
+        card = self._encontrar_card(projeto_id)
+        if card is not None:
+            card.atualizar_pasta(info)
+    
+    def _escanear_pastas_periodico(self):
+        """Revarre todas as pastas; o cache por mtime pula as árvores inalteradas"""
+        try:
+            self.scanner.escanear([card.projeto for coluna in self.colunas.values()
+                                   for card in coluna.cards], forcar=True)
+        finally:
+            self.root.after(AppConfig.SCAN_INTERVAL, self._escanear_pastas_periodico)
+    
+    def _prefetch_visiveis(self):
+        """Busca em lote os faturamentos dos cartões na tela que não estão no cache"""
+        try:
+            if not self._journal_pendente():
+                self.faturamentos.prefetch([projeto_id for coluna in self.colunas.values()
+                                            for projeto_id in coluna.projetos_visiveis()])
+        finally:
+            self.root.after(AppConfig.PREFETCH_INTERVAL, self._prefetch_visiveis)
+    
+    def _processar_writer(self):
+        """Entrega os resultados das tarefas em background (escritas, editor, pastas)"""
+        self.writer.processar_resultados()
+        self.faturamentos.processar_resultados()
+        self.editor.processar_falhas()
+        self.scanner.processar_resultados()
+        self.root.after(AppConfig.WRITER_POLL_INTERVAL, self._processar_writer)
+    
+    def _mostrar_toast(self, texto: str, duracao: int = 4000):
+        """Mostra uma mensagem de erro temporária no rodapé da janela"""
+        toast = ctk.CTkLabel(
+            self.root,
+            text=f"⚠️ {texto}",
+            font=ctk.CTkFont(size=13, weight="bold"),
+            text_color="#FFFFFF",
+            fg_color=COLOR_PALETTE['danger'],
+            corner_radius=8,
+            padx=16,
+            pady=8
+        )
+        toast.place(relx=0.5, rely=0.97, anchor="s")
+        self.root.after(duracao, toast.destroy)
+    
+    def _aplicar_otimista(self, event: str, data: dict):
+        """Aplica localmente uma mutação que ficou no journal"""
+        if event == "projeto_criado":
+            projeto = data["projeto"]
+            if projeto.etapa_atual in self.colunas:
+                # Projetos novos entram no topo da etapa
+                self.colunas[projeto.etapa_atual].adicionar_projeto(projeto, 0)
+        elif event == "projeto_movido":
+            card = self._encontrar_card(data["projeto_id"])
+            if card and data["nova_etapa"] in self.colunas:
+                coluna = self.colunas[data["nova_etapa"]]
+                indice = 0
+                if data.get("posicao"):
+                    indice = coluna.indice_para_posicao(data["posicao"], ignorar=card.projeto.id)
+                self._mover_card(card.projeto, data["nova_etapa"], indice)
+                card.projeto.posicao = data.get("posicao") or ""
+        elif event == "projetos_movidos":
+            self._aplicar_movidos(data)
+        elif event == "faturamento_adicionado":
+            card = self._encontrar_card(data["projeto_id"])
+            if card:
+                card.projeto.receita_total += data["valor"]
+                card.atualizar_dados(card.projeto)
+        print(f"💾 {event} registrado no journal (offline)")
+    
     def update(self, event: str, data: dict = None):
         """Implementação do Observer - reage a mudanças no banco"""
+        self._snapshot_sujo = True
+        if data and data.get("pendente"):
+            self._aplicar_otimista(event, data)
+            return
+        
+        if data and data.get("local"):
+            # Mudança já refletida no quadro pela própria GUI
+            return
+        
+        if event == "alteracoes_remotas":
+            self._aplicar_alteracoes_remotas(data)
+            return
+        
+        if event == "projetos_arquivados":
+            for projeto_id in data["projeto_ids"]:
+                card = self._encontrar_card(projeto_id)
+                if card is not None:
+                    self.colunas[card.projeto.etapa_atual].remover_projeto(projeto_id)
+            self._atualizar_arquivados()
+            return
+        
+        if event == "projetos_movidos":
+            self._aplicar_movidos(data)
+            return
+        
+        if self.totais.sujo:
+            self._reconciliar_totais()
+        
+        if event == "journal_sincronizado":
+            self._load_projetos()
+            return
+        
         # Recarrega os projetos quando houver mudanças
         if event in ["projeto_criado", "projeto_atualizado", "projeto_movido", 
-                     "projeto_excluido", "faturamento_adicionado", "faturamento_excluido"]:
+                     "projeto_excluido", "faturamento_adicionado", "faturamento_excluido",
+                     "projetos_importados", "projeto_desarquivado"]:
             self._load_projetos()
+            if event == "projeto_desarquivado":
+                self._atualizar_arquivados()
     
     def run(self):
         """Inicia a aplicação"""
         try:
             self.root.mainloop()
         finally:
+            self._salvar_snapshot()
+            self.scanner.close()
+            self.faturamentos.close()
+            self.writer.close()
             self.db.close()
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Journal - Registro local de mutações pendentes (write-behind)
+
+Enquanto o MySQL está inacessível, as mutações são anexadas a um arquivo
+JSON Lines. Cada entrada carrega um op_id gerado no cliente, o que torna o
+replay idempotente mesmo se a aplicação cair no meio da sincronização.
+"""
+import json
+import os
+import threading
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def _json_default(value):
+    """Serializa tipos que o json não conhece"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+class MutationJournal:
+    """Arquivo append-only com as mutações feitas sem conexão"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entradas: List[dict] = self._carregar()
+        # Erro de conexão que mandou a última mutação para cá; enquanto não
+        # houver uma sincronização bem-sucedida, as próximas vêm direto, sem
+        # esperar de novo o timeout de conexão
+        self.falha_conexao: Optional[Exception] = None
+
+    def _carregar(self) -> List[dict]:
+        """Lê as entradas existentes, ignorando uma última linha truncada"""
+        if not self.path.exists():
+            return []
+        entradas = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for linha in f:
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    entradas.append(json.loads(linha))
+                except json.JSONDecodeError:
+                    print(f"⚠️ Entrada inválida ignorada no journal: {linha[:80]}")
+        return entradas
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def proximo_id_temporario(self) -> int:
+        """Gera um ID negativo para projetos criados offline"""
+        with self._lock:
+            ids = [e['args'].get('projeto_id', 0) for e in self._entradas
+                   if e['op'] == 'criar_projeto']
+            return min([0] + ids) - 1
+
+    def registrar(self, op: str, args: dict) -> str:
+        """Anexa uma mutação ao journal e retorna seu op_id"""
+        entrada = {
+            'op_id': str(uuid.uuid4()),
+            'op': op,
+            'args': args,
+            'registrado_em': datetime.now().isoformat()
+        }
+        linha = json.dumps(entrada, default=_json_default, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(linha + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._entradas.append(json.loads(linha))
+        return entrada['op_id']
+
+    def pendentes(self) -> List[dict]:
+        """Retorna uma cópia das entradas ainda não aplicadas"""
+        with self._lock:
+            return list(self._entradas)
+
+    def remover(self, op_ids):
+        """Remove entradas já aplicadas reescrevendo o arquivo atomicamente"""
+        op_ids = set(op_ids)
+        with self._lock:
+            self._entradas = [e for e in self._entradas if e['op_id'] not in op_ids]
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entrada in self._entradas:
+                    f.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def mapear_ids(self, id_map: Dict[int, int]):
+        """Substitui IDs temporários já resolvidos nas entradas restantes"""
+        if not id_map:
+            return
+        with self._lock:
+            for entrada in self._entradas:
+                projeto_id = entrada['args'].get('projeto_id')
+                if projeto_id in id_map and entrada['op'] != 'criar_projeto':
+                    entrada['args']['projeto_id'] = id_map[projeto_id]
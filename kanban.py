@@ -0,0 +1,303 @@
+"""
+Kanban CLI - Operações em lote sem abrir a interface gráfica
+
+Uso:
+    python -m kanban list [--etapa ETAPA] [--json]
+    python -m kanban move PROJETO_ID ETAPA
+    python -m kanban report [--meses N] [--top N] [--colunar] [--arquivados]
+    python -m kanban import ARQUIVO.csv [--etapa ETAPA]
+    python -m kanban archive [--dias N] [--listar]
+    python -m kanban backup [--incremental]
+    python -m kanban restore BACKUP [--cadeia]
+    python -m kanban renumerar [--etapa ETAPA]
+    python -m kanban migrar [--verificar]
+
+ETAPA pode ser o id ou o nome da etapa. Este módulo nunca importa o
+customtkinter: só config, db e models.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+from datetime import date
+from pathlib import Path
+
+import dinheiro
+import migracoes
+from config import AppConfig, get_database_config, get_replicas_config
+from db import Database, DatabaseError
+from models import Projeto
+
+
+def _resolver_etapa(db: Database, valor: str) -> int:
+    """Aceita o id ou o nome (sem diferenciar maiúsculas) da etapa"""
+    etapas = db.get_etapas()
+    for etapa in etapas:
+        if str(etapa.id) == valor or etapa.nome.lower() == valor.lower():
+            return etapa.id
+    nomes = ", ".join(f"{e.id}={e.nome}" for e in etapas)
+    raise SystemExit(f"Etapa desconhecida: {valor} (disponíveis: {nomes})")
+
+
+def cmd_list(db: Database, args):
+    """Lista projetos em TSV (ou JSON Lines) sem carregar tudo na memória"""
+    etapa = _resolver_etapa(db, args.etapa) if args.etapa else None
+    out = sys.stdout
+    if not args.json:
+        out.write("id\tetapa\treceita\tnome\tpasta_local\n")
+    for projeto in db.iter_projetos(etapa):
+        if args.json:
+            out.write(json.dumps({
+                "id": projeto.id,
+                "nome": projeto.nome,
+                "etapa": projeto.etapa_atual,
+                "receita": dinheiro.texto(projeto.receita_total),
+                "pasta_local": projeto.pasta_local
+            }, ensure_ascii=False) + "\n")
+        else:
+            out.write(f"{projeto.id}\t{projeto.etapa_atual}\t{dinheiro.texto(projeto.receita_total)}\t"
+                      f"{projeto.nome}\t{projeto.pasta_local or ''}\n")
+
+
+def cmd_move(db: Database, args):
+    """Move um ou mais projetos para outra etapa (vários num único UPDATE)"""
+    projetos = []
+    for projeto_id in args.projeto_ids:
+        projeto = db.get_projeto_by_id(projeto_id)
+        if projeto is None:
+            raise SystemExit(f"Projeto {projeto_id} não encontrado")
+        projetos.append(projeto)
+    etapa = _resolver_etapa(db, args.etapa)
+    if len(projetos) == 1:
+        db.mover_projeto_etapa(projetos[0].id, etapa, projetos[0].etapa_atual)
+        print(f"✓ '{projetos[0].nome}' movido para a etapa {etapa}", file=sys.stderr)
+        return
+    movidos = db.mover_projetos_etapa([p.id for p in projetos], etapa,
+                                      etapas_origem={p.id: p.etapa_atual for p in projetos})
+    print(f"✓ {movidos} projeto(s) movido(s) para a etapa {etapa}", file=sys.stderr)
+
+
+def cmd_report(db: Database, args):
+    """Relatório de receitas: mensal, por etapa e top projetos"""
+    hoje = date.today()
+    total_meses = hoje.year * 12 + hoje.month - 1 - (args.meses - 1)
+    desde = date(total_meses // 12, total_meses % 12 + 1, 1)
+
+    print("# Receita mensal")
+    for mes, valor in db.get_receita_mensal(desde, args.arquivados):
+        print(f"{mes}\t{dinheiro.texto(valor)}")
+
+    print("\n# Receita por etapa")
+    for etapa, quantidade, receita in db.get_receita_por_etapa():
+        print(f"{etapa.nome}\t{quantidade}\t{dinheiro.texto(receita)}")
+
+    print("\n# Top projetos")
+    for projeto_id, nome, receita in db.get_top_projetos_receita(args.top, args.arquivados):
+        print(f"{projeto_id}\t{dinheiro.texto(receita)}\t{nome}")
+
+    if args.colunar:
+        import colunar
+        if not colunar.disponivel():
+            raise SystemExit("--colunar requer numpy: pip install numpy")
+        motor = colunar.FaturamentosColunares(db, AppConfig.CACHE_DIR / "faturamentos")
+        motor.atualizar()
+        print("\n# Receita móvel 12 meses")
+        for mes, centavos in motor.receita_movel_12m()[-args.meses:]:
+            print(f"{mes}\t{dinheiro.texto(centavos)}")
+        print("\n# Previsão")
+        for mes, centavos in motor.previsao():
+            print(f"{mes}\t{dinheiro.texto(centavos)}")
+
+
+def cmd_import(db: Database, args):
+    """Importa projetos de um CSV com cabeçalho nome,descricao,pasta_local,arquivo_principal[,etapa]"""
+    etapa_padrao = _resolver_etapa(db, args.etapa) if args.etapa else 1
+    cache_etapas = {}
+    lote = []
+    total = 0
+    with open(args.arquivo, newline="", encoding="utf-8") as f:
+        for numero, linha in enumerate(csv.DictReader(f), start=2):
+            nome = (linha.get("nome") or "").strip()
+            if not nome:
+                print(f"⚠️ Linha {numero} ignorada: nome vazio", file=sys.stderr)
+                continue
+            etapa = etapa_padrao
+            if linha.get("etapa"):
+                valor = linha["etapa"].strip()
+                if valor not in cache_etapas:
+                    cache_etapas[valor] = _resolver_etapa(db, valor)
+                etapa = cache_etapas[valor]
+            lote.append(Projeto(
+                id=None, nome=nome,
+                descricao=(linha.get("descricao") or "").strip() or None,
+                pasta_local=(linha.get("pasta_local") or "").strip() or None,
+                arquivo_principal=(linha.get("arquivo_principal") or "").strip() or None,
+                etapa_atual=etapa
+            ))
+            if len(lote) >= args.lote:
+                total += db.importar_projetos(lote)
+                lote = []
+    total += db.importar_projetos(lote)
+    print(f"✓ {total} projetos importados", file=sys.stderr)
+
+
+def cmd_archive(db: Database, args):
+    """Arquiva os concluídos antigos ou lista os projetos arquivados"""
+    if args.listar:
+        offset = 0
+        while True:
+            projetos = db.get_projetos_arquivados(busca=args.busca, limit=500, offset=offset)
+            for projeto in projetos:
+                print(f"{projeto.id}\t{projeto.etapa_atual}\t{dinheiro.texto(projeto.receita_total)}\t"
+                      f"{projeto.nome}")
+            if len(projetos) < 500:
+                break
+            offset += len(projetos)
+        return
+    quantidade = db.arquivar_projetos(args.dias)
+    print(f"✓ {quantidade} projetos arquivados", file=sys.stderr)
+
+
+def cmd_backup(db: Database, args):
+    """Grava um backup comprimido em AppConfig.BACKUP_DIR"""
+    import backup
+    pasta, medidor = backup.criar_backup(db, AppConfig.BACKUP_DIR, args.incremental,
+                                         linhas_por_arquivo=args.linhas_por_arquivo)
+    print(f"✓ Backup gravado em {pasta}", file=sys.stderr)
+    print(f"  {medidor.resumo()}", file=sys.stderr)
+
+
+def cmd_restore(db: Database, args):
+    """Restaura um backup (pasta ou nome dentro de AppConfig.BACKUP_DIR)"""
+    import backup
+    pasta = Path(args.backup)
+    if not pasta.exists():
+        pasta = AppConfig.BACKUP_DIR / args.backup
+    if args.cadeia:
+        pastas = backup.cadeia_ate(pasta.parent, pasta.name)
+    else:
+        pastas = [pasta]
+    for pasta in pastas:
+        print(f"↺ Restaurando {pasta.name}", file=sys.stderr)
+        medidor = backup.restaurar_backup(db, pasta, args.lote)
+        print(f"  {medidor.resumo()}", file=sys.stderr)
+
+
+def cmd_renumerar(db: Database, args):
+    """Renumera as posições dos cartões (na ordem atual) de uma etapa ou de todas"""
+    etapas = [_resolver_etapa(db, args.etapa)] if args.etapa else [e.id for e in db.get_etapas()]
+    for etapa in etapas:
+        posicoes = db.renumerar_posicoes(etapa)
+        print(f"✓ Etapa {etapa}: {len(posicoes)} projetos renumerados", file=sys.stderr)
+
+
+def cmd_migrar(db: Database, args):
+    """Aplica (ou só lista, com --verificar) as migrações que faltam no banco"""
+    if args.verificar:
+        faltando = migracoes.pendentes(db.connection)
+        for nome in faltando:
+            print(nome)
+        print(f"{len(faltando)} migrações pendentes", file=sys.stderr)
+        return
+    aplicadas = migracoes.migrar(db.connection)
+    for nome in aplicadas:
+        print(f"✓ {nome}", file=sys.stderr)
+    if "projetos.posicao" in aplicadas:
+        print("  Numere a ordem dos cartões com: python -m kanban renumerar", file=sys.stderr)
+    if not aplicadas:
+        print("✓ Banco já está atualizado", file=sys.stderr)
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m kanban",
+                                     description="Operações em lote do Kanban sem interface gráfica")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("list", help="lista projetos")
+    p.add_argument("--etapa", help="id ou nome da etapa")
+    p.add_argument("--json", action="store_true", help="saída em JSON Lines")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("move", help="move um ou mais projetos de etapa")
+    p.add_argument("projeto_ids", type=int, nargs="+", metavar="projeto_id")
+    p.add_argument("etapa", help="id ou nome da etapa de destino")
+    p.set_defaults(func=cmd_move)
+
+    p = sub.add_parser("report", help="relatório de receitas")
+    p.add_argument("--meses", type=int, default=12)
+    p.add_argument("--top", type=int, default=10)
+    p.add_argument("--colunar", action="store_true",
+                   help="inclui receita móvel e previsão (requer numpy)")
+    p.add_argument("--arquivados", action="store_true",
+                   help="inclui a receita dos projetos arquivados")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("import", help="importa projetos de um CSV")
+    p.add_argument("arquivo")
+    p.add_argument("--etapa", help="etapa padrão quando o CSV não tem a coluna etapa")
+    p.add_argument("--lote", type=int, default=1000, help="linhas por transação")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("archive", help="arquiva concluídos antigos")
+    p.add_argument("--dias", type=int, default=AppConfig.ARCHIVE_AFTER_DAYS or 180,
+                   help="idade mínima desde a última alteração")
+    p.add_argument("--listar", action="store_true", help="lista os arquivados em vez de arquivar")
+    p.add_argument("--busca", help="filtra a listagem por nome ou descrição")
+    p.set_defaults(func=cmd_archive)
+
+    p = sub.add_parser("backup", help="backup comprimido do banco")
+    p.add_argument("--incremental", action="store_true",
+                   help="só o que mudou desde o último backup")
+    p.add_argument("--linhas-por-arquivo", type=int, default=100000)
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser("restore", help="restaura um backup")
+    p.add_argument("backup", help="pasta do backup ou nome dentro de BACKUP_DIR")
+    p.add_argument("--cadeia", action="store_true",
+                   help="restaura o último completo e os incrementais até este backup")
+    p.add_argument("--lote", type=int, default=1000, help="linhas por INSERT")
+    p.set_defaults(func=cmd_restore)
+
+    p = sub.add_parser("renumerar", help="renumera a ordem manual dos cartões")
+    p.add_argument("--etapa", help="id ou nome da etapa (padrão: todas)")
+    p.set_defaults(func=cmd_renumerar)
+
+    p = sub.add_parser("migrar", help="atualiza o schema de um banco antigo")
+    p.add_argument("--verificar", action="store_true",
+                   help="só lista as migrações pendentes")
+    p.set_defaults(func=cmd_migrar)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = criar_parser().parse_args(argv)
+    db = None
+    try:
+        # As mensagens de conexão do Database vão para stderr, deixando a
+        # saída padrão limpa para pipelines
+        with redirect_stdout(sys.stderr):
+            db = Database(**get_database_config(), replicas=get_replicas_config(),
+                          janela_leitura=AppConfig.REPLICA_READ_WINDOW)
+        if args.func is not cmd_migrar:
+            migracoes.exigir_atualizado(db.connection)
+        args.func(db, args)
+    except DatabaseError as e:
+        print(f"Erro de banco de dados: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Saída fechada antes do fim (ex.: | head); não é erro. Aponta o
+        # stdout para /dev/null para o flush final não falhar de novo.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    finally:
+        if db is not None:
+            with redirect_stdout(sys.stderr):
+                db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
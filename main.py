@@ -14,8 +14,11 @@ load_dotenv()
 # Adiciona o diretório atual ao path para importar os módulos
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from config import AppConfig, get_database_config, get_replicas_config
 from db import Database, DatabaseError
 from gui import KanbanGUI
+from journal import MutationJournal
+import migracoes
 import mysql.connector
 
 
@@ -105,8 +108,18 @@ def setup_database():
             print("Execute o script SQL manualmente se necessário.")
         else:
             print("✓ Todas as tabelas encontradas!")
-        
         cursor.close()
+        
+        # Bancos criados por versões anteriores ganham o que falta do schema
+        if not missing_tables:
+            try:
+                for nome in migracoes.migrar(connection):
+                    print(f"✓ Migração aplicada: {nome}")
+            except DatabaseError as e:
+                print(f"Erro: {e}")
+                connection.close()
+                return False
+        
         connection.close()
         print("✓ Conexão estabelecida com sucesso!")
         return True
@@ -116,20 +129,6 @@ def setup_database():
         return False
 
 
-def get_database_config():
-    """Solicita configurações do banco de dados do usuário"""
-    # Por simplicidade, usar configurações padrão
-    # Em uma aplicação real, você poderia usar um arquivo de configuração
-    # ou solicitar ao usuário via interface gráfica
-    
-    return {
-        'host': os.getenv('DB_HOST', 'localhost'),
-        'user': os.getenv('DB_USER', 'root'),
-        'password': os.getenv('DB_PASSWORD', ''),
-        'database': os.getenv('DB_NAME', 'kanban_projects')
-    }
-
-
 def main():
     """Função principal da aplicação"""
     print("=== Kanban Projects Manager ===")
@@ -147,7 +146,11 @@ def main():
     try:
         # Cria conexão com o banco
         print("Conectando ao banco de dados...")
-        database = Database(**db_config)
+        journal = MutationJournal(AppConfig.JOURNAL_FILE)
+        if len(journal):
+            print(f"⚠️ {len(journal)} mutações pendentes no journal")
+        database = Database(**db_config, journal=journal, replicas=get_replicas_config(),
+                            janela_leitura=AppConfig.REPLICA_READ_WINDOW)
         
         # Cria e inicia a interface gráfica
         print("Iniciando interface gráfica...")
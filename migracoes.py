@@ -0,0 +1,181 @@
+"""
+Migrações - Leva bancos criados por versões anteriores ao schema atual
+
+database_schema.sql só cria o que não existe: num banco antigo, tabelas já
+existentes não ganham colunas nem índices novos, e os triggers, o arquivo
+e o journal ficam de fora até alguém rodar o script de novo. Este módulo
+consulta o information_schema e aplica só o que falta, então pode rodar a
+cada inicialização:
+
+    python -m kanban migrar [--verificar]
+
+As tabelas e os triggers novos são criados com o DDL do próprio
+database_schema.sql, a única fonte das definições; colunas e índices de
+tabelas antigas são acrescentados com ALTER TABLE.
+"""
+import re
+from typing import Dict, List, Tuple
+
+from mysql.connector import Error
+
+from config import AppConfig
+from db import DatabaseError
+
+
+SCHEMA_FILE = AppConfig.BASE_DIR / "database_schema.sql"
+
+# Na ordem de criação: faturamentos_arquivados referencia projetos_arquivados
+# e os triggers escrevem no change_log
+TABELAS_NOVAS = ["projetos_arquivados", "faturamentos_arquivados", "journal_operacoes", "change_log"]
+
+
+def _ddl_do_schema() -> Dict[str, str]:
+    """CREATE TABLE e CREATE TRIGGER do database_schema.sql, por nome"""
+    with open(SCHEMA_FILE, 'r', encoding='utf-8') as arquivo:
+        script = arquivo.read()
+    ddl = {}
+    # Mesma divisão do Database.execute_script; comentários saem antes
+    for instrucao in script.split(';'):
+        linhas = [l for l in instrucao.splitlines() if not l.strip().startswith('--')]
+        instrucao = "\n".join(linhas).strip()
+        m = re.match(r"CREATE (?:TABLE IF NOT EXISTS|TRIGGER) (\w+)", instrucao)
+        if m:
+            ddl[m.group(1)] = instrucao
+    return ddl
+
+
+def _existe(cursor, sql: str, *params) -> bool:
+    cursor.execute(sql, params)
+    return cursor.fetchone()[0] > 0
+
+
+def _tabela_existe(cursor, tabela: str) -> bool:
+    return _existe(cursor, """
+        SELECT COUNT(*) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, tabela)
+
+
+def _coluna_existe(cursor, tabela: str, coluna: str) -> bool:
+    return _existe(cursor, """
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, tabela, coluna)
+
+
+def _indice_existe(cursor, tabela: str, indice: str) -> bool:
+    return _existe(cursor, """
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, tabela, indice)
+
+
+def _trigger_existe(cursor, trigger: str) -> bool:
+    return _existe(cursor, """
+        SELECT COUNT(*) FROM information_schema.TRIGGERS
+        WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME = %s
+    """, trigger)
+
+
+def _evento_existe(cursor, evento: str) -> bool:
+    return _existe(cursor, """
+        SELECT COUNT(*) FROM information_schema.EVENTS
+        WHERE EVENT_SCHEMA = DATABASE() AND EVENT_NAME = %s
+    """, evento)
+
+
+def _passos(cursor) -> List[Tuple[str, List[str]]]:
+    """Migrações que faltam neste banco, como (nome, instruções), em ordem"""
+    ddl = _ddl_do_schema()
+    passos = []
+
+    if not _coluna_existe(cursor, "projetos", "posicao"):
+        passos.append(("projetos.posicao", [
+            "ALTER TABLE projetos ADD COLUMN posicao VARCHAR(64) CHARACTER SET ascii "
+            "COLLATE ascii_bin NOT NULL DEFAULT '' AFTER data_atualizacao"
+        ]))
+    # O índice novo entra antes de o antigo sair: a chave estrangeira de
+    # etapa_atual precisa de um índice o tempo todo
+    instrucoes = []
+    if not _indice_existe(cursor, "projetos", "idx_etapa_posicao"):
+        instrucoes.append("ALTER TABLE projetos ADD INDEX idx_etapa_posicao (etapa_atual, posicao)")
+    if _indice_existe(cursor, "projetos", "idx_etapa"):
+        instrucoes.append("ALTER TABLE projetos DROP INDEX idx_etapa")
+    if instrucoes:
+        passos.append(("projetos.idx_etapa_posicao", instrucoes))
+
+    if not _indice_existe(cursor, "projetos", "ft_nome_descricao"):
+        passos.append(("projetos.ft_nome_descricao", [
+            "ALTER TABLE projetos ADD FULLTEXT INDEX ft_nome_descricao (nome, descricao)"
+        ]))
+
+    instrucoes = []
+    if not _indice_existe(cursor, "faturamentos", "idx_projeto_data_id_valor"):
+        instrucoes.append("ALTER TABLE faturamentos ADD INDEX idx_projeto_data_id_valor "
+                          "(projeto_id, data_faturamento, id, valor)")
+    for antigo in ("idx_projeto_id", "idx_projeto_data_valor"):
+        if _indice_existe(cursor, "faturamentos", antigo):
+            instrucoes.append(f"ALTER TABLE faturamentos DROP INDEX {antigo}")
+    if instrucoes:
+        passos.append(("faturamentos.idx_projeto_data_id_valor", instrucoes))
+
+    for tabela in TABELAS_NOVAS:
+        if not _tabela_existe(cursor, tabela):
+            passos.append((tabela, [ddl[tabela]]))
+
+    for nome, instrucao in ddl.items():
+        if instrucao.startswith("CREATE TRIGGER") and not _trigger_existe(cursor, nome):
+            passos.append((nome, [instrucao]))
+
+    if _evento_existe(cursor, "ev_prune_change_log"):
+        passos.append(("ev_prune_change_log", ["DROP EVENT IF EXISTS ev_prune_change_log"]))
+
+    return passos
+
+
+def pendentes(conexao) -> List[str]:
+    """Nomes das migrações que faltam no banco da conexão"""
+    try:
+        cursor = conexao.cursor()
+        try:
+            return [nome for nome, _ in _passos(cursor)]
+        finally:
+            cursor.close()
+    except Error as e:
+        raise DatabaseError(f"Erro ao verificar o schema: {e}") from e
+
+
+def exigir_atualizado(conexao):
+    """Falha com instruções claras se o banco precisar de migração"""
+    faltando = pendentes(conexao)
+    if faltando:
+        raise DatabaseError(
+            f"Banco desatualizado, faltam: {', '.join(faltando)}. "
+            "Execute: python -m kanban migrar"
+        )
+
+
+def migrar(conexao) -> List[str]:
+    """Aplica as migrações que faltam e devolve os nomes aplicados
+
+    DDL no MySQL não tem transação: se um passo falhar, os anteriores ficam
+    aplicados e rodar de novo continua de onde parou.
+    """
+    aplicadas = []
+    cursor = conexao.cursor()
+    try:
+        for nome, instrucoes in _passos(cursor):
+            try:
+                for instrucao in instrucoes:
+                    cursor.execute(instrucao)
+            except Error as e:
+                raise DatabaseError(
+                    f"Migração {nome} falhou: {e}. Aplique-a com um usuário com "
+                    "permissão de ALTER, CREATE, TRIGGER e EVENT: python -m kanban migrar"
+                ) from e
+            aplicadas.append(nome)
+    except Error as e:
+        raise DatabaseError(f"Erro ao verificar o schema: {e}") from e
+    finally:
+        cursor.close()
+    return aplicadas
@@ -3,9 +3,10 @@ Models - Classes de domínio para o sistema Kanban
 """
 from dataclasses import dataclass
 from datetime import datetime
-from decimal import Decimal
 from typing import List, Optional, Protocol
 
+import dinheiro
+
 
 class Observer(Protocol):
     """Interface para o padrão Observer"""
@@ -48,21 +49,32 @@ class Etapa:
 
 @dataclass
 class Faturamento:
-    """Representa um faturamento de projeto"""
+    """Representa um faturamento de projeto (valor em centavos)"""
     id: Optional[int]
     projeto_id: int
-    valor: Decimal
+    valor: int
     descricao: Optional[str]
     data_faturamento: datetime
     data_criacao: Optional[datetime] = None
     
     def __str__(self):
-        return f"{self.descricao or 'Faturamento'} - R$ {self.valor}"
+        return f"{self.descricao or 'Faturamento'} - {dinheiro.formatar(self.valor)}"
+
+
+@dataclass
+class Alteracao:
+    """Representa uma entrada do change_log"""
+    id: int
+    tabela: str
+    operacao: str
+    registro_id: int
+    projeto_id: int
+    data_alteracao: Optional[datetime] = None
 
 
 @dataclass
 class Projeto:
-    """Representa um projeto no sistema"""
+    """Representa um projeto no sistema (receita_total em centavos)"""
     id: Optional[int]
     nome: str
     descricao: Optional[str]
@@ -71,7 +83,8 @@ class Projeto:
     etapa_atual: int
     data_criacao: Optional[datetime] = None
     data_atualizacao: Optional[datetime] = None
-    receita_total: Decimal = Decimal('0.00')
+    receita_total: int = 0
+    posicao: str = ""  # ordem do cartão na etapa (ver ordem.py)
     faturamentos: List[Faturamento] = None
     
     def __post_init__(self):
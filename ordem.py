@@ -0,0 +1,89 @@
+"""
+Ordem - Posições fracionárias (texto) dos cartões dentro de uma etapa
+
+Cada projeto tem uma posição em base 62 ("0-9A-Za-z", em ordem ASCII) que
+é comparada como texto, e um cartão inserido entre dois vizinhos recebe uma
+posição entre as deles. Reordenar ou mover um cartão grava só a linha dele;
+as posições crescem devagar (um caractere a cada ~6 inserções no mesmo
+ponto) e, passando de um limite, a etapa é renumerada em background.
+
+A coluna no MySQL usa collation ascii_bin, para ORDER BY comparar como aqui.
+Posição vazia ("") é a de projetos ainda sem ordem (criados antes da coluna
+existir): vêm antes de todos e a etapa precisa ser renumerada.
+"""
+from typing import List, Optional, Sequence
+
+DIGITOS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_VALOR = {digito: i for i, digito in enumerate(DIGITOS)}
+
+
+def _meio(a: str, b: Optional[str]) -> str:
+    """Texto estritamente entre a e b (b None = sem limite superior)
+
+    a e b não terminam em "0", então sempre há espaço entre eles.
+    """
+    if b is not None:
+        # Prefixo comum (a completado com zeros) é copiado
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _meio(a[n:], b[n:])
+    digito_a = _VALOR[a[0]] if a else 0
+    digito_b = _VALOR[b[0]] if b is not None else len(DIGITOS)
+    if digito_b - digito_a > 1:
+        return DIGITOS[(digito_a + digito_b + 1) // 2]
+    # Dígitos consecutivos: fica com o de b se ele tiver continuação,
+    # senão desce uma casa depois do dígito de a
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITOS[digito_a] + _meio(a[1:], None)
+
+
+def valida(posicao: Optional[str]) -> bool:
+    """Indica se a posição foi gerada por este módulo (não vazia, sem "0" no fim)"""
+    return bool(posicao) and posicao[-1] != "0" and all(c in _VALOR for c in posicao)
+
+
+def entre(antes: Optional[str], depois: Optional[str]) -> str:
+    """Posição para um cartão entre os vizinhos (None nas pontas da coluna)
+
+    Levanta ValueError se os vizinhos não estiverem em ordem estrita ou
+    não forem posições válidas (caso em que a etapa precisa ser renumerada).
+    """
+    if antes is not None and not valida(antes):
+        raise ValueError(f"Posição inválida: {antes!r}")
+    if depois is not None and not valida(depois):
+        raise ValueError(f"Posição inválida: {depois!r}")
+    if antes is not None and depois is not None and antes >= depois:
+        raise ValueError(f"Posições fora de ordem: {antes!r} >= {depois!r}")
+    return _meio(antes or "", depois)
+
+
+def distribuir(quantidade: int, antes: Optional[str] = None,
+               depois: Optional[str] = None) -> List[str]:
+    """N posições crescentes entre os vizinhos, o mais curtas possível
+
+    Divide o intervalo ao meio recursivamente, então N posições numa coluna
+    vazia têm cerca de log62(N) + 1 caracteres. Usada na renumeração e em
+    inserções em lote.
+    """
+    if quantidade <= 0:
+        return []
+    metade = quantidade // 2
+    meio = entre(antes, depois)
+    return (distribuir(metade, antes, meio) + [meio]
+            + distribuir(quantidade - metade - 1, meio, depois))
+
+
+def precisa_renumerar(posicoes: Sequence[str], limite: int) -> bool:
+    """Indica se a sequência (na ordem da coluna) tem posições vazias,
+    repetidas, fora de ordem ou maiores que o limite"""
+    anterior = None
+    for posicao in posicoes:
+        if not valida(posicao) or len(posicao) > limite:
+            return True
+        if anterior is not None and posicao <= anterior:
+            return True
+        anterior = posicao
+    return False
@@ -0,0 +1,113 @@
+"""
+Prefetch - Cache LRU dos faturamentos dos cartões visíveis
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from models import Faturamento
+from tarefas import BackgroundWriter
+
+
+@dataclass
+class FaturamentosProjeto:
+    """Resumo (total em centavos) e primeira página do histórico de um projeto"""
+    resumo: Tuple[int, int, Optional[date], Optional[date]]
+    faturamentos: List[Faturamento]
+
+
+class CacheFaturamentos:
+    """Observer com os faturamentos dos projetos na tela, limitado a N projetos
+
+    prefetch() recebe os IDs dos cartões visíveis e busca os que faltam numa
+    thread própria (separada do writer dos movimentos), com uma consulta
+    IN (...) para os resumos e outra para as primeiras páginas. Eventos de
+    faturamento invalidam só o projeto afetado; cada invalidação incrementa
+    a versão do projeto, e uma busca que volta depois dela é descartada.
+    """
+
+    def __init__(self, database_factory: Callable, capacidade: int, limite: int):
+        self.capacidade = capacidade
+        self.limite = limite
+        self._entradas: "OrderedDict[int, FaturamentosProjeto]" = OrderedDict()
+        self._versoes: Dict[int, int] = {}
+        self._em_andamento: set = set()
+        self._writer = BackgroundWriter(database_factory, nome="kanban-prefetch")
+
+    def get(self, projeto_id: int) -> Optional[FaturamentosProjeto]:
+        """Entrada do projeto, se estiver no cache (passa a ser a mais recente)"""
+        entrada = self._entradas.get(projeto_id)
+        if entrada is not None:
+            self._entradas.move_to_end(projeto_id)
+        return entrada
+
+    def prefetch(self, projeto_ids: Iterable[int]):
+        """Agenda uma busca em lote dos projetos que não estão no cache"""
+        faltando = []
+        for projeto_id in projeto_ids:
+            if projeto_id is None or projeto_id <= 0:
+                continue
+            if projeto_id in self._entradas:
+                self._entradas.move_to_end(projeto_id)
+            elif projeto_id not in self._em_andamento:
+                faltando.append(projeto_id)
+        # Mais que a capacidade expulsaria do cache o próprio lote
+        faltando = faltando[:self.capacidade]
+        if not faltando:
+            return
+        self._em_andamento.update(faltando)
+        versoes = {projeto_id: self._versoes.get(projeto_id, 0) for projeto_id in faltando}
+        limite = self.limite
+        self._writer.submit(
+            lambda db: (db.get_resumos_faturamentos(faltando),
+                        db.get_faturamentos_recentes(faltando, limite)),
+            on_success=lambda resultado: self._preencher(versoes, *resultado),
+            on_error=lambda erro: self._falhou(faltando, erro)
+        )
+
+    def _preencher(self, versoes: Dict[int, int], resumos: dict, faturamentos: dict):
+        for projeto_id, versao in versoes.items():
+            self._em_andamento.discard(projeto_id)
+            if self._versoes.get(projeto_id, 0) != versao:
+                # Invalidado enquanto a busca rodava
+                continue
+            self._entradas[projeto_id] = FaturamentosProjeto(resumos[projeto_id],
+                                                             faturamentos[projeto_id])
+            self._entradas.move_to_end(projeto_id)
+        while len(self._entradas) > self.capacidade:
+            self._entradas.popitem(last=False)
+
+    def _falhou(self, projeto_ids: List[int], erro: Exception):
+        self._em_andamento.difference_update(projeto_ids)
+        print(f"⚠️ Prefetch de faturamentos falhou: {erro}")
+
+    def invalidar(self, *projeto_ids: int):
+        """Descarta as entradas dos projetos"""
+        for projeto_id in projeto_ids:
+            self._entradas.pop(projeto_id, None)
+            self._versoes[projeto_id] = self._versoes.get(projeto_id, 0) + 1
+
+    def limpar(self):
+        """Descarta todas as entradas"""
+        self.invalidar(*self._entradas, *self._em_andamento)
+
+    def processar_resultados(self):
+        """Guarda as buscas concluídas (chamar na thread do Tk)"""
+        self._writer.processar_resultados()
+
+    def close(self):
+        self._writer.close()
+
+    def update(self, event: str, data: dict = None):
+        """Implementação do Observer - invalida só os projetos afetados"""
+        data = data or {}
+        if event in ("faturamento_adicionado", "faturamento_excluido", "projeto_excluido"):
+            self.invalidar(data["projeto_id"])
+        elif event == "projetos_arquivados":
+            self.invalidar(*data["projeto_ids"])
+        elif event == "alteracoes_remotas":
+            # Outro cliente pode ter mexido nos faturamentos desses projetos
+            self.invalidar(*(projeto.id for projeto in data["projetos"]), *data["excluidos"])
+        elif event in ("journal_sincronizado", "projetos_importados"):
+            self.limpar()
@@ -0,0 +1,184 @@
+"""
+Scanner - Varredura das pastas dos projetos em processos separados
+"""
+import json
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+@dataclass
+class InfoPasta:
+    """Resumo da pasta local de um projeto"""
+    existe: bool
+    tamanho: int = 0
+    arquivos: int = 0
+    modificado: Optional[datetime] = None
+    arquivo_principal_existe: Optional[bool] = None
+
+    def resumo(self) -> str:
+        """Texto curto para o cartão"""
+        if not self.existe:
+            return "⚠️ Pasta não encontrada"
+        tamanho = float(self.tamanho)
+        for unidade in ("B", "KB", "MB", "GB"):
+            if tamanho < 1024 or unidade == "GB":
+                break
+            tamanho /= 1024
+        texto = f"📁 {tamanho:.1f} {unidade} · {self.arquivos} arquivos"
+        if self.modificado:
+            texto += f" · {self.modificado:%d/%m/%Y}"
+        if self.arquivo_principal_existe is False:
+            texto += "\n⚠️ Arquivo principal ausente"
+        return texto
+
+
+def escanear_pasta(pasta: str, arquivo_principal: Optional[str],
+                   cache: Dict[str, list]) -> Tuple[InfoPasta, Dict[str, list]]:
+    """Soma tamanho e arquivos da árvore, reaproveitando diretórios não alterados
+
+    O cache guarda, por diretório, [mtime_ns, bytes, arquivos, mtime_ns mais
+    recente, subdiretórios]. Se o mtime do diretório não mudou, nenhuma
+    entrada foi criada, removida ou renomeada nele, e só os subdiretórios são
+    visitados (um stat cada). Roda num processo do pool: só usa os argumentos.
+    """
+    if not os.path.isdir(pasta):
+        return InfoPasta(existe=False), {}
+
+    novo_cache = {}
+    tamanho = arquivos = mais_recente = 0
+    pilha = [pasta]
+    while pilha:
+        diretorio = pilha.pop()
+        try:
+            mtime = os.stat(diretorio).st_mtime_ns
+        except OSError:
+            continue
+        entrada = cache.get(diretorio)
+        if entrada is None or entrada[0] != mtime:
+            bytes_dir = arquivos_dir = 0
+            recente_dir = mtime
+            subdiretorios = []
+            try:
+                with os.scandir(diretorio) as entradas:
+                    for item in entradas:
+                        try:
+                            if item.is_dir(follow_symlinks=False):
+                                subdiretorios.append(item.path)
+                            elif item.is_file(follow_symlinks=False):
+                                st = item.stat(follow_symlinks=False)
+                                bytes_dir += st.st_size
+                                arquivos_dir += 1
+                                recente_dir = max(recente_dir, st.st_mtime_ns)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+            entrada = [mtime, bytes_dir, arquivos_dir, recente_dir, subdiretorios]
+        novo_cache[diretorio] = entrada
+        tamanho += entrada[1]
+        arquivos += entrada[2]
+        mais_recente = max(mais_recente, entrada[3])
+        pilha.extend(entrada[4])
+
+    arquivo_existe = None
+    if arquivo_principal:
+        arquivo_existe = os.path.exists(os.path.join(pasta, arquivo_principal))
+    return InfoPasta(
+        existe=True,
+        tamanho=tamanho,
+        arquivos=arquivos,
+        modificado=datetime.fromtimestamp(mais_recente / 1e9) if mais_recente else None,
+        arquivo_principal_existe=arquivo_existe
+    ), novo_cache
+
+
+class ScannerPastas:
+    """Varre as pastas dos projetos num pool de processos, sem bloquear a interface
+
+    Cada pasta vira uma tarefa independente; os resultados entram numa fila
+    assim que ficam prontos e processar_resultados() (na thread do Tk) os
+    entrega um a um a on_resultado(projeto_id, info). O cache por diretório
+    é salvo em disco no close(), então a primeira varredura da sessão
+    seguinte também só relista o que mudou.
+    """
+
+    def __init__(self, cache_path, workers: int, on_resultado: Callable):
+        self.cache_path = Path(cache_path)
+        self.on_resultado = on_resultado
+        self.resultados: Dict[int, InfoPasta] = {}
+        self._workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._prontos: queue.Queue = queue.Queue()
+        self._em_andamento: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._escaneados: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._cache: Dict[str, Dict[str, list]] = self._carregar_cache()
+
+    def _carregar_cache(self) -> Dict[str, Dict[str, list]]:
+        if not self.cache_path.exists():
+            return {}
+        try:
+            return json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Cache de pastas inválido, varrendo tudo: {e}")
+            return {}
+
+    def _salvar_cache(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._cache), encoding="utf-8")
+        os.replace(tmp_path, self.cache_path)
+
+    def escanear(self, projetos: Iterable, forcar: bool = False):
+        """Agenda a varredura das pastas ainda não varridas (ou de todas, com forcar)"""
+        for projeto in projetos:
+            if not projeto.pasta_local or projeto.id in self._em_andamento:
+                continue
+            chave = (projeto.pasta_local, projeto.arquivo_principal)
+            if not forcar and self._escaneados.get(projeto.id) == chave:
+                continue
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            self._em_andamento[projeto.id] = chave
+            future = self._executor.submit(escanear_pasta, projeto.pasta_local,
+                                           projeto.arquivo_principal,
+                                           self._cache.get(projeto.pasta_local, {}))
+            future.add_done_callback(
+                lambda f, projeto_id=projeto.id: self._prontos.put((projeto_id, f)))
+
+    def processar_resultados(self):
+        """Entrega as varreduras concluídas (chamar na thread do Tk)"""
+        while True:
+            try:
+                projeto_id, future = self._prontos.get_nowait()
+            except queue.Empty:
+                break
+            chave = self._em_andamento.pop(projeto_id)
+            pasta = chave[0]
+            if future.cancelled():
+                continue
+            try:
+                info, cache = future.result()
+            except Exception as e:
+                print(f"⚠️ Erro ao varrer {pasta}: {e}")
+                continue
+            if cache:
+                self._cache[pasta] = cache
+            else:
+                self._cache.pop(pasta, None)
+            self._escaneados[projeto_id] = chave
+            self.resultados[projeto_id] = info
+            self.on_resultado(projeto_id, info)
+
+    def close(self):
+        """Cancela as varreduras pendentes e grava o cache"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        try:
+            self._salvar_cache()
+        except OSError as e:
+            print(f"⚠️ Não foi possível salvar o cache de pastas: {e}")
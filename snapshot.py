@@ -0,0 +1,106 @@
+"""
+Snapshot - Último quadro desenhado, salvo em disco para a abertura seguinte
+
+O arquivo é um JSON comprimido com as etapas, uma linha resumida por
+projeto (sem faturamentos), os totais por etapa e a posição no change_log.
+A abertura desenha o snapshot sem consultar o MySQL; o banco é lido em
+background e só os projetos que diferem são redesenhados.
+"""
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from models import Etapa, Projeto
+
+
+FORMATO = 3
+
+# Campos do projeto guardados no snapshot e comparados na reconciliação
+CAMPOS_PROJETO = ("id", "nome", "descricao", "pasta_local", "arquivo_principal",
+                  "etapa_atual", "data_criacao", "data_atualizacao", "receita_total", "posicao")
+
+
+@dataclass
+class SnapshotQuadro:
+    """Estado do quadro no momento em que foi salvo"""
+    etapas: List[Etapa]
+    projetos: List[Projeto]
+    totais: Dict[int, Tuple[int, int]]
+    change_id: int
+    salvo_em: Optional[datetime] = None
+
+
+def _data(valor: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(valor) if valor else None
+
+
+def _linha_projeto(projeto: Projeto) -> list:
+    return [
+        projeto.id, projeto.nome, projeto.descricao, projeto.pasta_local,
+        projeto.arquivo_principal, projeto.etapa_atual,
+        projeto.data_criacao.isoformat(sep=" ") if projeto.data_criacao else None,
+        projeto.data_atualizacao.isoformat(sep=" ") if projeto.data_atualizacao else None,
+        projeto.receita_total, projeto.posicao
+    ]
+
+
+def _projeto_da_linha(linha: list) -> Projeto:
+    id_, nome, descricao, pasta, arquivo, etapa, criacao, atualizacao, receita, posicao = linha
+    return Projeto(
+        id=id_, nome=nome, descricao=descricao, pasta_local=pasta,
+        arquivo_principal=arquivo, etapa_atual=etapa,
+        data_criacao=_data(criacao), data_atualizacao=_data(atualizacao),
+        receita_total=receita, posicao=posicao
+    )
+
+
+def projeto_difere(a: Projeto, b: Projeto) -> bool:
+    """Indica se o cartão de a precisa ser redesenhado para mostrar b"""
+    return any(getattr(a, campo) != getattr(b, campo) for campo in CAMPOS_PROJETO)
+
+
+def salvar(path, banco: str, snapshot: SnapshotQuadro):
+    """Grava o snapshot de forma atômica (arquivo temporário + replace)"""
+    path = Path(path)
+    dados = {
+        "formato": FORMATO,
+        "banco": banco,
+        "salvo_em": datetime.now().isoformat(sep=" ", timespec="seconds"),
+        "change_id": snapshot.change_id,
+        "etapas": [[e.id, e.nome, e.ordem] for e in snapshot.etapas],
+        "projetos": [_linha_projeto(p) for p in snapshot.projetos],
+        "totais": {str(etapa): [quantidade, receita]
+                   for etapa, (quantidade, receita) in snapshot.totais.items()}
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(dados, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def carregar(path, banco: str) -> Optional[SnapshotQuadro]:
+    """Lê o snapshot; None se não existir, for de outro banco ou estiver inválido"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            dados = json.load(f)
+        if dados.get("formato") != FORMATO or dados.get("banco") != banco:
+            return None
+        return SnapshotQuadro(
+            etapas=[Etapa(id=id_, nome=nome, ordem=ordem) for id_, nome, ordem in dados["etapas"]],
+            projetos=[_projeto_da_linha(linha) for linha in dados["projetos"]],
+            totais={int(etapa): (quantidade, receita)
+                    for etapa, (quantidade, receita) in dados["totais"].items()},
+            change_id=dados["change_id"],
+            salvo_em=_data(dados.get("salvo_em"))
+        )
+    except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+        print(f"⚠️ Snapshot do quadro inválido, carregando do banco: {e}")
+        return None
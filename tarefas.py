@@ -0,0 +1,67 @@
+"""
+Tarefas - Execução de operações do Database fora da thread da interface
+"""
+import queue
+import threading
+from typing import Callable, Optional
+
+
+class BackgroundWriter:
+    """Executa operações do Database numa thread própria, com conexão própria
+
+    A conexão MySQL não pode ser compartilhada entre threads, então a thread
+    de trabalho cria seu próprio Database pela factory. Os resultados voltam
+    por uma fila que a interface drena com processar_resultados(), sempre na
+    thread do Tk.
+    """
+
+    def __init__(self, database_factory: Callable, nome: str = "kanban-writer"):
+        self._factory = database_factory
+        self._database = None
+        self._tarefas: queue.Queue = queue.Queue()
+        self._resultados: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=nome, daemon=True)
+        self._thread.start()
+
+    def submit(self, funcao: Callable, on_success: Optional[Callable] = None,
+               on_error: Optional[Callable] = None):
+        """Agenda funcao(database); os callbacks rodam em processar_resultados()"""
+        self._tarefas.put((funcao, on_success, on_error))
+
+    def pendentes(self) -> int:
+        """Quantidade aproximada de tarefas ainda não executadas"""
+        return self._tarefas.qsize()
+
+    def _run(self):
+        while True:
+            tarefa = self._tarefas.get()
+            if tarefa is None:
+                break
+            funcao, on_success, on_error = tarefa
+            try:
+                if self._database is None:
+                    self._database = self._factory()
+                resultado = funcao(self._database)
+            except Exception as e:
+                if on_error is None:
+                    print(f"❌ Erro em tarefa de background: {e}")
+                self._resultados.put((on_error, e))
+            else:
+                self._resultados.put((on_success, resultado))
+        if self._database is not None:
+            self._database.close()
+
+    def processar_resultados(self):
+        """Executa os callbacks das tarefas concluídas (chamar na thread do Tk)"""
+        while True:
+            try:
+                callback, valor = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            if callback is not None:
+                callback(valor)
+
+    def close(self):
+        """Encerra a thread após as tarefas já agendadas"""
+        self._tarefas.put(None)
+        self._thread.join(timeout=5)